@@ -3,6 +3,7 @@ from config import Config
 from routes import register_routes
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from app import db, pagination, compression, passwords, revocation, metrics, query_profiler, json_provider, rate_limit
 from datetime import timedelta # Import nécessaire pour la durée
 
 def create_app():
@@ -15,10 +16,46 @@ def create_app():
     
     # Initialisation du JWTManager
     jwt = JWTManager(app)
+    # Tokens révoqués (logout) refusés sur tous les workers
+    revocation.init_app(app, jwt)
 
     # --- CONFIGURATION CORS ---
     # On autorise explicitement les headers pour éviter les blocages sur le dashboard
-    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
+    # X-Next-Cursor doit être exposé pour que le front puisse paginer
+    # (Idempotent-Replayed : réponse rejouée d'une requête Idempotency-Key)
+    CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, expose_headers=["X-Next-Cursor", "Idempotent-Replayed"])
+
+    # --- POOL DE CONNEXIONS MYSQL ---
+    # Une connexion par requête, empruntée au pool du worker via flask.g
+    db.init_app(app)
+
+    # --- JSON ---
+    # orjson (si installé) ; dates et Decimal convertis pendant l'encodage
+    json_provider.init_app(app)
+
+    # --- MÉTRIQUES ---
+    # Latence, codes de réponse et requêtes SQL par route, exposés sur /metrics
+    metrics.init_app(app)
+
+    # --- PROFILAGE SQL ---
+    # Empreintes des requêtes (p50 / p95 / max), requêtes lentes journalisées
+    query_profiler.init_app(app)
+
+    # --- LIMITATION DE DÉBIT ---
+    # Seaux à jetons par IP / compte (RATE_LIMITS), 429 + Retry-After au-delà
+    rate_limit.init_app(app)
+
+    # --- PAGINATION ---
+    # Paramètres invalides (curseur, limit, dates) renvoyés en 400
+    pagination.init_app(app)
+
+    # --- BCRYPT ---
+    # Hachage dans un pool de processus borné, 503 + Retry-After si saturé
+    passwords.init_app(app)
+
+    # --- COMPRESSION & GET CONDITIONNELS ---
+    # gzip / brotli au-delà de COMPRESS_MIN_SIZE, ETag faible + 304 sur les GET
+    compression.init_app(app)
 
     # Enregistrement des blueprints
     register_routes(app)
@@ -0,0 +1,133 @@
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+from app.db import get_db
+
+# Type de compte porté par le token (claim "kind")
+PRINCIPAL_STAFF = "staff"
+PRINCIPAL_CUSTOMER = "customer"
+
+ROLE_ADMIN = 1
+
+
+def staff_claims(staff):
+    """Claims additionnels d'un token Staff (ligne Staff avec ID et RoleID)"""
+    return {"kind": PRINCIPAL_STAFF, "staff_id": staff["ID"], "RoleID": staff["RoleID"]}
+
+
+def customer_claims(customer):
+    """Claims additionnels d'un token Client"""
+    return {"kind": PRINCIPAL_CUSTOMER, "customer_id": customer["ID"]}
+
+
+def is_staff(claims=None):
+    """Vrai si le token de la requête a été émis par /auth/admin/login"""
+    claims = claims if claims is not None else get_jwt()
+    return claims.get("kind") == PRINCIPAL_STAFF and claims.get("staff_id") is not None
+
+
+# --- INVALIDATION DES TOKENS STAFF ---
+# Quand un membre du Staff est modifié (rôle, mot de passe) ou supprimé, on enregistre
+# l'instant du changement dans StaffChanges : tout token Staff émis avant est refusé.
+# Chaque worker garde une copie locale rafraîchie au plus toutes les
+# STAFF_CHANGES_REFRESH secondes, on ne touche donc pas la base à chaque requête.
+# Changements plus récents que la durée de vie d'un token (vérifiée par `python migrate.py check`)
+STAFF_CHANGES_SQL = "SELECT StaffID, ChangedAt FROM StaffChanges WHERE ChangedAt > %s"
+
+_staff_changes = {}
+_staff_changes_loaded_at = 0.0
+_staff_changes_lock = threading.Lock()
+
+
+def _token_lifetime():
+    expires = current_app.config.get("JWT_ACCESS_TOKEN_EXPIRES")
+    return int(expires.total_seconds()) if expires else 3600
+
+
+def _refresh_staff_changes():
+    global _staff_changes, _staff_changes_loaded_at
+    now = time.time()
+    if now - _staff_changes_loaded_at < current_app.config.get("STAFF_CHANGES_REFRESH", 5):
+        return
+    with _staff_changes_lock:
+        if now - _staff_changes_loaded_at < current_app.config.get("STAFF_CHANGES_REFRESH", 5):
+            return
+        # Seuls les changements plus récents que la durée de vie d'un token comptent
+        with get_db().cursor() as cursor:
+            cursor.execute(STAFF_CHANGES_SQL, (int(now) - _token_lifetime(),))
+            _staff_changes = {row["StaffID"]: row["ChangedAt"] for row in cursor.fetchall()}
+        _staff_changes_loaded_at = now
+
+
+def staff_token_is_stale(claims):
+    """Vrai si le Staff a été modifié ou supprimé après l'émission du token"""
+    _refresh_staff_changes()
+    changed_at = _staff_changes.get(claims["staff_id"])
+    return changed_at is not None and claims.get("iat", 0) < changed_at
+
+
+def mark_staff_changed(cursor, staff_id):
+    """
+    Invalide les tokens déjà émis pour ce Staff.
+    À appeler dans la même transaction que la modification / suppression.
+    """
+    changed_at = int(time.time())
+    cursor.execute("""
+        INSERT INTO StaffChanges (StaffID, ChangedAt) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE ChangedAt = VALUES(ChangedAt)
+    """, (staff_id, changed_at))
+    _staff_changes[staff_id] = changed_at
+
+
+def staff_required(roles=None, error="Accès réservé aux administrateurs"):
+    """
+    Décorateur des routes Staff : autorise à partir des claims du token, sans requête
+    sur la table Staff. `roles` restreint éventuellement à certains RoleID.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            claims = get_jwt()
+            if not is_staff(claims):
+                return jsonify({"error": error}), 403
+            if roles is not None and claims.get("RoleID") not in roles:
+                return jsonify({"error": error}), 403
+            if staff_token_is_stale(claims):
+                return jsonify({"error": "Session expirée, veuillez vous reconnecter"}), 401
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def customer_required(error="Réservé aux comptes clients"):
+    """Décorateur des routes Client (/me) : refuse les tokens Staff, dont l'identité n'est pas un ID client"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if current_customer_id() is None:
+                return jsonify({"error": error}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_staff_id():
+    """ID Staff du token courant s'il est valide, sinon None (routes mixtes client/admin)"""
+    claims = get_jwt()
+    if is_staff(claims) and not staff_token_is_stale(claims):
+        return claims["staff_id"]
+    return None
+
+
+def current_customer_id():
+    """ID Client du token courant, None si le token n'est pas un token Client"""
+    claims = get_jwt()
+    if claims.get("kind") == PRINCIPAL_CUSTOMER:
+        return claims.get("customer_id")
+    return None
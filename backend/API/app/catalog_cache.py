@@ -0,0 +1,67 @@
+"""
+Cache du catalogue produits, propre à chaque worker.
+
+Le catalogue ne change que via /products/admin/create|edit|delete, qui incrémentent
+la ligne 'catalog' de CacheVersions dans leur transaction. Les commandes décrémentent
+StockQuantity sans invalider le cache, sauf celle qui épuise le stock d'un produit :
+entre deux, le stock affiché par /products/list est indicatif. Chaque worker relit cette
+ligne au plus toutes les CATALOG_VERSION_TTL secondes (une lecture par clé primaire) ;
+entre deux lectures, un If-None-Match à jour est servi en 304 sans toucher la base.
+"""
+import threading
+import time
+
+from flask import current_app
+
+from app.db import get_db
+
+CATALOG = "catalog"
+
+# Requêtes vérifiées par `python migrate.py check`
+VERSION_SQL = "SELECT Version FROM CacheVersions WHERE Name = %s"
+PRODUCTS_SQL = "SELECT * FROM Products ORDER BY ID"
+
+_lock = threading.Lock()
+_version = None
+_version_checked_at = 0.0
+_products = None
+_products_version = None
+
+
+def current_version():
+    """Version du catalogue, relue en base seulement si la copie locale a expiré"""
+    global _version, _version_checked_at
+    now = time.monotonic()
+    if _version is not None and now - _version_checked_at < current_app.config.get("CATALOG_VERSION_TTL", 2):
+        return _version
+    with get_db().cursor() as cursor:
+        cursor.execute(VERSION_SQL, (CATALOG,))
+        row = cursor.fetchone()
+    with _lock:
+        _version = row['Version'] if row else 0
+        _version_checked_at = now
+    return _version
+
+
+def bump(cursor):
+    """À appeler dans la transaction qui modifie Products"""
+    global _version_checked_at
+    cursor.execute("""
+        INSERT INTO CacheVersions (Name, Version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE Version = Version + 1
+    """, (CATALOG,))
+    # Ce worker relira la nouvelle version dès la prochaine requête
+    _version_checked_at = 0.0
+
+
+def get_products(version):
+    """Catalogue complet trié par ID, chargé une fois par version"""
+    global _products, _products_version
+    if _products_version == version:
+        return _products
+    with get_db().cursor() as cursor:
+        cursor.execute(PRODUCTS_SQL)
+        products = cursor.fetchall()
+    with _lock:
+        _products, _products_version = products, version
+    return products
@@ -0,0 +1,71 @@
+"""
+Compression (brotli / gzip) et GET conditionnels pour toutes les réponses JSON.
+
+Réglable par blueprint via HTTP_POLICIES, par exemple :
+    HTTP_POLICIES = {"exports": {"compress": False}, "orders": {"min_size": 512}}
+Les réponses en streaming (exports) ne sont jamais bufferisées ici.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle : on se rabat sur gzip
+    brotli = None
+
+
+def _policy(app):
+    policy = {
+        "compress": app.config.get("COMPRESS_ENABLED", True),
+        "etag": app.config.get("ETAG_ENABLED", True),
+        "min_size": app.config.get("COMPRESS_MIN_SIZE", 1024),
+    }
+    policy.update(app.config.get("HTTP_POLICIES", {}).get(request.blueprint, {}))
+    return policy
+
+
+def _negotiate():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_app(app):
+    @app.after_request
+    def compress_and_tag(response):
+        if response.is_streamed or response.direct_passthrough:
+            return response
+        policy = _policy(app)
+
+        # GET conditionnel : ETag faible calculé sur le corps non compressé
+        if (policy["etag"] and request.method == "GET" and response.status_code == 200
+                and "ETag" not in response.headers):
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+
+        if (not policy["compress"] or response.status_code != 200
+                or "Content-Encoding" in response.headers
+                or response.content_length is None or response.content_length < policy["min_size"]):
+            return response
+
+        encoding = _negotiate()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if encoding == "br":
+            body = brotli.compress(body, quality=app.config.get("BROTLI_QUALITY", 5))
+        else:
+            body = gzip.compress(body, compresslevel=app.config.get("GZIP_LEVEL", 6))
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        # Un ETag fort posé par la route désigne les octets non compressés : il devient faible
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,96 @@
+"""
+Table de synthèse CustomerStats (une ligne par client) servant /me/stats.
+
+Elle est tenue à jour dans la même transaction que les routes qui modifient
+Orders / ActualOrders. Un service « actif » dépend de l'heure (EndedAt > NOW()) :
+la ligne garde donc la prochaine date d'expiration (NextExpiryAt) et est
+recalculée à la lecture une fois cette date passée.
+"""
+
+# Statuts comptés dans les commandes en attente / le total dépensé
+PENDING_STATUSES = ("Pending", "Processing")
+SPENT_STATUSES = ("Delivered", "Finished")
+
+_AGGREGATES = """
+    SELECT c.ID,
+        (SELECT COUNT(*) FROM ActualOrders WHERE CustomerID = c.ID AND EndedAt > NOW()),
+        (SELECT MIN(EndedAt) FROM ActualOrders WHERE CustomerID = c.ID AND EndedAt > NOW()),
+        (SELECT COUNT(*) FROM Orders WHERE CustomerID = c.ID AND Status IN ('Pending', 'Processing')),
+        (SELECT COALESCE(SUM(TotalAmount), 0) FROM Orders WHERE CustomerID = c.ID AND Status IN ('Delivered', 'Finished'))
+    FROM Customers c
+"""
+
+_UPSERT = """
+    INSERT INTO CustomerStats (CustomerID, ActiveServices, NextExpiryAt, PendingOrders, TotalSpent)
+    {select}
+    ON DUPLICATE KEY UPDATE
+        ActiveServices = VALUES(ActiveServices),
+        NextExpiryAt = VALUES(NextExpiryAt),
+        PendingOrders = VALUES(PendingOrders),
+        TotalSpent = VALUES(TotalSpent)
+"""
+
+
+def order_status_delta(old_status, new_status, amount):
+    """Variation (en attente, dépensé) quand une commande passe de old_status à new_status"""
+    pending = (new_status in PENDING_STATUSES) - (old_status in PENDING_STATUSES)
+    spent = ((new_status in SPENT_STATUSES) - (old_status in SPENT_STATUSES)) * amount
+    return pending, spent
+
+
+def apply_delta(cursor, customer_id, pending=0, spent=0, active=0, ended_at=None):
+    """
+    Applique une variation à la ligne du client (créée si besoin).
+    `ended_at` : date de fin d'un service ajouté, pour avancer NextExpiryAt.
+    """
+    cursor.execute("""
+        INSERT INTO CustomerStats (CustomerID, ActiveServices, NextExpiryAt, PendingOrders, TotalSpent)
+        VALUES (%s, GREATEST(%s, 0), %s, GREATEST(%s, 0), GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE
+            ActiveServices = GREATEST(ActiveServices + %s, 0),
+            NextExpiryAt = IF(%s IS NULL, NextExpiryAt, LEAST(COALESCE(NextExpiryAt, %s), %s)),
+            PendingOrders = GREATEST(PendingOrders + %s, 0),
+            TotalSpent = GREATEST(TotalSpent + %s, 0)
+    """, (customer_id, active, ended_at, pending, spent,
+          active, ended_at, ended_at, ended_at, pending, spent))
+
+
+# Requêtes de /me/stats, vérifiées par `python migrate.py check`
+STATS_SQL = """
+    SELECT ActiveServices, PendingOrders, TotalSpent,
+           NextExpiryAt IS NOT NULL AND NextExpiryAt <= NOW() AS Stale
+    FROM CustomerStats WHERE CustomerID = %s
+"""
+
+REFRESH_SQL = _UPSERT.format(select=_AGGREGATES + " WHERE c.ID = %s")
+
+
+def refresh(cursor, customer_id):
+    """Recalcule la ligne d'un client à partir des tables (requêtes indexées)"""
+    cursor.execute(REFRESH_SQL, (customer_id,))
+
+
+def refresh_many(cursor, customer_ids):
+    """Comme refresh, pour un lot de clients en une requête (imports)"""
+    if not customer_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(customer_ids))
+    cursor.execute(_UPSERT.format(select=_AGGREGATES + f" WHERE c.ID IN ({placeholders})"), tuple(customer_ids))
+
+
+def rebuild(cursor):
+    """Recalcule toute la table (commande `python migrate.py rebuild-stats`)"""
+    cursor.execute(_UPSERT.format(select=_AGGREGATES))
+    return cursor.rowcount
+
+
+def get(cursor, customer_id):
+    """Lecture par clé primaire ; recalcul si absente ou si un service a expiré depuis"""
+    cursor.execute(STATS_SQL, (customer_id,))
+    row = cursor.fetchone()
+    if row is None or row['Stale']:
+        refresh(cursor, customer_id)
+        cursor.connection.commit()
+        cursor.execute(STATS_SQL, (customer_id,))
+        row = cursor.fetchone()
+    return row
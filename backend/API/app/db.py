@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+
+import pymysql
+from flask import current_app, g, jsonify
+
+
+class PoolExhausted(Exception):
+    """Levée quand aucune connexion ne se libère avant DB_POOL_TIMEOUT"""
+
+
+# Observateurs de chaque requête SQL (métriques, profilage) : fn(sql, args, secondes, lignes)
+_query_hooks = []
+
+
+def on_query(hook):
+    """Enregistre un observateur appelé après chaque cursor.execute (une seule fois par fonction)"""
+    if hook not in _query_hooks:
+        _query_hooks.append(hook)
+    return hook
+
+
+class TimedCursorMixin:
+    """Mesure chaque requête et la signale aux observateurs ; coût nul s'il n'y en a aucun"""
+
+    def execute(self, query, args=None):
+        if not _query_hooks:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in _query_hooks:
+                hook(query, args, elapsed, self.rowcount)
+
+
+class DictCursor(TimedCursorMixin, pymysql.cursors.DictCursor):
+    """Curseur par défaut des connexions du pool"""
+
+
+class StreamingCursor(TimedCursorMixin, pymysql.cursors.SSDictCursor):
+    """Curseur non bufferisé (exports) ; la mesure couvre l'exécution, pas la lecture du flux"""
+
+
+class ConnectionPool:
+    """
+    Pool de connexions MySQL borné, propre à chaque worker gunicorn.
+    - taille maximale DB_POOL_SIZE (worker x taille <= max_connections)
+    - ping des connexions restées inactives trop longtemps avant de les prêter
+    - recyclage des connexions plus vieilles que DB_POOL_RECYCLE secondes
+    """
+
+    def __init__(self, size=5, timeout=5, recycle=1800, ping_interval=30, **connect_kwargs):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.connect_kwargs = connect_kwargs
+        self._reset()
+
+    def _reset(self):
+        # Appelé aussi après un fork : les sockets du parent ne doivent jamais être réutilisés
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self):
+        conn = pymysql.connect(**self.connect_kwargs)
+        conn._pool_created_at = time.monotonic()
+        conn._pool_last_used = conn._pool_created_at
+        return conn
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn):
+        now = time.monotonic()
+        if self.recycle and now - conn._pool_created_at > self.recycle:
+            return False
+        if now - conn._pool_last_used > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def acquire(self):
+        """Prête une connexion saine du pool (ou en ouvre une nouvelle)"""
+        if self._pid != os.getpid():
+            self._reset()
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolExhausted("Aucune connexion MySQL disponible")
+
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if self._is_usable(conn):
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        """Rend la connexion au pool après avoir annulé toute transaction non validée"""
+        if self._pid != os.getpid():
+            self._discard(conn)
+            return
+
+        try:
+            conn.rollback()
+            conn._pool_last_used = time.monotonic()
+            if self.recycle and conn._pool_last_used - conn._pool_created_at > self.recycle:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        except Exception:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Ferme toutes les connexions inactives"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def get_db():
+    """
+    Retourne la connexion de la requête en cours.
+    Une seule connexion est empruntée au pool par requête (stockée dans flask.g)
+    et rendue automatiquement au teardown : les routes ne doivent pas la fermer.
+    """
+    if "db" not in g:
+        g.db = current_app.extensions["db_pool"].acquire()
+    return g.db
+
+
+def release_db(exc=None):
+    conn = g.pop("db", None)
+    if conn is not None:
+        current_app.extensions["db_pool"].release(conn)
+
+
+def init_app(app):
+    """Crée le pool du worker et branche la libération de fin de requête"""
+    config = app.config
+    app.extensions["db_pool"] = ConnectionPool(
+        size=config.get("DB_POOL_SIZE", 5),
+        timeout=config.get("DB_POOL_TIMEOUT", 5),
+        recycle=config.get("DB_POOL_RECYCLE", 1800),
+        ping_interval=config.get("DB_POOL_PING_INTERVAL", 30),
+        host=config["DB_HOST"],
+        port=config.get("DB_PORT", 3306),
+        user=config["DB_USER"],
+        password=config["DB_PASSWORD"],
+        database=config["DB_NAME"],
+        cursorclass=DictCursor,
+        autocommit=False,
+    )
+    app.teardown_appcontext(release_db)
+
+    @app.errorhandler(PoolExhausted)
+    def pool_exhausted(e):
+        return jsonify({"error": "Service temporairement surchargé, réessayez"}), 503
@@ -0,0 +1,261 @@
+"""
+Flux d'événements des commandes et services pour l'administration (/orders/events, SSE).
+
+Les routes qui modifient Orders / ActualOrders écrivent une ligne OrderEvents dans
+leur propre transaction : un événement n'existe que si la modification est validée.
+Sa charge utile (JSON construit par MySQL) a la forme d'une ligne de /orders/list
+ou /orders/list/actual, le front la fusionne sans relire la liste.
+
+Dans chaque worker, un seul thread lit les nouveaux événements toutes les
+EVENTS_POLL_INTERVAL secondes, seulement s'il y a des abonnés, et les distribue
+aux connexions SSE ouvertes. Cela fait une requête par clé primaire et par
+intervalle, quel que soit le nombre d'admins connectés. Entre deux événements,
+une connexion SSE ne garde ni connexion MySQL ni contexte de requête.
+Les événements sont purgés après EVENTS_RETENTION secondes.
+
+Chaque flux occupe un thread du worker (gthread) : leur nombre est borné par
+max_subscribers. Un flux se ferme à l'expiration du token, ou au plus
+EVENTS_AUTH_RECHECK secondes après sa révocation (déconnexion, Staff modifié).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("hostos.events")
+
+# Un ID attribué avant un autre peut être validé après lui : on relit les
+# SLACK dernières secondes d'IDs et on ignore ceux déjà distribués
+_SLACK = 5
+
+ORDER_JSON = """JSON_OBJECT(
+    'ID', o.ID, 'Status', o.Status, 'TotalAmount', o.TotalAmount,
+    'OrderDate', DATE_FORMAT(o.OrderDate, '%%Y-%%m-%%d %%H:%%i:%%s'),
+    'CustomerID', o.CustomerID, 'CustomerEmail', c.Email, 'ProductName', p.ProductName
+)"""
+
+SERVICE_JSON = """JSON_OBJECT(
+    'ID', ao.ID, 'Status', ao.Status, 'RecurentPrice', ao.RecurentPrice,
+    'StartedAt', DATE_FORMAT(ao.StartedAt, '%%Y-%%m-%%d %%H:%%i:%%s'),
+    'EndedAt', DATE_FORMAT(ao.EndedAt, '%%Y-%%m-%%d %%H:%%i:%%s'),
+    'CustomerEmail', c.Email, 'ProductName', p.ProductName, 'CustomerID', ao.CustomerID, 'ProductID', ao.ProductID
+)"""
+
+
+# Lecture, purge et position de départ (requêtes vérifiées par `python migrate.py check`)
+FETCH_SQL = "SELECT ID, Kind, Payload FROM OrderEvents WHERE ID > %s ORDER BY ID LIMIT %s"
+PURGE_SQL = "DELETE FROM OrderEvents WHERE CreatedAt < %s LIMIT 1000"
+LAST_ID_SQL = "SELECT COALESCE(MAX(ID), 0) AS ID FROM OrderEvents"
+
+
+class TooManySubscribers(Exception):
+    """max_subscribers(config) connexions déjà ouvertes sur ce worker (renvoyé en 503)"""
+
+
+# --- PUBLICATION (dans la transaction de la route) ---
+
+def publish_orders(cursor, kind, order_ids):
+    """Un événement `kind` par commande, avec son état au moment de la transaction"""
+    if not order_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(f"""
+        INSERT INTO OrderEvents (Kind, CreatedAt, Payload)
+        SELECT %s, %s, {ORDER_JSON}
+        FROM Orders o
+        JOIN Customers c ON o.CustomerID = c.ID
+        JOIN Products p ON o.ProductID = p.ID
+        WHERE o.ID IN ({placeholders})
+    """, (kind, int(time.time()), *order_ids))
+
+
+def publish_services(cursor, kind, ids, column="ID"):
+    """Un événement `kind` par service ; column="OrderID" pour les services créés par une validation"""
+    if not ids:
+        return
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"""
+        INSERT INTO OrderEvents (Kind, CreatedAt, Payload)
+        SELECT %s, %s, {SERVICE_JSON}
+        FROM ActualOrders ao
+        JOIN Customers c ON ao.CustomerID = c.ID
+        JOIN Products p ON ao.ProductID = p.ID
+        WHERE ao.{column} IN ({placeholders})
+    """, (kind, int(time.time()), *ids))
+
+
+def _fetch(cursor, after, limit=1000):
+    """Tous les événements après `after`, lus par lots de `limit` jusqu'au dernier"""
+    rows = []
+    while True:
+        cursor.execute(FETCH_SQL, (after, limit))
+        batch = cursor.fetchall()
+        rows.extend(batch)
+        if len(batch) < limit:
+            return rows
+        after = batch[-1]['ID']
+
+
+def backlog(conn, last_event_id):
+    """Événements manqués par un client qui se reconnecte (en-tête Last-Event-ID)"""
+    with conn.cursor() as cursor:
+        return _fetch(cursor, last_event_id)
+
+
+def max_subscribers(config):
+    """
+    Flux ouverts max par worker : EVENTS_MAX_SUBSCRIBERS, borné à la moitié des threads
+    gunicorn pour que les autres requêtes du worker trouvent toujours un thread libre
+    """
+    return min(config.get("EVENTS_MAX_SUBSCRIBERS", 4), max(1, config.get("GUNICORN_THREADS", 8) // 2))
+
+
+# --- DISTRIBUTION (un thread par worker) ---
+
+class Subscriber:
+    def __init__(self, max_queued):
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.lost = False
+
+
+_subscribers = set()
+_lock = threading.Lock()
+_poller_pid = None
+_position = 0
+_recent = deque()      # (instant, position) : bornes de relecture des SLACK dernières secondes
+_delivered = set()     # IDs déjà distribués au-dessus de la borne de relecture
+_purged_at = 0.0
+
+
+def _dispatch(events):
+    with _lock:
+        subscribers = list(_subscribers)
+    for event in events:
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(event)
+            except queue.Full:
+                # Client trop lent : il sera déconnecté et reprendra avec Last-Event-ID
+                subscriber.lost = True
+
+
+def _poll_once(pool, config):
+    global _position, _purged_at
+    now = time.monotonic()
+    while _recent and _recent[0][0] < now - _SLACK:
+        _recent.popleft()
+    lower = _recent[0][1] if _recent else _position
+
+    conn = pool.acquire()
+    try:
+        with conn.cursor() as cursor:
+            rows = _fetch(cursor, lower)
+            if now - _purged_at > 60:
+                cursor.execute(PURGE_SQL, (int(time.time()) - config.get("EVENTS_RETENTION", 3600),))
+                _purged_at = now
+        conn.commit()
+    finally:
+        pool.release(conn)
+
+    fresh = [row for row in rows if row['ID'] not in _delivered]
+    for row in fresh:
+        _delivered.add(row['ID'])
+    if rows:
+        _position = max(_position, rows[-1]['ID'])
+    _recent.append((now, _position))
+    for event_id in [i for i in _delivered if i <= lower]:
+        _delivered.discard(event_id)
+    _dispatch(fresh)
+
+
+def _run(pool, config):
+    global _poller_pid
+    interval = config.get("EVENTS_POLL_INTERVAL", 1)
+    while True:
+        time.sleep(interval)
+        with _lock:
+            if not _subscribers:
+                _poller_pid = None
+                return
+        try:
+            _poll_once(pool, config)
+        except Exception as e:
+            logger.warning("lecture des événements impossible : %s", e)
+
+
+def subscribe(app):
+    """Inscrit une connexion SSE ; démarre le thread de lecture du worker si besoin"""
+    global _poller_pid, _position
+    config = app.config
+    pool = app.extensions["db_pool"]
+    with _lock:
+        if len(_subscribers) >= max_subscribers(config):
+            raise TooManySubscribers()
+        subscriber = Subscriber(config.get("EVENTS_MAX_QUEUED", 1000))
+        if _poller_pid != os.getpid():
+            # Premier abonné (ou nouveau worker après un fork) : lecture à partir de maintenant
+            conn = pool.acquire()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(LAST_ID_SQL)
+                    _position = cursor.fetchone()['ID']
+                conn.commit()
+            finally:
+                pool.release(conn)
+            _recent.clear()
+            _delivered.clear()
+            _poller_pid = os.getpid()
+            threading.Thread(target=_run, args=(pool, config), daemon=True, name="order-events").start()
+        _subscribers.add(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def format_event(row):
+    return f"id: {row['ID']}\nevent: {row['Kind']}\ndata: {row['Payload']}\n\n"
+
+
+def stream(subscriber, missed, heartbeat, until, still_valid=None, recheck=5):
+    """
+    Corps de la réponse text/event-stream : événements manqués, puis en direct.
+    Commentaire ': ping' toutes les `heartbeat` secondes ; fin à `until` (expiration du JWT),
+    ou dès que `still_valid()`, appelée toutes les `recheck` secondes, renvoie faux
+    (token révoqué, Staff modifié ou supprimé).
+    """
+    # Les événements rattrapés peuvent aussi arriver par le thread de lecture
+    replayed = {row['ID'] for row in missed}
+    try:
+        yield "retry: 3000\n\n"
+        for row in missed:
+            yield format_event(row)
+        checked_at = sent_at = time.monotonic()
+        while time.time() < until and not subscriber.lost:
+            now = time.monotonic()
+            if still_valid is not None and now - checked_at >= recheck:
+                try:
+                    if not still_valid():
+                        return
+                except Exception as e:
+                    logger.warning("vérification du token du flux impossible : %s", e)
+                    return
+                checked_at = now
+            try:
+                row = subscriber.queue.get(timeout=min(heartbeat, recheck))
+            except queue.Empty:
+                if time.monotonic() - sent_at >= heartbeat:
+                    yield ": ping\n\n"
+                    sent_at = time.monotonic()
+                continue
+            if row['ID'] in replayed:
+                replayed.discard(row['ID'])
+                continue
+            yield format_event(row)
+            sent_at = time.monotonic()
+    finally:
+        unsubscribe(subscriber)
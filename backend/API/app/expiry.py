@@ -0,0 +1,83 @@
+"""
+Expiration des services (ActualOrders) par le planificateur (scheduler.py).
+
+Un service Delivered dont EndedAt est passé devient Finished, ainsi que la commande
+Orders qui l'a créé : les lectures filtrent ensuite sur le statut stocké. Traitement
+par lots de EXPIRY_BATCH_SIZE lignes, une transaction courte par lot, via l'index
+(Status, EndedAt). La synthèse CustomerStats n'a rien à faire : un service échu
+en sort déjà via NextExpiryAt, et Delivered -> Finished ne change pas le total dépensé.
+"""
+import time
+
+from app import events
+
+# Lot de services échus (requête vérifiée par `python migrate.py check`)
+DUE_SERVICES_SQL = """
+    SELECT ID, CustomerID, ProductID, OrderID FROM ActualOrders
+    WHERE Status = 'Delivered' AND EndedAt < NOW()
+    ORDER BY EndedAt
+    LIMIT %s
+    FOR UPDATE
+"""
+
+# Commande d'un service antérieur à OrderID : rapprochement par client et produit
+FINISH_LEGACY_ORDER_SQL = """
+    UPDATE Orders SET Status = 'Finished'
+    WHERE CustomerID = %s AND ProductID = %s AND Status = 'Delivered'
+    ORDER BY OrderDate
+    LIMIT 1
+"""
+
+DUE_COUNT_SQL = "SELECT COUNT(*) AS Due FROM ActualOrders WHERE Status = 'Delivered' AND EndedAt < NOW()"
+
+
+def expire_batch(conn, batch_size):
+    """Termine au plus `batch_size` services échus ; renvoie le nombre traité"""
+    with conn.cursor() as cursor:
+        cursor.execute(DUE_SERVICES_SQL, (batch_size,))
+        services = cursor.fetchall()
+        if not services:
+            conn.commit()
+            return 0
+
+        placeholders = ", ".join(["%s"] * len(services))
+        cursor.execute(
+            f"UPDATE ActualOrders SET Status = 'Finished' WHERE ID IN ({placeholders})",
+            [s['ID'] for s in services]
+        )
+        events.publish_services(cursor, "service.updated", [s['ID'] for s in services])
+
+        order_ids = [s['OrderID'] for s in services if s['OrderID'] is not None]
+        if order_ids:
+            placeholders = ", ".join(["%s"] * len(order_ids))
+            cursor.execute(
+                f"UPDATE Orders SET Status = 'Finished' WHERE Status = 'Delivered' AND ID IN ({placeholders})",
+                order_ids
+            )
+        # Services antérieurs à OrderID : même rapprochement que /orders/actual/terminate
+        for s in services:
+            if s['OrderID'] is None:
+                cursor.execute(FINISH_LEGACY_ORDER_SQL, (s['CustomerID'], s['ProductID']))
+    conn.commit()
+    return len(services)
+
+
+def expire_services(conn, config, dry_run=False):
+    """Tâche du planificateur : enchaîne les lots jusqu'à épuisement"""
+    if dry_run:
+        with conn.cursor() as cursor:
+            cursor.execute(DUE_COUNT_SQL)
+            due = cursor.fetchone()['Due']
+        conn.commit()
+        return {"expired": due, "dry_run": True}
+
+    batch_size = config.get("EXPIRY_BATCH_SIZE", 500)
+    pause = config.get("SCHEDULER_BATCH_PAUSE", 0.05)
+    total = 0
+    while True:
+        count = expire_batch(conn, batch_size)
+        total += count
+        if count < batch_size:
+            return {"expired": total}
+        # Laisse passer les requêtes des routes entre deux lots
+        time.sleep(pause)
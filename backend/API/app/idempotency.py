@@ -0,0 +1,154 @@
+"""
+En-tête Idempotency-Key sur les routes POST qui créent des lignes (commandes,
+validations, inscriptions).
+
+La première requête portant une clé est exécutée normalement, puis sa réponse
+(code, type, corps) est conservée IDEMPOTENCY_TTL secondes dans IdempotencyKeys,
+partagée entre workers. Une nouvelle tentative avec la même clé reçoit cette
+réponse telle quelle (en-tête Idempotent-Replayed: true) sans rien réexécuter.
+Pendant que la première requête est en cours, un doublon attend sur un verrou
+MySQL (GET_LOCK) au nom de la clé, au plus IDEMPOTENCY_WAIT secondes, au lieu
+de s'exécuter en parallèle. Les réponses 5xx et 429 ne sont pas conservées :
+la requête reste rejouable.
+
+La ligne de la clé est insérée « en cours » (Status = 0) avant la route, sans
+commit : elle est validée avec les écritures de la route, puis complétée par la
+réponse. Si le worker meurt entre les deux, la clé reste en cours et une nouvelle
+tentative reçoit 409 au lieu de réexécuter un travail déjà validé.
+"""
+import hashlib
+import time
+from functools import wraps
+
+import pymysql
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt
+
+from app.db import get_db
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Status d'une clé dont la route a validé son travail sans que la réponse soit conservée
+IN_PROGRESS = 0
+
+# Requêtes vérifiées par `python migrate.py check`
+LOOKUP_SQL = """
+    SELECT RequestHash, Status, ContentType, Body FROM IdempotencyKeys
+    WHERE KeyHash = %s AND ExpiresAt > %s
+"""
+PURGE_SQL = "DELETE FROM IdempotencyKeys WHERE ExpiresAt <= %s LIMIT 1000"
+
+_purged_at = 0.0
+
+
+def _principal():
+    """Compte de la requête (JWT déjà vérifié par la route) ; anonyme pour les routes publiques"""
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        return "anonymous"
+    return f"{claims.get('kind', '')}:{claims.get('sub')}"
+
+
+def _key_hash(key):
+    # Même clé sur deux routes ou par deux comptes : deux entrées distinctes
+    scope = f"{_principal()}\n{request.method} {request.path}\n{key}"
+    return hashlib.sha256(scope.encode("utf-8")).digest()
+
+
+def _purge(cursor, now):
+    global _purged_at
+    if now - _purged_at < current_app.config.get("IDEMPOTENCY_PURGE_INTERVAL", 300):
+        return
+    cursor.execute(PURGE_SQL, (now,))
+    _purged_at = now
+
+
+def _replay(entry, request_hash):
+    if entry['RequestHash'] != request_hash:
+        return jsonify({"error": "Idempotency-Key déjà utilisée pour une autre requête"}), 422
+    if entry['Status'] == IN_PROGRESS:
+        return jsonify({"error": "Requête déjà exécutée avec cette Idempotency-Key, réponse indisponible"}), 409
+    response = current_app.response_class(bytes(entry['Body']), status=entry['Status'],
+                                          content_type=entry['ContentType'])
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _release(conn, lock):
+    # Verrou lié à la session MySQL : à libérer avant de rendre la connexion au pool.
+    # Connexion perdue : le verrou est parti avec la session, l'erreur de la route prime
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+    except pymysql.MySQLError:
+        pass
+
+
+def idempotent(view):
+    """À placer sous @jwt_required / @staff_required : la clé est propre à chaque compte"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{HEADER} invalide (1 à {MAX_KEY_LENGTH} caractères)"}), 400
+
+        key_hash = _key_hash(key)
+        request_hash = hashlib.sha256(request.get_data()).digest()
+        lock = "hostos:idem:" + key_hash.hex()[:48]
+        conn = get_db()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS Acquired",
+                           (lock, current_app.config.get("IDEMPOTENCY_WAIT", 10)))
+            if not cursor.fetchone()['Acquired']:
+                response = jsonify({"error": "Une requête avec cette Idempotency-Key est encore en cours"})
+                response.headers["Retry-After"] = "1"
+                return response, 409
+
+        try:
+            # Nouvelle transaction : la lecture doit voir la réponse validée par la requête
+            # qui détenait le verrou, pas un instantané pris avant de l'attendre
+            conn.commit()
+            now = int(time.time())
+            expires_at = now + current_app.config.get("IDEMPOTENCY_TTL", 86400)
+            with conn.cursor() as cursor:
+                cursor.execute(LOOKUP_SQL, (key_hash, now))
+                entry = cursor.fetchone()
+                if entry:
+                    return _replay(entry, request_hash)
+
+                # Clé « en cours », validée par le commit de la route avec ses écritures
+                # (REPLACE : une entrée expirée pas encore purgée est écrasée)
+                cursor.execute("""
+                    REPLACE INTO IdempotencyKeys (KeyHash, RequestHash, Status, ContentType, Body, ExpiresAt)
+                    VALUES (%s, %s, %s, '', '', %s)
+                """, (key_hash, request_hash, IN_PROGRESS, expires_at))
+
+            response = make_response(view(*args, **kwargs))
+
+            # Ce que la route aurait laissé en cours est abandonné (dont la clé si elle n'a rien validé)
+            conn.rollback()
+            with conn.cursor() as cursor:
+                if response.status_code >= 500 or response.status_code == 429:
+                    # Réponse non conservée : la requête reste rejouable
+                    cursor.execute("DELETE FROM IdempotencyKeys WHERE KeyHash = %s AND Status = %s",
+                                   (key_hash, IN_PROGRESS))
+                else:
+                    cursor.execute("""
+                        INSERT INTO IdempotencyKeys (KeyHash, RequestHash, Status, ContentType, Body, ExpiresAt)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE RequestHash = VALUES(RequestHash), Status = VALUES(Status),
+                            ContentType = VALUES(ContentType), Body = VALUES(Body), ExpiresAt = VALUES(ExpiresAt)
+                    """, (key_hash, request_hash, response.status_code, response.content_type,
+                          response.get_data(), expires_at))
+                    _purge(cursor, now)
+            conn.commit()
+            return response
+        finally:
+            _release(conn, lock)
+
+    return wrapper
@@ -0,0 +1,69 @@
+"""
+Sérialisation JSON des réponses (jsonify) : orjson si disponible, sinon la
+bibliothèque standard. Les dates (format de l'API, 'YYYY-MM-DD HH:MM:SS') et les
+Decimal de PyMySQL (en float) sont convertis pendant l'encodage : les routes
+renvoient les lignes de fetchall() telles quelles, sans boucle de mise en forme.
+"""
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : encodeur standard
+    orjson = None
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def encode_value(value):
+    """Types renvoyés par PyMySQL que JSON ne connaît pas"""
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=encode_value, option=_OPTIONS)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps_bytes(obj):
+        return json.dumps(obj, default=encode_value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Fournisseur JSON de l'application (app.json), utilisé par jsonify et request.json"""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,116 @@
+"""
+Métriques Prometheus exposées sur /metrics : latence, requêtes en cours et codes
+de réponse par route, nombre de requêtes SQL et temps passé en base par requête HTTP.
+
+Sous gunicorn, définir PROMETHEUS_MULTIPROC_DIR (répertoire vide au démarrage) :
+chaque worker écrit ses compteurs dans ses propres fichiers mmap, sans verrou
+partagé entre processus, et /metrics agrège tous les workers quel que soit celui
+qui répond. gunicorn.conf.py marque morts les fichiers des workers arrêtés.
+Sans prometheus_client installé, l'instrumentation est désactivée.
+
+Accès réservé : jeton METRICS_TOKEN (Bearer) s'il est défini, sinon adresses
+METRICS_ALLOWED_IPS (par défaut la machine elle-même).
+"""
+import hmac
+import os
+import time
+
+from flask import Response, current_app, g, has_request_context, jsonify, request
+
+from app.db import on_query
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram, multiprocess
+except ImportError:  # dépendance optionnelle : pas de /metrics
+    prometheus_client = None
+
+# Route non reconnue (404) : un seul libellé, pour ne pas créer une série par URL
+UNMATCHED = "unmatched"
+
+if prometheus_client is not None:
+    REQUEST_SECONDS = Histogram(
+        "hostos_request_duration_seconds", "Durée de traitement des requêtes HTTP",
+        ["endpoint", "method"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    )
+    REQUESTS = Counter(
+        "hostos_requests", "Requêtes HTTP traitées", ["endpoint", "method", "status"],
+    )
+    IN_FLIGHT = Gauge(
+        "hostos_requests_in_flight", "Requêtes HTTP en cours", ["endpoint"],
+        multiprocess_mode="livesum",
+    )
+    DB_QUERIES = Histogram(
+        "hostos_request_db_queries", "Requêtes SQL exécutées par requête HTTP", ["endpoint"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+    )
+    DB_SECONDS = Histogram(
+        "hostos_request_db_seconds", "Temps passé en base par requête HTTP", ["endpoint"],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+
+
+def _count_query(sql, args, seconds, rowcount):
+    # Cumul dans flask.g : une requête HTTP n'est servie que par un thread
+    if has_request_context() and "metrics_started" in g:
+        g.metrics_queries += 1
+        g.metrics_db_seconds += seconds
+
+
+def _endpoint():
+    return request.endpoint or UNMATCHED
+
+
+def _allowed():
+    config = current_app.config
+    token = config.get("METRICS_TOKEN")
+    if token:
+        expected = f"Bearer {token}".encode("utf-8")
+        return hmac.compare_digest(request.headers.get("Authorization", "").encode("utf-8"), expected)
+    return request.remote_addr in config.get("METRICS_ALLOWED_IPS", ())
+
+
+def render():
+    if not _allowed():
+        return jsonify({"error": "Accès interdit"}), 403
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    if prometheus_client is None or not app.config.get("METRICS_ENABLED", True):
+        return
+
+    on_query(_count_query)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+        IN_FLIGHT.labels(_endpoint()).inc()
+
+    @app.after_request
+    def record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(exc=None):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        endpoint = _endpoint()
+        IN_FLIGHT.labels(endpoint).dec()
+        REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(endpoint, request.method, str(g.get("metrics_status", 500))).inc()
+        DB_QUERIES.labels(endpoint).observe(g.metrics_queries)
+        DB_SECONDS.labels(endpoint).observe(g.metrics_db_seconds)
+
+    # Pas de JWT : /metrics est lu par Prometheus, avec METRICS_TOKEN ou depuis METRICS_ALLOWED_IPS
+    app.add_url_rule("/metrics", "metrics", render)
@@ -0,0 +1,154 @@
+"""
+Passage de commande (/orders/create) : réservation du stock et prix figé dans une
+seule transaction courte, sur la connexion de la requête.
+
+Le stock est d'abord décrémenté par un UPDATE conditionnel (StockQuantity > 0) :
+la ligne Products reste verrouillée jusqu'au commit, les acheteurs concurrents d'un
+même produit passent l'un après l'autre et aucun ne peut survendre. Un stock NULL
+est illimité : rien n'est réservé. La commande est ensuite insérée par INSERT ...
+SELECT, avec le prix lu sur la ligne Products et l'existence du client vérifiée
+par la jointure. Un interblocage ou un délai d'attente de verrou dépassé rejoue la
+transaction, au plus ORDER_RETRIES fois.
+
+L'unité réservée (Orders.StockReserved) est rendue au produit par release_stock,
+dans la transaction de la validation, si la commande quitte Pending / Processing
+sans être livrée (annulée, close). À la livraison, consume_stock efface la
+réservation : l'unité est consommée, un changement de statut ultérieur ne la rend pas.
+"""
+import random
+import time
+from collections import Counter
+
+import pymysql
+
+from app import catalog_cache, customer_stats, events
+
+# Erreurs MySQL rejouables : délai d'attente de verrou dépassé, interblocage
+RETRYABLE_ERRORS = (1205, 1213)
+
+
+class OrderRejected(Exception):
+    """Commande refusée (produit ou client inconnu, rupture de stock)"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class OrderContention(Exception):
+    """Verrou toujours en conflit après ORDER_RETRIES nouvelles tentatives (renvoyé en 503)"""
+
+
+# Statuts dans lesquels une commande garde son unité de stock réservée
+RESERVING_STATUSES = ("Pending", "Processing")
+
+# Requêtes vérifiées par `python migrate.py check` ({placeholders} : un %s par commande)
+RESERVE_SQL = """
+    UPDATE Products SET StockQuantity = LAST_INSERT_ID(StockQuantity - 1)
+    WHERE ID = %s AND StockQuantity > 0
+"""
+
+RESERVED_ORDERS_SQL = """
+    SELECT ID, ProductID FROM Orders
+    WHERE ID IN ({placeholders}) AND StockReserved = 1
+    FOR UPDATE
+"""
+
+CONSUME_SQL = "UPDATE Orders SET StockReserved = 0 WHERE ID IN ({placeholders}) AND StockReserved = 1"
+
+
+def reserve_and_insert(cursor, customer_id, product_id):
+    """
+    Une tentative, dans la transaction en cours ;
+    renvoie (ID de la commande, stock restant ou None si illimité)
+    """
+    # LAST_INSERT_ID(expr) fait remonter le stock restant dans la réponse de l'UPDATE
+    # (cursor.lastrowid) : pas de SELECT supplémentaire pendant que la ligne est verrouillée
+    cursor.execute(RESERVE_SQL, (product_id,))
+    if cursor.rowcount:
+        remaining = cursor.lastrowid
+    else:
+        cursor.execute("SELECT StockQuantity FROM Products WHERE ID = %s", (product_id,))
+        product = cursor.fetchone()
+        if product is None:
+            raise OrderRejected("Produit non trouvé", 404)
+        if product['StockQuantity'] is not None:
+            raise OrderRejected("Produit en rupture de stock", 409)
+        remaining = None
+
+    cursor.execute("""
+        INSERT INTO Orders (CustomerID, ProductID, Status, TotalAmount, StockReserved)
+        SELECT c.ID, p.ID, 'Pending', p.Price, %s
+        FROM Customers c JOIN Products p ON p.ID = %s
+        WHERE c.ID = %s
+    """, (remaining is not None, product_id, customer_id))
+    if cursor.rowcount == 0:
+        raise OrderRejected(f"Le client ID {customer_id} n'existe pas", 404)
+    order_id = cursor.lastrowid
+
+    customer_stats.apply_delta(cursor, customer_id, pending=1)
+    events.publish_orders(cursor, "order.created", [order_id])
+    if remaining == 0:
+        # Le catalogue en cache n'est invalidé qu'à l'épuisement du stock (pas à chaque vente)
+        catalog_cache.bump(cursor)
+    return order_id, remaining
+
+
+def releases_stock(old_status, new_status):
+    """Commande qui quitte Pending / Processing sans être livrée"""
+    return (old_status in RESERVING_STATUSES
+            and new_status not in RESERVING_STATUSES and new_status != "Delivered")
+
+
+def consume_stock(cursor, order_ids):
+    """Commandes livrées : l'unité réservée est consommée, il n'y a plus rien à rendre"""
+    if not order_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(CONSUME_SQL.format(placeholders=placeholders), tuple(order_ids))
+
+
+def release_stock(cursor, order_ids):
+    """
+    Rend au produit l'unité réservée par chaque commande (dans la transaction en cours).
+    Seules les commandes encore marquées StockReserved comptent : rejouer ne rend rien deux fois.
+    """
+    if not order_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(RESERVED_ORDERS_SQL.format(placeholders=placeholders), tuple(order_ids))
+    reserved = cursor.fetchall()
+    if not reserved:
+        return 0
+
+    placeholders = ", ".join(["%s"] * len(reserved))
+    cursor.execute(f"UPDATE Orders SET StockReserved = 0 WHERE ID IN ({placeholders})",
+                   [o['ID'] for o in reserved])
+    # Produits dans un ordre fixe : deux validations simultanées ne s'interbloquent pas
+    for product_id, units in sorted(Counter(o['ProductID'] for o in reserved).items()):
+        cursor.execute("UPDATE Products SET StockQuantity = StockQuantity + %s WHERE ID = %s",
+                       (units, product_id))
+    # Un produit épuisé peut redevenir disponible : le catalogue en cache est invalidé
+    catalog_cache.bump(cursor)
+    return len(reserved)
+
+
+def place_order(conn, customer_id, product_id, retries=3, backoff=0.02):
+    """Crée une commande Pending et réserve une unité de stock ; renvoie (ID, stock restant)"""
+    for attempt in range(retries + 1):
+        try:
+            with conn.cursor() as cursor:
+                result = reserve_and_insert(cursor, customer_id, product_id)
+            conn.commit()
+            return result
+        except OrderRejected:
+            conn.rollback()
+            raise
+        except pymysql.err.OperationalError as e:
+            conn.rollback()
+            if e.args[0] not in RETRYABLE_ERRORS:
+                raise
+        # Attente aléatoire croissante : les perdants ne reviennent pas tous en même temps
+        if attempt < retries:
+            time.sleep(random.uniform(0, backoff * 2 ** attempt))
+    raise OrderContention()
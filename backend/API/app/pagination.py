@@ -0,0 +1,147 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app, jsonify, request
+
+
+class PaginationError(ValueError):
+    """Paramètre de pagination ou de filtre invalide (renvoyé en 400)"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    """Curseur opaque : valeurs de la clé de tri de la dernière ligne renvoyée"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise PaginationError("Curseur invalide")
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError("Curseur invalide")
+    return values
+
+
+def parse_datetime(value, end_of_day=False):
+    """Accepte 'YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM:SS'"""
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt == '%Y-%m-%d' and end_of_day:
+            parsed += timedelta(days=1, microseconds=-1)
+        return parsed
+    raise PaginationError(f"Date invalide : {value}")
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise PaginationError(f"Entier invalide : {value}")
+
+
+def add_filters(where, params, filters):
+    """
+    Ajoute à `where` / `params` les filtres présents dans la query string.
+    `filters` : {nom du paramètre: (expression SQL avec %s, conversion)}
+    """
+    for arg, (clause, convert) in filters.items():
+        value = request.args.get(arg)
+        if value is None or value == '':
+            continue
+        where.append(clause)
+        params.append(convert(value))
+
+
+def where_sql(where):
+    """Clause WHERE des conditions accumulées par add_filters / Keyset.apply (vide s'il n'y en a pas)"""
+    return "WHERE " + " AND ".join(where) if where else ""
+
+
+class Keyset:
+    """
+    Pagination par curseur (keyset) : pas d'OFFSET, chaque page reprend strictement
+    après la dernière clé renvoyée, ce qui reste un simple parcours d'index.
+    `keys` : [(colonne SQL, nom de la colonne dans la ligne renvoyée), ...]
+    la dernière clé doit être unique (l'ID) pour départager les ex aequo.
+    """
+
+    def __init__(self, keys, descending=False):
+        self.keys = keys
+        order = request.args.get('order')
+        if order not in (None, '', 'asc', 'desc'):
+            raise PaginationError("order doit valoir 'asc' ou 'desc'")
+        self.descending = order == 'desc' if order else descending
+
+        default_limit = current_app.config.get("PAGE_DEFAULT_LIMIT", 100)
+        max_limit = current_app.config.get("PAGE_MAX_LIMIT", 500)
+        limit = parse_int(request.args.get('limit', default_limit))
+        if limit < 1:
+            raise PaginationError("limit doit être positif")
+        self.limit = min(limit, max_limit)
+
+        token = request.args.get('cursor')
+        self.after = decode_cursor(token, len(keys)) if token else None
+
+    def apply(self, where, params):
+        """Ajoute la condition « après le curseur » sous forme développée (utilisable par l'index)"""
+        if self.after is None:
+            return
+        op = '<' if self.descending else '>'
+        columns = [column for column, _ in self.keys]
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [f"{c} = %s" for c in columns[:i]]
+            clauses.append("(" + " AND ".join(equal + [f"{column} {op} %s"]) + ")")
+            params.extend(self.after[:i] + [self.after[i]])
+        where.append("(" + " OR ".join(clauses) + ")")
+
+    @property
+    def order_by(self):
+        direction = 'DESC' if self.descending else 'ASC'
+        return ", ".join(f"{column} {direction}" for column, _ in self.keys)
+
+    @property
+    def fetch_size(self):
+        # Une ligne de plus que la page pour savoir s'il en reste
+        return self.limit + 1
+
+    def split(self, rows):
+        """Coupe la ligne sentinelle et calcule le curseur de la page suivante"""
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return rows, encode_cursor([last[name] for _, name in self.keys])
+
+
+def paginated_response(items, next_cursor):
+    """
+    Le corps reste un tableau JSON (compatible avec le front actuel),
+    le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
+    """
+    response = jsonify(items)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+def init_app(app):
+    @app.errorhandler(PaginationError)
+    def pagination_error(e):
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,123 @@
+"""
+Hachage bcrypt déporté dans un pool de processus borné.
+
+Un hashpw / checkpw coûte ~250 ms de CPU au coût 12 : exécuté dans le worker gunicorn,
+une rafale de connexions affame toutes les autres routes. Ici le calcul part dans
+BCRYPT_WORKERS processus ; au-delà de BCRYPT_MAX_PENDING opérations en cours ou en
+attente, on répond tout de suite 503 plutôt que d'empiler la file.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+from flask import current_app, jsonify
+
+
+class HashingOverloaded(Exception):
+    """File de hachage pleine ou délai dépassé (renvoyé en 503)"""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+_executor = None
+_executor_pid = None
+_pending = 0
+_lock = threading.Lock()
+
+
+def _get_executor(config):
+    global _executor, _executor_pid
+    # Un pool par worker gunicorn, recréé après un fork ; créé sous verrou : les
+    # premières requêtes simultanées d'un worker ne lancent pas chacune le leur
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            context = multiprocessing.get_context(config.get("BCRYPT_START_METHOD", "forkserver"))
+            _executor = ProcessPoolExecutor(max_workers=config.get("BCRYPT_WORKERS", 2), mp_context=context)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _done(future):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _run(fn, *args):
+    global _pending
+    config = current_app.config
+    if not config.get("BCRYPT_WORKERS", 2):
+        return fn(*args)
+
+    with _lock:
+        if _pending >= config.get("BCRYPT_MAX_PENDING", 16):
+            raise HashingOverloaded()
+        _pending += 1
+    try:
+        future = _get_executor(config).submit(fn, *args)
+    except BaseException:
+        _done(None)
+        raise
+    # La place est libérée quand le calcul se termine (ou est annulé avant d'avoir démarré),
+    # pas au délai dépassé : un calcul en cours compte toujours dans BCRYPT_MAX_PENDING
+    future.add_done_callback(_done)
+    try:
+        return future.result(timeout=config.get("BCRYPT_TIMEOUT", 10))
+    except FutureTimeout:
+        future.cancel()
+        raise HashingOverloaded()
+
+
+def hash_password(password):
+    """Hash bcrypt (str) au coût BCRYPT_ROUNDS"""
+    return _run(_hashpw, password.encode('utf-8'), current_app.config.get("BCRYPT_ROUNDS", 12))
+
+
+def check_password(password, hashed):
+    try:
+        return _run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Hash stocké illisible : même réponse qu'un mauvais mot de passe
+        return False
+
+
+def needs_rehash(hashed):
+    """Vrai si le hash a été calculé avec un autre coût que BCRYPT_ROUNDS ($2b$<coût>$...)"""
+    try:
+        rounds = int(hashed.split('$')[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != current_app.config.get("BCRYPT_ROUNDS", 12)
+
+
+def rehash_if_needed(cursor, table, user_id, password, hashed):
+    """
+    Après une connexion réussie : recalcule le hash au coût courant si besoin,
+    pour ajuster BCRYPT_ROUNDS sans bloquer les comptes existants.
+    `table` est une constante du code appelant ('Customers' ou 'Staff').
+    """
+    if not needs_rehash(hashed):
+        return False
+    try:
+        new_hash = hash_password(password)
+    except HashingOverloaded:
+        # Pas grave : on réessaiera à la prochaine connexion
+        return False
+    cursor.execute(f"UPDATE {table} SET PasswordHash=%s WHERE ID=%s", (new_hash, user_id))
+    return True
+
+
+def init_app(app):
+    @app.errorhandler(HashingOverloaded)
+    def hashing_overloaded(e):
+        response = jsonify({"error": "Serveur surchargé, réessayez dans un instant"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
@@ -0,0 +1,122 @@
+"""
+Profilage des requêtes SQL, branché sur chaque curseur via db.on_query.
+
+Chaque requête est ramenée à une empreinte (littéraux, %s et listes IN / VALUES
+remplacés par ?), ce qui regroupe aussi les requêtes construites par f-string.
+Par empreinte : appels, lignes, temps total / max et p50 / p95 glissants sur les
+PROFILER_WINDOW dernières exécutions. Au-delà de SLOW_QUERY_THRESHOLD secondes,
+la requête est journalisée avec sa route et la forme de ses paramètres.
+Statistiques propres au worker qui les a mesurées (rapport : /admin/queries).
+"""
+import logging
+import os
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+
+from flask import has_request_context, request
+
+from app.db import on_query
+
+logger = logging.getLogger("hostos.slow_queries")
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+_LIST = re.compile(r"\b(IN|VALUES)\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ROWS = re.compile(r"(VALUES \(\?\+\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+", re.IGNORECASE)
+
+_stats = {}
+_lock = threading.Lock()
+_settings = {"window": 500, "threshold": 0.2}
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Forme normalisée d'une requête : même empreinte quels que soient les valeurs et le nombre d'IDs"""
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip().rstrip(";")
+    sql = _LIST.sub(r"\1 (?+)", sql)
+    return _ROWS.sub(r"\1", sql)
+
+
+def params_shape(args):
+    """Types des paramètres, sans leurs valeurs (journal des requêtes lentes)"""
+    if args is None:
+        return []
+    if isinstance(args, dict):
+        return sorted(args)
+    if isinstance(args, (list, tuple)):
+        return [type(a).__name__ for a in args]
+    return [type(args).__name__]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _record(sql, args, seconds, rowcount):
+    key = fingerprint(sql)
+    route = request.endpoint if has_request_context() else None
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                "calls": 0, "rows": 0, "total": 0.0, "max": 0.0,
+                "recent": deque(maxlen=_settings["window"]), "routes": {},
+            }
+        entry["calls"] += 1
+        entry["rows"] += max(rowcount or 0, 0)
+        entry["total"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+        entry["recent"].append(seconds)
+        entry["routes"][route or "-"] = entry["routes"].get(route or "-", 0) + 1
+
+    if seconds >= _settings["threshold"]:
+        logger.warning(
+            "requête lente %.1f ms route=%s lignes=%s params=%s sql=%s",
+            seconds * 1000, route or "-", rowcount, params_shape(args), key,
+        )
+
+
+def report(sort="total", limit=50):
+    """Empreintes triées par `sort` (total, p95, max, calls ou rows), temps en millisecondes"""
+    with _lock:
+        snapshot = [(key, dict(entry, recent=sorted(entry["recent"]), routes=dict(entry["routes"])))
+                    for key, entry in _stats.items()]
+
+    rows = []
+    for key, entry in snapshot:
+        recent = entry["recent"]
+        rows.append({
+            "fingerprint": key,
+            "calls": entry["calls"],
+            "rows": entry["rows"],
+            "rows_per_call": round(entry["rows"] / entry["calls"], 1),
+            "total_ms": round(entry["total"] * 1000, 2),
+            "mean_ms": round(entry["total"] * 1000 / entry["calls"], 3),
+            "p50_ms": round(_percentile(recent, 0.5) * 1000, 3),
+            "p95_ms": round(_percentile(recent, 0.95) * 1000, 3),
+            "max_ms": round(entry["max"] * 1000, 3),
+            "routes": entry["routes"],
+        })
+    keys = {"total": "total_ms", "p95": "p95_ms", "max": "max_ms", "calls": "calls", "rows": "rows"}
+    rows.sort(key=lambda r: r[keys.get(sort, "total_ms")], reverse=True)
+    return {"worker": os.getpid(), "fingerprints": len(rows), "queries": rows[:limit]}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def init_app(app):
+    if not app.config.get("PROFILER_ENABLED", True):
+        return
+    _settings["window"] = app.config.get("PROFILER_WINDOW", 500)
+    _settings["threshold"] = app.config.get("SLOW_QUERY_THRESHOLD", 0.2)
+    on_query(_record)
@@ -0,0 +1,155 @@
+"""
+Limitation de débit par seaux à jetons, par adresse IP et par compte visé.
+
+Les routes d'authentification sont publiques et coûtent chacune un bcrypt : sans
+limite, un seul client sature le CPU de tous les workers. Les seaux sont partagés
+entre les workers gunicorn d'une même machine dans un fichier SQLite en mode WAL
+(une ligne par seau ; tous les seaux d'une requête lus et réécrits dans une seule
+transaction courte : une requête refusée par l'un d'eux ne débite aucun autre).
+
+Politiques par blueprint dans RATE_LIMITS, par exemple :
+    RATE_LIMITS = {"login": {"ip": (20, 10), "account": (5, 5)}}
+soit (rafale maximale, jetons regagnés par minute). Le compte visé est le champ
+Email du corps JSON. Au-delà : 429 avec Retry-After. Si le fichier SQLite est
+indisponible, la requête passe (la limite ne doit pas rendre l'API inaccessible).
+"""
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger("hostos.rate_limit")
+
+# Seaux inutilisés depuis plus longtemps que ça (secondes) : supprimés, ils sont pleins
+IDLE_SECONDS = 3600
+
+_local = threading.local()
+_purged_at = 0.0
+
+
+def _path(config):
+    return config.get("RATE_LIMIT_DB") or os.path.join(tempfile.gettempdir(), "hostos-ratelimit.sqlite3")
+
+
+def _connect(config):
+    """Connexion SQLite propre au thread (et recréée après un fork)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    conn = sqlite3.connect(_path(config), timeout=1, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Perdre quelques seaux lors d'un crash machine est sans importance
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Buckets (
+            Key TEXT PRIMARY KEY, Tokens REAL NOT NULL, UpdatedAt REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def take(conn, buckets, now):
+    """
+    Retire un jeton de chaque seau (clé, rafale, jetons / minute), en une transaction.
+    Si l'un d'eux est vide, aucun n'est débité ; renvoie 0 si accordé, sinon l'attente en secondes.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        levels, wait = [], 0
+        for key, capacity, per_minute in buckets:
+            rate = per_minute / 60
+            row = conn.execute("SELECT Tokens, UpdatedAt FROM Buckets WHERE Key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                wait = max(wait, math.ceil((1 - tokens) / rate))
+            levels.append((key, tokens))
+        for key, tokens in levels:
+            conn.execute("INSERT OR REPLACE INTO Buckets (Key, Tokens, UpdatedAt) VALUES (?, ?, ?)",
+                         (key, tokens if wait else tokens - 1, now))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return wait
+
+
+def _purge(conn, config, now):
+    global _purged_at
+    if now - _purged_at < config.get("RATE_LIMIT_PURGE_INTERVAL", 300):
+        return
+    _purged_at = now
+    conn.execute("DELETE FROM Buckets WHERE UpdatedAt < ?", (now - IDLE_SECONDS,))
+
+
+def client_ip(config):
+    """Adresse du client ; derrière RATE_LIMIT_PROXY_HOPS proxys de confiance, lue dans X-Forwarded-For"""
+    hops = config.get("RATE_LIMIT_PROXY_HOPS", 0)
+    route = request.access_route
+    if hops and len(route) > hops:
+        return route[-hops - 1]
+    return request.remote_addr or "-"
+
+
+def _account():
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("Email"), str) and data["Email"].strip():
+        return data["Email"].strip().lower()
+    return None
+
+
+def _keys(policy, config):
+    """(clé du seau, rafale, jetons / minute) pour chaque règle applicable à la requête"""
+    for scope, (capacity, per_minute) in policy.items():
+        value = client_ip(config) if scope == "ip" else _account()
+        if value is not None:
+            yield f"{request.blueprint}:{scope}:{value}", capacity, per_minute
+
+
+def validate_policies(policies):
+    """Erreur au démarrage plutôt qu'à la première requête : rafale >= 1 et débit > 0 par règle"""
+    for blueprint, policy in policies.items():
+        for scope, rule in policy.items():
+            if scope not in ("ip", "account"):
+                raise ValueError(f"RATE_LIMITS[{blueprint!r}] : règle {scope!r} inconnue (ip ou account)")
+            try:
+                capacity, per_minute = rule
+            except (TypeError, ValueError):
+                raise ValueError(f"RATE_LIMITS[{blueprint!r}][{scope!r}] doit valoir (rafale, jetons / minute)")
+            if not isinstance(capacity, (int, float)) or capacity < 1:
+                raise ValueError(f"RATE_LIMITS[{blueprint!r}][{scope!r}] : rafale >= 1 attendue")
+            if not isinstance(per_minute, (int, float)) or per_minute <= 0:
+                raise ValueError(f"RATE_LIMITS[{blueprint!r}][{scope!r}] : jetons / minute > 0 attendus")
+
+
+def init_app(app):
+    if not app.config.get("RATE_LIMIT_ENABLED", True):
+        return
+    validate_policies(app.config.get("RATE_LIMITS", {}))
+
+    @app.before_request
+    def limit():
+        config = current_app.config
+        policy = config.get("RATE_LIMITS", {}).get(request.blueprint)
+        if not policy or request.method == "OPTIONS":
+            return None
+
+        now = time.time()
+        try:
+            conn = _connect(config)
+            wait = take(conn, list(_keys(policy, config)), now)
+            _purge(conn, config, now)
+        except sqlite3.Error as e:
+            logger.warning("limitation de débit indisponible : %s", e)
+            return None
+
+        if wait:
+            response = jsonify({"error": "Trop de requêtes, réessayez plus tard"})
+            response.headers["Retry-After"] = str(wait)
+            return response, 429
+        return None
@@ -0,0 +1,95 @@
+"""
+Renouvellement des services arrivant à échéance (tâche renew-services de scheduler.py).
+
+Les services Delivered dont EndedAt tombe dans les RENEWAL_LEAD_DAYS jours sont
+parcourus par l'index (Status, EndedAt) en pagination keyset, sans verrou, par lots
+de RENEWAL_CHUNK_SIZE. Chaque lot crée ses commandes Pending (RecurentPrice) en un
+executemany, dans sa propre transaction. L'index unique (RenewalOf, RenewalPeriod)
+garantit une seule commande par service et par période, même si la tâche est relancée.
+Une commande de renouvellement validée prolonge le service existant (extend_service).
+"""
+import time
+from datetime import datetime, timedelta
+
+from app import customer_stats
+
+# Services à renouveler ({keyset} : reprise après la clé (EndedAt, ID) du lot précédent ;
+# requête vérifiée par `python migrate.py check`)
+DUE_RENEWALS_SQL = """
+    SELECT ao.ID, ao.CustomerID, ao.ProductID, ao.RecurentPrice, ao.EndedAt, o.ID AS RenewalID
+    FROM ActualOrders ao
+    LEFT JOIN Orders o ON o.RenewalOf = ao.ID AND o.RenewalPeriod = ao.EndedAt
+    WHERE ao.Status = 'Delivered' AND ao.EndedAt >= %s AND ao.EndedAt <= %s {keyset}
+    ORDER BY ao.EndedAt, ao.ID
+    LIMIT %s
+"""
+
+
+# Validation d'un renouvellement : commande de la période précédente close
+FINISH_PREVIOUS_ORDER_SQL = """
+    UPDATE Orders SET Status = 'Finished'
+    WHERE Status = 'Delivered' AND ID = (SELECT OrderID FROM ActualOrders WHERE ID = %s)
+"""
+
+
+def extend_service(cursor, service_id, order_id, days):
+    """Validation d'un renouvellement : prolonge le service et clôt la commande de la période précédente"""
+    cursor.execute(FINISH_PREVIOUS_ORDER_SQL, (service_id,))
+    cursor.execute("""
+        UPDATE ActualOrders
+        SET Status = 'Delivered', OrderID = %s, EndedAt = GREATEST(EndedAt, NOW()) + INTERVAL %s DAY
+        WHERE ID = %s
+    """, (order_id, days, service_id))
+    return cursor.rowcount > 0
+
+
+def _due_services(cursor, horizon, after, limit):
+    """Services à renouveler sans commande pour leur période, après la clé (EndedAt, ID) `after`"""
+    keyset, params = "", [datetime.now(), horizon]
+    if after:
+        keyset = "AND (ao.EndedAt > %s OR (ao.EndedAt = %s AND ao.ID > %s))"
+        params += [after[0], after[0], after[1]]
+    cursor.execute(DUE_RENEWALS_SQL.format(keyset=keyset), (*params, limit))
+    return cursor.fetchall()
+
+
+def renew_services(conn, config, dry_run=False):
+    """Tâche du planificateur ; renvoie les métriques de la passe"""
+    chunk_size = config.get("RENEWAL_CHUNK_SIZE", 1000)
+    pause = config.get("SCHEDULER_BATCH_PAUSE", 0.05)
+    horizon = datetime.now() + timedelta(days=config.get("RENEWAL_LEAD_DAYS", 7))
+    started = time.monotonic()
+    metrics = {"scanned": 0, "created": 0, "already_renewed": 0, "chunks": 0, "dry_run": dry_run}
+
+    after = None
+    while True:
+        with conn.cursor() as cursor:
+            services = _due_services(cursor, horizon, after, chunk_size)
+            if not services:
+                break
+            after = (services[-1]['EndedAt'], services[-1]['ID'])
+            due = [s for s in services if s['RenewalID'] is None]
+            metrics["scanned"] += len(services)
+            metrics["already_renewed"] += len(services) - len(due)
+            metrics["chunks"] += 1
+
+            if due and dry_run:
+                metrics["created"] += len(due)
+            elif due:
+                # Doublon (passe concurrente) : la ligne existante est conservée telle quelle
+                cursor.executemany("""
+                    INSERT INTO Orders (CustomerID, ProductID, Status, TotalAmount, RenewalOf, RenewalPeriod)
+                    VALUES (%s, %s, 'Pending', %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE ID = ID
+                """, [(s['CustomerID'], s['ProductID'], s['RecurentPrice'], s['ID'], s['EndedAt']) for s in due])
+                metrics["created"] += cursor.rowcount
+                customer_stats.refresh_many(cursor, sorted({s['CustomerID'] for s in due}))
+        conn.commit()
+        if len(services) < chunk_size:
+            break
+        time.sleep(pause)
+
+    elapsed = time.monotonic() - started
+    metrics["seconds"] = round(elapsed, 2)
+    metrics["per_second"] = round(metrics["scanned"] / elapsed, 1) if elapsed else metrics["scanned"]
+    return metrics
@@ -0,0 +1,82 @@
+"""
+Révocation des tokens (déconnexion), partagée entre tous les workers.
+
+Les JTI révoqués sont stockés dans RevokedTokens avec l'expiration du token.
+Chaque worker en garde une copie locale (dict JTI -> exp) : la vérification faite
+à chaque requête est une simple recherche en mémoire. La copie est complétée au
+plus toutes les REVOCATION_REFRESH secondes avec les révocations récentes, et les
+entrées dont le token a expiré sont purgées (en mémoire et en base).
+"""
+import threading
+import time
+
+from flask import current_app
+
+from app.db import get_db
+
+# Marge (secondes) sur la relecture incrémentale : couvre les transactions
+# validées juste après la lecture précédente et les petits écarts d'horloge
+_SLACK = 5
+
+# Premier chargement, relecture incrémentale et purge (requêtes vérifiées par `python migrate.py check`)
+ACTIVE_REVOCATIONS_SQL = "SELECT JTI, ExpiresAt FROM RevokedTokens WHERE ExpiresAt > %s"
+RECENT_REVOCATIONS_SQL = "SELECT JTI, ExpiresAt FROM RevokedTokens WHERE RevokedAt >= %s"
+PURGE_SQL = "DELETE FROM RevokedTokens WHERE ExpiresAt <= %s LIMIT 1000"
+
+_revoked = {}
+_loaded = False
+_refreshed_at = 0.0
+_purged_at = 0.0
+_lock = threading.Lock()
+
+
+def _refresh():
+    global _loaded, _refreshed_at, _purged_at
+    config = current_app.config
+    now = time.time()
+    if _loaded and now - _refreshed_at < config.get("REVOCATION_REFRESH", 1):
+        return
+
+    with _lock:
+        if _loaded and now - _refreshed_at < config.get("REVOCATION_REFRESH", 1):
+            return
+        conn = get_db()
+        with conn.cursor() as cursor:
+            if not _loaded:
+                # Premier chargement : toutes les révocations encore utiles
+                cursor.execute(ACTIVE_REVOCATIONS_SQL, (int(now),))
+            else:
+                cursor.execute(RECENT_REVOCATIONS_SQL, (int(_refreshed_at) - _SLACK,))
+            for row in cursor.fetchall():
+                _revoked[row['JTI']] = row['ExpiresAt']
+
+            if now - _purged_at >= config.get("REVOCATION_PURGE_INTERVAL", 300):
+                for jti in [j for j, exp in list(_revoked.items()) if exp <= now]:
+                    del _revoked[jti]
+                cursor.execute(PURGE_SQL, (int(now),))
+                conn.commit()
+                _purged_at = now
+        _loaded = True
+        _refreshed_at = now
+
+
+def is_revoked(jti):
+    _refresh()
+    return jti in _revoked
+
+
+def revoke(cursor, jti, expires_at):
+    """Enregistre la révocation (à valider par l'appelant) ; effet immédiat dans ce worker"""
+    cursor.execute("""
+        INSERT INTO RevokedTokens (JTI, RevokedAt, ExpiresAt) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE RevokedAt = VALUES(RevokedAt)
+    """, (jti, int(time.time()), expires_at))
+    # Sous verrou : _refresh parcourt le dictionnaire pour la purge
+    with _lock:
+        _revoked[jti] = expires_at
+
+
+def init_app(app, jwt):
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return is_revoked(jwt_payload["jti"])
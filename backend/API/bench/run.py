@@ -0,0 +1,272 @@
+"""
+Test de charge de l'API sur une base seedée par bench.seed.
+
+    python -m bench.run --url http://127.0.0.1:8000 --clients 64 --duration 60
+    python -m bench.run --baseline bench-main.json --max-regression 0.2   # code retour 1 si régression
+    python -m bench.run --mix launch=1 --clients 300 --launch-stock 5000  # lancement : tous sur un produit
+
+Chaque client (un thread, une session HTTP keep-alive) se connecte avec un compte
+bench<N>@example.test avant la mesure, puis enchaîne les scénarios de --mix tirés au
+hasard selon leurs poids. Les connexions refusées par la limitation de débit (429)
+sont rejouées après Retry-After pendant --login-timeout secondes ; au-delà, le test
+s'arrête : lancer l'API de test avec RATE_LIMITS["login"] relevé (ou
+RATE_LIMIT_ENABLED = False) pour plus de clients que la rafale autorisée. Le résultat (JSON) donne par route : requêtes, erreurs, refus 409
+(rupture de stock), req/s, p50, p90, p99 et max en millisecondes. Les mesures de la
+période --warmup sont ignorées. Le scénario launch commande toujours le même produit
+(le premier du catalogue, remis à --launch-stock unités avant la mesure) : contention
+maximale sur une ligne Products, la fin de stock doit donner des 409, jamais de survente.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from bench.seed import ADMIN_EMAIL, BENCH_PASSWORD, customer_email
+
+DEFAULT_MIX = "login=5,products=25,stats=25,my_orders=20,pending=10,create=5"
+
+
+class Client:
+    def __init__(self, base_url, customers, products, admin_token, rng):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.customers = customers
+        self.products = products
+        self.admin_token = admin_token
+        self.rng = rng
+        self.token = None
+
+    def call(self, method, path, token=None, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return self.session.request(method, self.base_url + path, headers=headers, timeout=30, **kwargs)
+
+    def login(self):
+        email = customer_email(self.rng.randint(1, self.customers))
+        response = self.call("POST", "/auth/login", json={"Email": email, "Password": BENCH_PASSWORD})
+        if response.ok:
+            self.token = response.json()["access_token"]
+        return response
+
+    def sign_in(self, deadline):
+        """Connexion avant la mesure : sur 429, attend Retry-After tant que `deadline` le permet"""
+        while True:
+            response = self.login()
+            if response.status_code != 429:
+                return response
+            wait = int(response.headers.get("Retry-After", 1))
+            if time.monotonic() + wait > deadline:
+                return response
+            time.sleep(wait)
+
+    # Scénarios : nom -> requête ; chacun renvoie la réponse HTTP
+    def products_list(self):
+        return self.call("GET", "/products/list", self.token)
+
+    def stats(self):
+        return self.call("GET", "/me/stats", self.token)
+
+    def my_orders(self):
+        return self.call("GET", "/me/my-orders?limit=20", self.token)
+
+    def pending(self):
+        return self.call("GET", "/orders/list/pending?limit=50", self.admin_token)
+
+    def create(self):
+        return self.call("POST", "/orders/create", self.token, json={"ProductID": self.rng.choice(self.products)})
+
+    def launch(self):
+        return self.call("POST", "/orders/create", self.token, json={"ProductID": self.products[0]})
+
+
+SCENARIOS = {
+    "login": Client.login,
+    "products": Client.products_list,
+    "stats": Client.stats,
+    "my_orders": Client.my_orders,
+    "pending": Client.pending,
+    "create": Client.create,
+    "launch": Client.launch,
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Scénario inconnu : {name} (disponibles : {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(samples, seconds):
+    """samples : {scénario: [(latence s, code HTTP), ...]}"""
+    endpoints = {}
+    for name, values in sorted(samples.items()):
+        if not values:
+            continue
+        latencies = sorted(latency for latency, _ in values)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": sum(1 for _, status in values if status >= 400 and status != 409),
+            "conflicts": sum(1 for _, status in values if status == 409),
+            "rps": round(len(values) / seconds, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return endpoints, {"requests": total, "rps": round(total / seconds, 1),
+                       "errors": sum(e["errors"] for e in endpoints.values())}
+
+
+def compare(result, baseline, max_regression):
+    """Régressions par rapport à un résultat précédent : p99 plus lent ou débit plus faible"""
+    regressions = []
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        if current["p99_ms"] > previous["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{name} : p99 {previous['p99_ms']} -> {current['p99_ms']} ms")
+        if current["rps"] < previous["rps"] * (1 - max_regression):
+            regressions.append(f"{name} : {previous['rps']} -> {current['rps']} req/s")
+    return regressions
+
+
+def expect_ok(response, what):
+    """Préparation du test : une réponse en erreur arrête tout, avec le corps renvoyé par l'API"""
+    if not response.ok:
+        raise SystemExit(f"{what} : HTTP {response.status_code} {response.text[:300]}")
+    return response
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+
+    session = requests.Session()
+    response = expect_ok(session.post(args.url.rstrip("/") + "/auth/admin/login",
+                                      json={"Email": ADMIN_EMAIL, "Password": BENCH_PASSWORD}, timeout=30),
+                         "Connexion admin (lancer bench/seed.py ?)")
+    admin_token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = expect_ok(session.get(args.url.rstrip("/") + "/products/list?limit=500", headers=headers, timeout=30),
+                         "Liste des produits")
+    products = [p["ID"] for p in response.json()]
+    if not products:
+        raise SystemExit("Aucun produit en base (lancer bench/seed.py)")
+    if "launch" in mix:
+        expect_ok(session.patch(args.url.rstrip("/") + f"/products/admin/edit/{products[0]}",
+                                json={"StockQuantity": args.launch_stock}, headers=headers, timeout=30),
+                  "Stock du produit de lancement")
+    # Tous les clients se connectent avant la mesure : un client sans token fausserait
+    # les routes mesurées (401), et la limitation des connexions ne pèse pas sur les chiffres
+    clients = [Client(args.url, args.customers, products, admin_token, random.Random(args.seed + number))
+               for number in range(args.clients)]
+    logins = [None] * len(clients)
+    deadline = time.monotonic() + args.login_timeout
+
+    def sign_in(number):
+        try:
+            logins[number] = clients[number].sign_in(deadline)
+        except requests.RequestException as e:
+            logins[number] = e
+
+    threads = [threading.Thread(target=sign_in, args=(i,), daemon=True) for i in range(len(clients))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    failed = [r for r in logins if not isinstance(r, requests.Response) or not r.ok]
+    if failed:
+        first = failed[0]
+        detail = f"HTTP {first.status_code} {first.text[:300]}" if isinstance(first, requests.Response) else str(first)
+        raise SystemExit(f"Connexion client : {len(failed)}/{len(clients)} en échec ({detail}) ; "
+                         "relever RATE_LIMITS['login'] de l'API de test ou --login-timeout")
+
+    samples = {name: [] for name in names}
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    def worker(client):
+        local = {name: [] for name in names}
+        while time.monotonic() < stop_at:
+            name = client.rng.choices(names, weights)[0]
+            before = time.monotonic()
+            try:
+                status = SCENARIOS[name](client).status_code
+            except requests.RequestException:
+                status = 599
+            if before >= measure_from:
+                local[name].append((time.monotonic() - before, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(client,), daemon=True) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    endpoints, total = summarize(samples, args.duration)
+    return {
+        "started_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "config": {"url": args.url, "clients": args.clients, "duration": args.duration,
+                   "warmup": args.warmup, "mix": mix, "seed": args.seed,
+                   "launch_stock": args.launch_stock if "launch" in mix else None},
+        "total": total,
+        "endpoints": endpoints,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Test de charge des routes de l'API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API (bind de gunicorn.conf.py par défaut)")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60, help="secondes mesurées")
+    parser.add_argument("--warmup", type=float, default=5, help="secondes ignorées au début")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scénario=poids,... (" + ", ".join(SCENARIOS) + ")")
+    parser.add_argument("--customers", type=int, default=10000, help="nombre de clients seedés")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--login-timeout", type=float, default=120,
+                        help="secondes max pour connecter tous les clients (429 rejoués)")
+    parser.add_argument("--launch-stock", type=int, default=1000, help="stock du produit du scénario launch")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="résultat précédent à comparer")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    result = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    for name, e in result["endpoints"].items():
+        print(f"{name:10} {e['requests']:7} req  {e['rps']:8} req/s  p50 {e['p50_ms']:8} ms  "
+              f"p99 {e['p99_ms']:8} ms  erreurs {e['errors']}  409 {e['conflicts']}")
+    print(f"Total : {result['total']['rps']} req/s, résultat écrit dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        for line in regressions:
+            print("RÉGRESSION", line)
+        sys.exit(1 if regressions else 0)
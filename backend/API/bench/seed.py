@@ -0,0 +1,150 @@
+"""
+Jeu de données synthétique pour les benchmarks (base MySQL / MariaDB locale, jamais la production).
+
+    python -m bench.seed                                   # volumes par défaut
+    python -m bench.seed --customers 100000 --orders 1000000 --services 200000
+
+À lancer depuis backend/API, sur une base créée avec hostosdb_template.sql puis
+`python migrate.py up`. Les tables Customers, Orders et ActualOrders doivent être
+vides. Tous les comptes créés ont le mot de passe BENCH_PASSWORD. Les clients sont
+bench<N>@example.test, l'administrateur est bench-admin@example.test.
+Génération déterministe (--seed) : deux bases seedées pareil donnent les mêmes lignes.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.db import get_db
+from app.passwords import hash_password
+from app import catalog_cache, customer_stats
+
+BENCH_PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "bench-admin@example.test"
+
+# Répartition des statuts des commandes historiques
+ORDER_STATUSES = [("Finished", 60), ("Delivered", 30), ("Pending", 5), ("Processing", 5)]
+
+
+def customer_email(number):
+    return f"bench{number}@example.test"
+
+
+def insert_chunks(conn, sql, rows, chunk_size):
+    """executemany par lots (un INSERT multi-lignes par lot), un commit par lot"""
+    total, chunk = 0, []
+    with conn.cursor() as cursor:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                cursor.executemany(sql, chunk)
+                conn.commit()
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            cursor.executemany(sql, chunk)
+            conn.commit()
+            total += len(chunk)
+    return total
+
+
+def seed(conn, args):
+    rng = random.Random(args.seed)
+    now = datetime.now()
+
+    with conn.cursor() as cursor:
+        for table in ("Customers", "Orders", "ActualOrders"):
+            cursor.execute(f"SELECT COUNT(*) AS n FROM {table}")
+            if cursor.fetchone()['n']:
+                print(f"La table {table} n'est pas vide : utilisez une base dédiée aux benchmarks.")
+                return 1
+        # Chargement en masse : contrôles différés le temps du seed (session uniquement)
+        cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+
+    # Un seul hash pour tous les comptes : le seed ne passe pas son temps dans bcrypt
+    password_hash = hash_password(BENCH_PASSWORD)
+
+    def step(name, count):
+        print(f"{name} : {count} lignes", flush=True)
+
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM Staff WHERE Email = %s", (ADMIN_EMAIL,))
+        cursor.execute(
+            "INSERT INTO Staff (FirstName, LastName, Email, PasswordHash, RoleID) VALUES (%s, %s, %s, %s, %s)",
+            ("Bench", "Admin", ADMIN_EMAIL, password_hash, 1)
+        )
+        cursor.execute("SELECT COALESCE(MAX(ID), 0) AS n FROM Products")
+        first_product = cursor.fetchone()['n'] + 1
+    conn.commit()
+
+    products = [
+        (f"Bench VPS {i}", "Produit généré pour les benchmarks", round(rng.uniform(3, 120), 2), rng.randint(50, 100000))
+        for i in range(args.products)
+    ]
+    step("Products", insert_chunks(
+        conn, "INSERT INTO Products (ProductName, Description, Price, StockQuantity) VALUES (%s, %s, %s, %s)",
+        products, args.chunk_size))
+    prices = {first_product + i: p[2] for i, p in enumerate(products)}
+    product_ids = list(prices)
+
+    step("Customers", insert_chunks(
+        conn,
+        "INSERT INTO Customers (FirstName, LastName, Email, PhoneNumber, PasswordHash, CreatedAt) VALUES (%s, %s, %s, %s, %s, %s)",
+        ((f"Client{i}", "Bench", customer_email(i), f"06{i:08d}"[:15], password_hash,
+          now - timedelta(days=rng.randint(0, 1000))) for i in range(1, args.customers + 1)),
+        args.chunk_size))
+
+    statuses = [s for s, _ in ORDER_STATUSES]
+    weights = [w for _, w in ORDER_STATUSES]
+
+    def orders():
+        for _ in range(args.orders):
+            product_id = rng.choice(product_ids)
+            yield (rng.randint(1, args.customers), product_id, rng.choices(statuses, weights)[0],
+                   prices[product_id], now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)))
+
+    step("Orders", insert_chunks(
+        conn, "INSERT INTO Orders (CustomerID, ProductID, Status, TotalAmount, OrderDate) VALUES (%s, %s, %s, %s, %s)",
+        orders(), args.chunk_size))
+
+    def services():
+        for _ in range(args.services):
+            product_id = rng.choice(product_ids)
+            ended_at = now + timedelta(minutes=rng.randint(-30 * 24 * 60, 30 * 24 * 60))
+            yield (rng.randint(1, args.customers), product_id, "Delivered" if ended_at > now else "Finished",
+                   prices[product_id], ended_at - timedelta(days=30), ended_at)
+
+    step("ActualOrders", insert_chunks(
+        conn,
+        "INSERT INTO ActualOrders (CustomerID, ProductID, Status, RecurentPrice, StartedAt, EndedAt) VALUES (%s, %s, %s, %s, %s, %s)",
+        services(), args.chunk_size))
+
+    with conn.cursor() as cursor:
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        step("CustomerStats", customer_stats.rebuild(cursor))
+        catalog_cache.bump(cursor)
+    conn.commit()
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Seed synthétique pour les benchmarks")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--services", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    app = create_app()
+    with app.app_context():
+        started = time.monotonic()
+        code = seed(get_db(), args)
+        print(f"Terminé en {time.monotonic() - started:.1f} s")
+    sys.exit(code)
@@ -2,6 +2,117 @@ class Config:
     SECRET_KEY = ""
     JWT_SECRET_KEY = ""
     DB_HOST = ""
+    DB_PORT = 3306
     DB_USER = ""
     DB_PASSWORD = ""
     DB_NAME = ""
+
+    # Serveur gunicorn (gunicorn.conf.py) : workers threadés, chaque requête en cours occupe un thread
+    GUNICORN_BIND = "0.0.0.0:8000"
+    GUNICORN_WORKERS = 4
+    GUNICORN_THREADS = 8
+
+    # Pool de connexions (par worker gunicorn : workers x DB_POOL_SIZE <= max_connections ;
+    # DB_POOL_SIZE >= GUNICORN_THREADS pour qu'aucun thread n'attende une connexion)
+    DB_POOL_SIZE = 8
+    DB_POOL_TIMEOUT = 5           # secondes d'attente max pour obtenir une connexion
+    DB_POOL_RECYCLE = 1800        # durée de vie max d'une connexion (secondes)
+    DB_POOL_PING_INTERVAL = 30    # ping avant prêt si inactive depuis plus longtemps
+
+    # Métriques Prometheus sur /metrics (multi-workers : variable d'env. PROMETHEUS_MULTIPROC_DIR).
+    # Accès : en-tête "Authorization: Bearer <METRICS_TOKEN>" si défini, sinon seulement
+    # depuis les adresses de METRICS_ALLOWED_IPS (adresse de connexion, pas X-Forwarded-For)
+    METRICS_ENABLED = True
+    METRICS_TOKEN = ""
+    METRICS_ALLOWED_IPS = ("127.0.0.1", "::1")
+
+    # Profilage SQL (rapport : GET /admin/queries)
+    PROFILER_ENABLED = True
+    PROFILER_WINDOW = 500          # exécutions conservées par empreinte pour p50 / p95
+    SLOW_QUERY_THRESHOLD = 0.2     # secondes ; au-delà, la requête est journalisée
+
+    # Limitation de débit : seaux à jetons partagés par les workers de la machine (fichier SQLite)
+    # Par blueprint : {"ip" | "account" (champ Email): (rafale, jetons regagnés par minute)}
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_DB = ""             # vide : hostos-ratelimit.sqlite3 dans le répertoire temporaire
+    RATE_LIMIT_PROXY_HOPS = 0      # reverse proxys de confiance devant l'API (X-Forwarded-For)
+    RATE_LIMIT_PURGE_INTERVAL = 300
+    RATE_LIMITS = {
+        "login": {"ip": (20, 10), "account": (5, 5)},
+        "admin_login": {"ip": (10, 5), "account": (5, 2)},
+        "register": {"ip": (5, 2)},
+        "admin_register": {"ip": (3, 1)},
+    }
+
+    # Fréquence (secondes) de relecture de StaffChanges par worker
+    STAFF_CHANGES_REFRESH = 5
+
+    # Pagination des listes (?limit=, plafonné à PAGE_MAX_LIMIT)
+    PAGE_DEFAULT_LIMIT = 100
+    PAGE_MAX_LIMIT = 500
+
+    # Recherche admin (/admin/search) : résultats par type, par défaut et au plus
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 50
+
+    # Validation groupée (/orders/validate/batch) : nombre max de commandes par appel
+    VALIDATE_BATCH_MAX = 500
+
+    # Création de commande (/orders/create) : nouvelles tentatives sur interblocage /
+    # délai de verrou dépassé, attente aléatoire de base (secondes, doublée à chaque essai)
+    ORDER_RETRIES = 3
+    ORDER_RETRY_BACKOFF = 0.02
+
+    # Idempotency-Key : durée de conservation des réponses (secondes), attente max d'un
+    # doublon pendant que la première requête est en cours, fréquence de purge des expirées
+    IDEMPOTENCY_TTL = 86400
+    IDEMPOTENCY_WAIT = 10
+    IDEMPOTENCY_PURGE_INTERVAL = 300
+
+    # Flux /orders/events (SSE). Chaque flux ouvert occupe un thread du worker (gthread) :
+    # EVENTS_MAX_SUBSCRIBERS est de toute façon borné à GUNICORN_THREADS // 2
+    EVENTS_POLL_INTERVAL = 1       # secondes entre deux lectures des événements, par worker
+    EVENTS_MAX_SUBSCRIBERS = 4     # flux ouverts max par worker
+    EVENTS_AUTH_RECHECK = 5        # secondes entre deux vérifications du token d'un flux ouvert (révocation)
+    EVENTS_MAX_QUEUED = 1000       # événements en attente max par flux (client trop lent : déconnecté)
+    EVENTS_HEARTBEAT = 15          # secondes sans événement avant un ping
+    EVENTS_RETENTION = 3600        # conservation des événements (reprise via Last-Event-ID)
+
+    # Imports en masse (/imports) : lignes par transaction, erreurs détaillées max par réponse
+    IMPORT_CHUNK_SIZE = 1000
+    IMPORT_MAX_ERRORS = 1000
+
+    # Planificateur (scheduler.py) : expiration des services échus
+    EXPIRY_INTERVAL = 60          # secondes entre deux passes
+    EXPIRY_BATCH_SIZE = 500       # services terminés par transaction
+    SCHEDULER_BATCH_PAUSE = 0.05  # pause entre deux lots d'une même passe
+
+    # Renouvellements : commandes Pending générées pour les services échéant sous RENEWAL_LEAD_DAYS jours
+    BILLING_PERIOD_DAYS = 30      # durée d'une période (validation d'une commande)
+    RENEWAL_INTERVAL = 3600
+    RENEWAL_LEAD_DAYS = 7
+    RENEWAL_CHUNK_SIZE = 1000
+
+    # Cache du catalogue : délai max (secondes) avant de relire la version en base
+    CATALOG_VERSION_TTL = 2
+
+    # Compression gzip / brotli et ETag faibles des réponses GET
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024      # octets : en dessous, la réponse part telle quelle
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    ETAG_ENABLED = True
+    # Réglages par blueprint, ex : {"exports": {"compress": False}}
+    HTTP_POLICIES = {}
+
+    # Bcrypt : coût (les hashes existants sont recalculés à la connexion si il change),
+    # processus dédiés par worker gunicorn (0 = calcul dans le worker), file max avant 503
+    BCRYPT_ROUNDS = 12
+    BCRYPT_WORKERS = 2
+    BCRYPT_MAX_PENDING = 16
+    BCRYPT_TIMEOUT = 10
+    BCRYPT_START_METHOD = "forkserver"
+
+    # Révocation des tokens : relecture des révocations récentes (secondes) et purge des expirées
+    REVOCATION_REFRESH = 1
+    REVOCATION_PURGE_INTERVAL = 300
@@ -0,0 +1,39 @@
+"""
+Configuration gunicorn de l'API, lue automatiquement au lancement depuis backend/API :
+
+    gunicorn main:app
+
+Workers threadés (gthread) : les routes et PyMySQL sont synchrones, chaque requête
+en cours (flux /orders/events ou export compris) occupe un thread. Nombre de workers
+et de threads réglés dans config.py (GUNICORN_WORKERS, GUNICORN_THREADS).
+
+Avec PROMETHEUS_MULTIPROC_DIR, le répertoire des métriques est vidé au démarrage et
+les fichiers d'un worker arrêté sont marqués morts : ses jauges (requêtes en cours)
+ne restent pas comptées dans /metrics.
+"""
+import glob
+import os
+
+from config import Config
+
+bind = Config.GUNICORN_BIND
+workers = Config.GUNICORN_WORKERS
+worker_class = "gthread"
+threads = Config.GUNICORN_THREADS
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:  # dépendance optionnelle : pas de /metrics
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,198 @@
+"""
+Migrations versionnées du schéma MySQL.
+
+    python migrate.py up       # applique les scripts de migrations/ pas encore passés
+    python migrate.py status   # liste les migrations appliquées / en attente
+    python migrate.py check    # EXPLAIN des requêtes des routes, signale les scans complets
+    python migrate.py rebuild-stats  # recalcule entièrement la synthèse CustomerStats
+
+Installation neuve : importer backend/hostosdb_template.sql puis lancer `up`.
+À lancer à chaque déploiement, avant de redémarrer gunicorn.
+"""
+import os
+import sys
+
+from app import create_app
+from app.db import get_db
+from app import auth, catalog_cache, customer_stats, events, expiry, idempotency, ordering, renewals, revocation
+from routes import (admin_login, admin_search, admin_summary, manage_exports, manage_imports, manage_orders,
+                    users_auth, users_dashboard, users_infos, users_lists, users_register)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Tables de référence volontairement petites : un scan complet y est normal
+SMALL_TABLES = {"Roles", "Staff", "Products", "StaffChanges", "SchemaMigrations"}
+
+# Requêtes émises par les routes et le planificateur, avec des paramètres représentatifs.
+# La SQL vient des constantes des modules qui l'exécutent : pas de copie à maintenir.
+# Seuls les INSERT ... VALUES (sans lecture) et les GET_LOCK n'y figurent pas.
+LIST = 101  # page par défaut (PAGE_DEFAULT_LIMIT) + ligne sentinelle
+ONE = "%s"  # un seul identifiant pour les requêtes en IN (...)
+
+
+def _search(search_type, q, limit=20):
+    columns, branches = admin_search.SEARCHES[search_type]
+    sql, params = admin_search.union_sql(columns, branches(q, admin_search.fulltext_terms(q)), limit)
+    return f"admin.search ({search_type}: {q})", sql, tuple(params)
+
+
+CHECKED_QUERIES = [
+    ("auth.login", users_auth.CUSTOMER_LOGIN_SQL, ("a@b.c",)),
+    ("auth.admin_login", admin_login.STAFF_LOGIN_SQL, ("a@b.c",)),
+    ("auth.register (client)", users_register.CUSTOMER_EXISTS_SQL, ("a@b.c",)),
+    ("auth.register (staff)", users_register.STAFF_EXISTS_SQL, ("a@b.c",)),
+    ("auth.revocations", revocation.RECENT_REVOCATIONS_SQL, (0,)),
+    ("auth.revocations (load)", revocation.ACTIVE_REVOCATIONS_SQL, (0,)),
+    ("auth.revocations (purge)", revocation.PURGE_SQL, (0,)),
+    ("auth.staff_changes", auth.STAFF_CHANGES_SQL, (0,)),
+    ("idempotency.lookup", idempotency.LOOKUP_SQL, (b"x" * 32, 0)),
+    ("idempotency.purge", idempotency.PURGE_SQL, (0,)),
+    ("products.catalog (version)", catalog_cache.VERSION_SQL, (catalog_cache.CATALOG,)),
+    ("products.catalog", catalog_cache.PRODUCTS_SQL, ()),
+    ("orders.create", ordering.RESERVE_SQL, (1,)),
+    ("orders.validate", manage_orders.VALIDATE_ORDER_SQL, (1,)),
+    ("orders.validate_batch", manage_orders.VALIDATE_BATCH_SQL.format(placeholders=ONE), (1,)),
+    ("orders.validate (release)", ordering.RESERVED_ORDERS_SQL.format(placeholders=ONE), (1,)),
+    ("orders.validate (delivered)", ordering.CONSUME_SQL.format(placeholders=ONE), (1,)),
+    ("orders.validate (renewal)", renewals.FINISH_PREVIOUS_ORDER_SQL, (1,)),
+    ("orders.events", events.FETCH_SQL, (0, 1000)),
+    ("orders.events (start)", events.LAST_ID_SQL, ()),
+    ("orders.events (purge)", events.PURGE_SQL, (0,)),
+    ("orders.list", manage_orders.ORDERS_LIST_SQL.format(
+        where="", order_by="o.OrderDate DESC, o.ID DESC"), (LIST,)),
+    ("orders.list (status)", manage_orders.ORDERS_LIST_SQL.format(
+        where="WHERE o.Status = %s", order_by="o.OrderDate DESC, o.ID DESC"), ("Delivered", LIST)),
+    ("orders.list_pending", manage_orders.ORDERS_LIST_SQL.format(
+        where="WHERE o.Status = 'Pending'", order_by="o.OrderDate ASC, o.ID ASC"), (LIST,)),
+    ("orders.list_actual", manage_orders.SERVICES_LIST_SQL.format(
+        where="", order_by="ao.EndedAt ASC, ao.ID ASC"), (LIST,)),
+    ("orders.terminate", manage_orders.TERMINATE_LEGACY_SQL, (1, 1)),
+    ("orders.terminate (service)", manage_orders.TERMINATED_SERVICE_SQL, (1,)),
+    ("exports.orders", manage_exports.ORDERS_EXPORT_SQL.format(where=""), ()),
+    ("exports.services", manage_exports.SERVICES_EXPORT_SQL.format(where=""), ()),
+    ("exports.customers", manage_exports.CUSTOMERS_EXPORT_SQL.format(where=""), ()),
+    ("imports.customers (email)", manage_imports.CUSTOMERS_BY_EMAIL_SQL.format(ONE), ("a@b.c",)),
+    ("imports.customers (id)", manage_imports.CUSTOMERS_BY_ID_SQL.format(ONE), (1,)),
+    ("imports.products", manage_imports.PRODUCT_PRICES_SQL.format(ONE), (1,)),
+    ("scheduler.expire_services", expiry.DUE_SERVICES_SQL, (500,)),
+    ("scheduler.expire_services (legacy)", expiry.FINISH_LEGACY_ORDER_SQL, (1, 1)),
+    ("scheduler.expire_services (dry run)", expiry.DUE_COUNT_SQL, ()),
+    ("scheduler.renew_services", renewals.DUE_RENEWALS_SQL.format(keyset=""),
+     ("2026-01-01", "2026-01-08", 1000)),
+    _search("customers", "dupont"),
+    _search("customers", "0612"),
+    _search("orders", "vps"),
+    _search("products", "vps"),
+    ("admin.customers_list", users_lists.CUSTOMERS_LIST_SQL.format(where="", order_by="ID ASC"), (LIST,)),
+    ("admin.staff_list", users_lists.STAFF_LIST_SQL.format(where="", order_by="ID ASC"), (LIST,)),
+    ("admin.staff_infos", users_infos.STAFF_INFOS_SQL, (1,)),
+    ("customers.infos", users_infos.CUSTOMER_INFOS_SQL, (1,)),
+    ("admin.summary (counts)", admin_summary.COUNTS_SQL, ()),
+    ("admin.summary (services)", admin_summary.SERVICES_SQL, (7,)),
+    ("admin.summary (recent orders)", admin_summary.RECENT_ORDERS_SQL, (5,)),
+    ("me.stats", customer_stats.STATS_SQL, (1,)),
+    ("me.stats (refresh)", customer_stats.REFRESH_SQL, (1,)),
+    ("me.my_services", users_dashboard.MY_SERVICES_SQL, (1,)),
+    ("me.my_orders", users_dashboard.MY_ORDERS_SQL.format(
+        where="WHERE o.CustomerID = %s", order_by="o.OrderDate DESC, o.ID DESC"), (1, LIST)),
+]
+
+
+def read_statements(path):
+    """Découpe un script .sql en instructions (une instruction se termine par ';' en fin de ligne)"""
+    statements, current = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip().startswith("--"):
+                continue
+            current.append(line)
+            if line.rstrip().endswith(";"):
+                statements.append("".join(current).strip().rstrip(";"))
+                current = []
+    if "".join(current).strip():
+        statements.append("".join(current).strip())
+    return statements
+
+
+def available_migrations():
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+
+
+def applied_migrations(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            Version varchar(255) primary key,
+            AppliedAt datetime default current_timestamp
+        )
+    """)
+    cursor.execute("SELECT Version FROM SchemaMigrations")
+    return {row["Version"] for row in cursor.fetchall()}
+
+
+def migrate_up(conn):
+    with conn.cursor() as cursor:
+        done = applied_migrations(cursor)
+        pending = [m for m in available_migrations() if m not in done]
+        if not pending:
+            print("Schéma à jour.")
+        for name in pending:
+            print(f"Application de {name}...")
+            # Le DDL MySQL valide implicitement : chaque migration est enregistrée dès qu'elle a réussi
+            for statement in read_statements(os.path.join(MIGRATIONS_DIR, name)):
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO SchemaMigrations (Version) VALUES (%s)", (name,))
+            conn.commit()
+    return 0
+
+
+def migrate_status(conn):
+    with conn.cursor() as cursor:
+        done = applied_migrations(cursor)
+    conn.commit()
+    for name in available_migrations():
+        print(f"[{'x' if name in done else ' '}] {name}")
+    return 0
+
+
+def check_queries(conn):
+    """EXPLAIN de chaque requête connue ; code retour 1 si un scan complet est détecté"""
+    flagged = 0
+    with conn.cursor() as cursor:
+        for name, sql, params in CHECKED_QUERIES:
+            cursor.execute("EXPLAIN " + sql, params)
+            for row in cursor.fetchall():
+                table = row.get("table") or ""
+                if row.get("type") == "ALL" and table not in SMALL_TABLES and not table.startswith("<"):
+                    flagged += 1
+                    print(f"SCAN COMPLET  {name}: table {table} (~{row.get('rows')} lignes)")
+                else:
+                    print(f"ok            {name}: {table} via {row.get('key') or row.get('type')}")
+    print(f"{flagged} scan(s) complet(s) détecté(s).")
+    return 1 if flagged else 0
+
+
+def rebuild_stats(conn):
+    with conn.cursor() as cursor:
+        customer_stats.rebuild(cursor)
+    conn.commit()
+    print("CustomerStats recalculée.")
+    return 0
+
+
+COMMANDS = {
+    "up": migrate_up,
+    "status": migrate_status,
+    "check": check_queries,
+    "rebuild-stats": rebuild_stats,
+}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "up"
+    if command not in COMMANDS:
+        print(__doc__)
+        sys.exit(2)
+
+    app = create_app()
+    with app.app_context():
+        sys.exit(COMMANDS[command](get_db()))
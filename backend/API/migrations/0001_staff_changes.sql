@@ -0,0 +1,5 @@
+-- Table d'invalidation des tokens Staff (déjà présente dans les installations récentes)
+create table if not exists StaffChanges (
+    StaffID int primary key,
+    ChangedAt int not null
+);
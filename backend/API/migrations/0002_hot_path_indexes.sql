@@ -0,0 +1,19 @@
+-- Index composites pour les chemins chauds des routes
+
+-- /orders/list : tri par (OrderDate, ID)
+create index idx_orders_date on Orders (OrderDate);
+
+-- /orders/list/pending et filtre ?status= : Status puis tri par date
+create index idx_orders_status_date on Orders (Status, OrderDate);
+
+-- /me/stats : filtre (CustomerID, Status), SUM(TotalAmount) servi par l'index
+create index idx_orders_customer_status on Orders (CustomerID, Status, TotalAmount);
+
+-- /me/my-orders : commandes d'un client triées par date
+create index idx_orders_customer_date on Orders (CustomerID, OrderDate);
+
+-- /orders/list/actual et /admin/summary : tri et filtre EndedAt > NOW()
+create index idx_actual_ended on ActualOrders (EndedAt);
+
+-- /me/stats et /me/my-services : services d'un client par date de fin
+create index idx_actual_customer_ended on ActualOrders (CustomerID, EndedAt);
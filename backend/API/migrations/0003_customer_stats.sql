@@ -0,0 +1,18 @@
+-- Synthèse par client servie par /me/stats (tenue à jour par les routes de commandes)
+create table CustomerStats (
+    CustomerID int primary key,
+    ActiveServices int not null default 0,
+    NextExpiryAt datetime null,
+    PendingOrders int not null default 0,
+    TotalSpent decimal(12, 2) not null default 0,
+    Foreign key (CustomerID) references Customers(ID) ON DELETE CASCADE
+);
+
+-- Remplissage initial à partir de l'historique existant
+insert into CustomerStats (CustomerID, ActiveServices, NextExpiryAt, PendingOrders, TotalSpent)
+select c.ID,
+    (select count(*) from ActualOrders where CustomerID = c.ID and EndedAt > now()),
+    (select min(EndedAt) from ActualOrders where CustomerID = c.ID and EndedAt > now()),
+    (select count(*) from Orders where CustomerID = c.ID and Status in ('Pending', 'Processing')),
+    (select coalesce(sum(TotalAmount), 0) from Orders where CustomerID = c.ID and Status in ('Delivered', 'Finished'))
+from Customers c;
@@ -0,0 +1,7 @@
+-- Versions des données mises en cache par les workers (catalogue produits, ...)
+create table CacheVersions (
+    Name varchar(50) primary key,
+    Version bigint not null default 0
+);
+
+insert into CacheVersions (Name, Version) values ('catalog', 1);
@@ -0,0 +1,8 @@
+-- Tokens révoqués (logout), partagés entre workers ; purgés une fois expirés
+create table RevokedTokens (
+    JTI varchar(64) primary key,
+    RevokedAt int not null,
+    ExpiresAt int not null,
+    index idx_revoked_at (RevokedAt),
+    index idx_revoked_expires (ExpiresAt)
+);
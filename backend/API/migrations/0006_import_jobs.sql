@@ -0,0 +1,14 @@
+-- Imports en masse (/imports) : avancement enregistré dans la transaction de chaque lot,
+-- pour reprendre un import interrompu après le dernier lot validé
+create table ImportJobs (
+    ID int primary key auto_increment,
+    Kind varchar(20) not null,
+    Format varchar(10) not null,
+    Status ENUM("Running", "Completed", "Failed") not null default "Running",
+    CommittedRows int not null default 0,
+    ImportedRows int not null default 0,
+    FailedRows int not null default 0,
+    StaffID int,
+    CreatedAt datetime default current_timestamp,
+    UpdatedAt datetime default current_timestamp on update current_timestamp
+);
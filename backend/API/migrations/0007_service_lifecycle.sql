@@ -0,0 +1,8 @@
+-- Cycle de vie des services : lien vers la commande d'origine et index de l'expiration
+-- OrderID est renseigné par /orders/validate ; NULL pour les services plus anciens
+alter table ActualOrders
+    add column OrderID int null,
+    add constraint fk_actual_order foreign key (OrderID) references Orders(ID) on delete set null;
+
+-- Planificateur (scheduler.py) : services Delivered dont EndedAt est passé, par lots
+create index idx_actual_status_ended on ActualOrders (Status, EndedAt);
@@ -0,0 +1,7 @@
+-- Renouvellements : une commande Pending par service et par période (RenewalPeriod = EndedAt renouvelé)
+-- L'index unique rend la génération idempotente ; NULL pour les commandes ordinaires
+alter table Orders
+    add column RenewalOf int null,
+    add column RenewalPeriod datetime null,
+    add constraint fk_orders_renewal foreign key (RenewalOf) references ActualOrders(ID) on delete set null,
+    add unique index idx_orders_renewal (RenewalOf, RenewalPeriod);
@@ -0,0 +1,11 @@
+-- Réponses des requêtes portant un en-tête Idempotency-Key (app/idempotency.py)
+-- KeyHash = SHA-256(compte, route, clé) ; purgées une fois ExpiresAt dépassé
+create table IdempotencyKeys (
+    KeyHash binary(32) primary key,
+    RequestHash binary(32) not null,
+    Status smallint not null,
+    ContentType varchar(100) not null,
+    Body mediumblob not null,
+    ExpiresAt int not null,
+    index idx_idempotency_expires (ExpiresAt)
+);
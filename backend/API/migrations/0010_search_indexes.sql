@@ -0,0 +1,9 @@
+-- /admin/search : index plein texte (mots et préfixes) sur les noms, e-mails et produits
+alter table Customers add fulltext index ft_customers_search (FirstName, LastName, Email);
+alter table Products add fulltext index ft_products_search (ProductName);
+
+-- Recherche par début de numéro de téléphone
+create index idx_customers_phone on Customers (PhoneNumber);
+
+-- Commandes d'un produit trouvé, les plus récentes d'abord (sert aussi /orders/list?product=)
+create index idx_orders_product_date on Orders (ProductID, OrderDate);
@@ -0,0 +1,9 @@
+-- Événements des commandes / services diffusés par /orders/events (app/events.py)
+-- Payload : ligne au format de /orders/list ou /orders/list/actual ; purgés après EVENTS_RETENTION
+create table OrderEvents (
+    ID bigint primary key auto_increment,
+    Kind varchar(32) not null,
+    CreatedAt int not null,
+    Payload json not null,
+    index idx_order_events_created (CreatedAt)
+);
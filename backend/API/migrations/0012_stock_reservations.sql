@@ -0,0 +1,10 @@
+-- Stock : NULL = illimité (nouveaux produits sans stock suivi). Les stocks existants
+-- sont conservés : 0 reste une rupture de stock
+alter table Products modify StockQuantity int null;
+
+-- Annulation d'une commande, et unité de stock réservée par la commande : rendue au
+-- produit si la commande quitte Pending / Processing sans être livrée.
+-- Les commandes plus anciennes et les renouvellements n'ont rien réservé (0)
+alter table Orders
+    modify Status ENUM("Pending", "Processing", "Delivered", "Finished", "Cancelled") not null,
+    add column StockReserved tinyint(1) not null default 0;
@@ -16,6 +16,11 @@ from .users_infos import admin_infos_bp
 from .manage_products import products_bp
 from .manage_orders import orders_bp
 from .users_dashboard import client_dashboard_bp
+from .manage_exports import exports_bp
+from .admin_summary import admin_summary_bp
+from .manage_imports import imports_bp
+from .admin_queries import admin_queries_bp
+from .admin_search import admin_search_bp
 # Si tu ajoutes d'autres routes plus tard, importe-les ici
 # from .users import users_bp
 # from .create import create_bp
@@ -39,5 +44,10 @@ def register_routes(app):
     app.register_blueprint(products_bp, url_prefix="/products")
     app.register_blueprint(orders_bp, url_prefix="/orders")
     app.register_blueprint(client_dashboard_bp, url_prefix="/me")
+    app.register_blueprint(exports_bp, url_prefix="/exports")
+    app.register_blueprint(admin_summary_bp, url_prefix="/admin")
+    app.register_blueprint(imports_bp, url_prefix="/imports")
+    app.register_blueprint(admin_queries_bp, url_prefix="/admin")
+    app.register_blueprint(admin_search_bp, url_prefix="/admin")
     # Pour chaque nouveau blueprint, ajoute une ligne ici
     # app.register_blueprint(users_bp, url_prefix="/users")
@@ -1,19 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-import bcrypt
-import pymysql
-from config import Config
+from app.passwords import check_password, rehash_if_needed, HashingOverloaded
+from app.auth import staff_claims
+from app.db import get_db
 
 admin_login_bp = Blueprint("admin_login", __name__)
 
-def get_connection():
-    """Crée une connexion à la base MySQL"""
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME
-    )
+# Reprise telle quelle par `python migrate.py check`
+STAFF_LOGIN_SQL = "SELECT ID, PasswordHash, FirstName, RoleID FROM Staff WHERE Email=%s"
 
 @admin_login_bp.route("/admin/login", methods=["POST"])
 def login():
@@ -25,37 +19,40 @@ def login():
     if not email or not password:
         return jsonify({"error": "Veuillez remplir tous les champs"}), 400
 
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        # On récupère l'ID, le Hash et le Prénom depuis la table Staff
-        cursor.execute("SELECT ID, PasswordHash, FirstName FROM Staff WHERE Email=%s", (email,))    
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # On récupère l'ID, le Hash, le Prénom et le rôle depuis la table Staff
+        cursor.execute(STAFF_LOGIN_SQL, (email,))
         user = cursor.fetchone()
-        cursor.close()
-    finally:
-        conn.close()
 
     # Si l'utilisateur n'existe pas
     if not user:
         return jsonify({"error": "Identifiants invalides"}), 401
 
-    # Vérification du mot de passe
-    # user[1] est le PasswordHash
+    # Vérification du mot de passe (pool bcrypt : 503 si saturé)
     try:
-        if not bcrypt.checkpw(password.encode('utf-8'), user[1].encode('utf-8')):
+        if not check_password(password, user['PasswordHash']):
             return jsonify({"error": "Identifiants invalides"}), 401
+    except HashingOverloaded:
+        raise
     except Exception:
         return jsonify({"error": "Erreur lors de la vérification du compte"}), 500
 
+    # Coût bcrypt modifié depuis le dernier hash : on le met à jour
+    with conn.cursor() as cursor:
+        if rehash_if_needed(cursor, "Staff", user['ID'], password, user['PasswordHash']):
+            conn.commit()
+
     # --- CORRECTION CRUCIALE : IDENTITY EN STRING ---
-    # On transforme l'ID (user[0]) en texte pour éviter l'erreur 422 côté dashboard
-    token = create_access_token(identity=str(user[0]))
+    # On transforme l'ID en texte pour éviter l'erreur 422 côté dashboard
+    # Le rôle voyage dans les claims : les routes admin n'interrogent plus la table Staff
+    token = create_access_token(identity=str(user['ID']), additional_claims=staff_claims(user))
 
     return jsonify({
         "access_token": token,
         "user": {
-            "id": user[0],
-            "firstName": user[2], # Index 2 pour le FirstName
-            "RoleID": 1           # On confirme le rôle Admin
+            "id": user['ID'],
+            "firstName": user['FirstName'],
+            "RoleID": user['RoleID']
         }
     })
\ No newline at end of file
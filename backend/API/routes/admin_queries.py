@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from app.auth import staff_required, ROLE_ADMIN
+from app.pagination import parse_int
+from app import query_profiler
+
+admin_queries_bp = Blueprint("admin_queries", __name__)
+
+# --- ROUTE : RAPPORT DU PROFILEUR SQL ---
+# Empreintes des requêtes mesurées par ce worker, les plus coûteuses d'abord
+@admin_queries_bp.route("/queries", methods=["GET"])
+@staff_required(roles=(ROLE_ADMIN,))
+def get_query_report():
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "p95", "max", "calls", "rows"):
+        return jsonify({"error": "sort doit valoir total, p95, max, calls ou rows"}), 400
+    limit = min(max(parse_int(request.args.get("limit", 50)), 1), 500)
+    return jsonify(query_profiler.report(sort, limit)), 200
+
+# --- ROUTE : REMISE À ZÉRO DU PROFILEUR ---
+@admin_queries_bp.route("/queries", methods=["DELETE"])
+@staff_required(roles=(ROLE_ADMIN,))
+def reset_query_report():
+    query_profiler.reset()
+    return jsonify({"msg": "Statistiques remises à zéro"}), 200
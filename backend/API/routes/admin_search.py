@@ -0,0 +1,143 @@
+import re
+
+from flask import Blueprint, request, jsonify, current_app
+from app.auth import staff_required
+from app.db import get_db
+from app.pagination import parse_int
+
+admin_search_bp = Blueprint("admin_search", __name__)
+
+SEARCH_TYPES = ("customers", "orders", "products")
+
+# Longueur min. d'un mot indexé en plein texte (innodb_ft_min_token_size) ;
+# même règle côté front (isSearchable dans src/lib/api.ts)
+MIN_TERM_LENGTH = 3
+
+CUSTOMER_FULLTEXT = "MATCH(c.FirstName, c.LastName, c.Email) AGAINST (%s IN BOOLEAN MODE)"
+PRODUCT_FULLTEXT = "MATCH(p.ProductName) AGAINST (%s IN BOOLEAN MODE)"
+
+
+def fulltext_terms(q):
+    """Mots de la recherche en mode booléen : chacun requis, en préfixe (dupo -> +dupo*)"""
+    terms = [t for t in re.findall(r"\w+", q) if len(t) >= MIN_TERM_LENGTH]
+    return " ".join(f"+{t}*" for t in terms)
+
+
+def like_prefix(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def union_sql(columns, branches, limit):
+    """
+    Une sous-requête indexée par critère (rang, score, FROM ... WHERE, paramètres),
+    réunies puis triées par rang puis score ; renvoie (SQL, paramètres).
+    """
+    parts, params = [], []
+    for rank, score, source, args in branches:
+        parts.append(f"(SELECT {columns}, {rank} AS `Rank`, {score} AS Score {source} LIMIT %s)")
+        params.extend((*args, limit))
+    return " UNION ALL ".join(parts) + " ORDER BY `Rank` DESC, Score DESC", params
+
+
+def ranked(cursor, columns, branches, limit):
+    """Exécute union_sql ; une seule ligne par ID, `limit` au plus"""
+    if not branches:
+        return []
+    cursor.execute(*union_sql(columns, branches, limit))
+
+    results, seen = [], set()
+    for row in cursor.fetchall():
+        if row['ID'] in seen:
+            continue
+        seen.add(row['ID'])
+        del row['Rank'], row['Score']
+        results.append(row)
+        if len(results) == limit:
+            break
+    return results
+
+
+CUSTOMER_COLUMNS = "c.ID, c.FirstName, c.LastName, c.Email, c.PhoneNumber, c.CreatedAt"
+PRODUCT_COLUMNS = "p.ID, p.ProductName, p.Description, p.Price, p.StockQuantity"
+ORDER_COLUMNS = """o.ID, o.Status, o.TotalAmount, o.OrderDate, o.CustomerID,
+                  c.Email as CustomerEmail, p.ProductName"""
+
+
+def customer_branches(q, terms):
+    branches = []
+    if q.isdigit():
+        branches.append((3, "0", "FROM Customers c WHERE c.ID = %s", (int(q),)))
+    if "@" in q:
+        branches.append((2, "0", "FROM Customers c WHERE c.Email LIKE %s", (like_prefix(q),)))
+    digits = re.sub(r"[\s.+-]", "", q)
+    if digits.isdigit() and len(digits) >= 4:
+        branches.append((2, "0", "FROM Customers c WHERE c.PhoneNumber LIKE %s", (like_prefix(digits),)))
+    if terms:
+        branches.append((1, CUSTOMER_FULLTEXT, f"FROM Customers c WHERE {CUSTOMER_FULLTEXT}", (terms, terms)))
+    return branches
+
+
+def product_branches(q, terms):
+    branches = []
+    if q.isdigit():
+        branches.append((2, "0", "FROM Products p WHERE p.ID = %s", (int(q),)))
+    if terms:
+        branches.append((1, PRODUCT_FULLTEXT, f"FROM Products p WHERE {PRODUCT_FULLTEXT}", (terms, terms)))
+    return branches
+
+
+def order_branches(q, terms):
+    # Commande par numéro, sinon les plus récentes des clients puis des produits trouvés
+    joins = """
+        FROM Orders o
+        JOIN Customers c ON o.CustomerID = c.ID
+        JOIN Products p ON o.ProductID = p.ID
+    """
+    branches = []
+    if q.isdigit():
+        branches.append((3, "0", f"{joins} WHERE o.ID = %s", (int(q),)))
+    if "@" in q:
+        branches.append((2, "UNIX_TIMESTAMP(o.OrderDate)",
+                         f"{joins} WHERE c.Email LIKE %s ORDER BY o.OrderDate DESC", (like_prefix(q),)))
+    if terms:
+        branches.append((2, "UNIX_TIMESTAMP(o.OrderDate)", f"""{joins} WHERE o.CustomerID IN (
+                SELECT c.ID FROM Customers c WHERE {CUSTOMER_FULLTEXT}
+            ) ORDER BY o.OrderDate DESC""", (terms,)))
+        branches.append((1, "UNIX_TIMESTAMP(o.OrderDate)", f"""{joins} WHERE o.ProductID IN (
+                SELECT p.ID FROM Products p WHERE {PRODUCT_FULLTEXT}
+            ) ORDER BY o.OrderDate DESC""", (terms,)))
+    return branches
+
+
+# Type de recherche : (colonnes renvoyées, critères) ; repris par `python migrate.py check`
+SEARCHES = {
+    "customers": (CUSTOMER_COLUMNS, customer_branches),
+    "orders": (ORDER_COLUMNS, order_branches),
+    "products": (PRODUCT_COLUMNS, product_branches),
+}
+
+# --- ROUTE : RECHERCHE ADMIN (CLIENTS, COMMANDES, PRODUITS) ---
+# ?q=texte&type=customers,orders,products&limit=20
+@admin_search_bp.route("/search", methods=["GET"])
+@staff_required()
+def admin_search():
+    q = request.args.get("q", "").strip()
+    types = request.args.get("type", ",".join(SEARCH_TYPES)).split(",")
+    if any(t not in SEARCH_TYPES for t in types):
+        return jsonify({"error": "type doit valoir customers, orders et/ou products"}), 400
+
+    terms = fulltext_terms(q)
+    if not terms and not q.isdigit() and "@" not in q:
+        return jsonify({"error": f"Recherche trop courte ({MIN_TERM_LENGTH} caractères minimum)"}), 400
+
+    config = current_app.config
+    limit = min(max(parse_int(request.args.get("limit", config.get("SEARCH_DEFAULT_LIMIT", 20))), 1),
+                config.get("SEARCH_MAX_LIMIT", 50))
+
+    results = {"query": q}
+    conn = get_db()
+    with conn.cursor() as cursor:
+        for search_type in types:
+            columns, branches = SEARCHES[search_type]
+            results[search_type] = ranked(cursor, columns, branches(q, terms), limit)
+    return jsonify(results), 200
@@ -0,0 +1,70 @@
+from flask import Blueprint, request, jsonify
+from app.auth import staff_required
+from app.db import get_db
+from app.pagination import parse_int
+
+admin_summary_bp = Blueprint("admin_summary", __name__)
+
+# Requêtes reprises telles quelles par `python migrate.py check`
+COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM Customers) AS customers,
+        (SELECT COUNT(*) FROM Staff) AS staff,
+        (SELECT COUNT(*) FROM Products) AS products,
+        (SELECT COUNT(*) FROM Orders WHERE Status = 'Pending') AS pending_orders,
+        (SELECT SUM(TotalAmount) FROM Orders WHERE Status IN ('Delivered', 'Finished')) AS total_revenue
+"""
+
+SERVICES_SQL = """
+    SELECT COUNT(*) AS active_services,
+           SUM(RecurentPrice) AS recurring_revenue,
+           SUM(EndedAt <= NOW() + INTERVAL %s DAY) AS expiring_soon
+    FROM ActualOrders
+    WHERE EndedAt > NOW()
+"""
+
+RECENT_ORDERS_SQL = """
+    SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate,
+           c.Email as CustomerEmail, p.ProductName
+    FROM Orders o
+    JOIN Customers c ON o.CustomerID = c.ID
+    JOIN Products p ON o.ProductID = p.ID
+    ORDER BY o.OrderDate DESC, o.ID DESC
+    LIMIT %s
+"""
+
+# --- ROUTE : RÉSUMÉ DU DASHBOARD ADMIN ---
+# Compteurs et totaux calculés par agrégats SQL sur une seule connexion,
+# au lieu de renvoyer toutes les tables au navigateur pour compter côté client.
+@admin_summary_bp.route("/summary", methods=["GET"])
+@staff_required()
+def get_admin_summary():
+    # Fenêtre "expire bientôt" (jours) et nombre de dernières commandes
+    days = max(parse_int(request.args.get("days", 7)), 0)
+    recent = min(max(parse_int(request.args.get("recent", 5)), 0), 50)
+
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute(COUNTS_SQL)
+        summary = cursor.fetchone()
+
+        # Services en cours : nombre, revenu récurrent et ceux qui expirent dans la fenêtre
+        cursor.execute(SERVICES_SQL, (days,))
+        services = cursor.fetchone()
+
+        recent_orders = []
+        if recent:
+            cursor.execute(RECENT_ORDERS_SQL, (recent,))
+            recent_orders = cursor.fetchall()
+
+    return jsonify({
+        "customers": summary['customers'],
+        "staff": summary['staff'],
+        "products": summary['products'],
+        "pending_orders": summary['pending_orders'],
+        "total_revenue": float(summary['total_revenue'] or 0),
+        "active_services": services['active_services'],
+        "recurring_revenue": float(services['recurring_revenue'] or 0),
+        "expiring_soon": int(services['expiring_soon'] or 0),
+        "recent_orders": recent_orders,
+    }), 200
@@ -0,0 +1,137 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import csv
+import io
+from app.auth import staff_required
+from app.db import get_db, StreamingCursor
+from app.json_provider import dumps_bytes, encode_value
+from app.pagination import add_filters, parse_datetime, where_sql
+from routes.manage_orders import ORDER_FILTERS, SERVICE_FILTERS
+
+exports_bp = Blueprint("exports", __name__)
+
+# Nombre de lignes lues à chaque aller-retour sur le curseur serveur
+FETCH_SIZE = 1000
+
+# Requêtes d'export ({where} : filtres de la route) ; reprises par `python migrate.py check`
+ORDERS_EXPORT_SQL = """
+    SELECT o.ID, o.CustomerID, c.Email as CustomerEmail, o.ProductID, p.ProductName,
+           o.Status, o.TotalAmount, o.OrderDate
+    FROM Orders o
+    JOIN Customers c ON o.CustomerID = c.ID
+    JOIN Products p ON o.ProductID = p.ID
+    {where}
+    ORDER BY o.ID
+"""
+
+SERVICES_EXPORT_SQL = """
+    SELECT ao.ID, ao.CustomerID, c.Email as CustomerEmail, ao.ProductID, p.ProductName,
+           ao.Status, ao.RecurentPrice, ao.OrderDate, ao.StartedAt, ao.EndedAt
+    FROM ActualOrders ao
+    JOIN Customers c ON ao.CustomerID = c.ID
+    JOIN Products p ON ao.ProductID = p.ID
+    {where}
+    ORDER BY ao.ID
+"""
+
+CUSTOMERS_EXPORT_SQL = """
+    SELECT ID, FirstName, LastName, Email, PhoneNumber, CreatedAt
+    FROM Customers
+    {where}
+    ORDER BY ID
+"""
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def format_value(value):
+    """CSV : mêmes conversions que l'encodage JSON (app/json_provider.py)"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return encode_value(value)
+
+
+def stream_rows(sql, params, columns, fmt):
+    """
+    Exécute la requête sur un curseur non bufferisé (StreamingCursor) et émet les lignes
+    au fil de l'eau : la mémoire reste constante quelle que soit la taille de la table.
+    """
+    conn = get_db()
+    cursor = conn.cursor(StreamingCursor)
+    cursor.execute(sql, params)
+
+    def generate():
+        try:
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+                yield buffer.getvalue()
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                if fmt == "csv":
+                    buffer.seek(0)
+                    buffer.truncate()
+                    for row in rows:
+                        writer.writerow([format_value(row[c]) for c in columns])
+                    yield buffer.getvalue()
+                else:
+                    yield b"".join(dumps_bytes({c: row[c] for c in columns}) + b"\n" for row in rows)
+        finally:
+            # Un curseur serveur doit être vidé avant de rendre la connexion au pool
+            cursor.close()
+
+    return generate()
+
+
+def export_response(name, sql, params, columns):
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": "format doit valoir 'ndjson' ou 'csv'"}), 400
+
+    rows = stream_rows(sql, params, columns, fmt)
+    response = Response(stream_with_context(rows), content_type=FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+
+# --- ROUTE : EXPORT DES COMMANDES (HISTORIQUE COMPLET) ---
+@exports_bp.route("/orders", methods=["GET"])
+@staff_required(error="Accès interdit")
+def export_orders():
+    where, params = [], []
+    add_filters(where, params, ORDER_FILTERS)
+    sql = ORDERS_EXPORT_SQL.format(where=where_sql(where))
+    columns = ["ID", "CustomerID", "CustomerEmail", "ProductID", "ProductName",
+               "Status", "TotalAmount", "OrderDate"]
+    return export_response("orders", sql, params, columns)
+
+
+# --- ROUTE : EXPORT DES SERVICES (ACTUALORDERS) ---
+@exports_bp.route("/services", methods=["GET"])
+@staff_required(error="Accès interdit")
+def export_services():
+    where, params = [], []
+    add_filters(where, params, SERVICE_FILTERS)
+    sql = SERVICES_EXPORT_SQL.format(where=where_sql(where))
+    columns = ["ID", "CustomerID", "CustomerEmail", "ProductID", "ProductName",
+               "Status", "RecurentPrice", "OrderDate", "StartedAt", "EndedAt"]
+    return export_response("services", sql, params, columns)
+
+
+# --- ROUTE : EXPORT DES CLIENTS ---
+@exports_bp.route("/customers", methods=["GET"])
+@staff_required(error="Accès interdit")
+def export_customers():
+    where, params = [], []
+    add_filters(where, params, {
+        "created_from": ("CreatedAt >= %s", parse_datetime),
+        "created_to": ("CreatedAt <= %s", lambda v: parse_datetime(v, end_of_day=True)),
+    })
+    sql = CUSTOMERS_EXPORT_SQL.format(where=where_sql(where))
+    columns = ["ID", "FirstName", "LastName", "Email", "PhoneNumber", "CreatedAt"]
+    return export_response("customers", sql, params, columns)
@@ -0,0 +1,385 @@
+from flask import Blueprint, request, jsonify, current_app
+import csv
+import json
+import re
+import pymysql
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from werkzeug.exceptions import ClientDisconnected
+from app.auth import staff_required, current_staff_id
+from app.db import get_db
+from app.pagination import parse_datetime, parse_int
+from app import catalog_cache, customer_stats
+from routes.manage_orders import ORDER_STATUSES
+
+imports_bp = Blueprint("imports", __name__)
+
+FORMATS = ("ndjson", "csv")
+
+# Vérifications par lot ({} : un %s par valeur) ; reprises par `python migrate.py check`
+CUSTOMERS_BY_EMAIL_SQL = "SELECT ID, Email FROM Customers WHERE Email IN ({})"
+CUSTOMERS_BY_ID_SQL = "SELECT ID FROM Customers WHERE ID IN ({})"
+PRODUCT_PRICES_SQL = "SELECT ID, Price FROM Products WHERE ID IN ({})"
+
+# Hash bcrypt déjà calculé par l'ancien système : importé tel quel, sans recalcul
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+
+
+class RowError(ValueError):
+    """Ligne rejetée : reportée dans la réponse, l'import continue"""
+
+
+def read_rows(fmt):
+    """
+    Lit le corps de la requête ligne à ligne (jamais chargé en entier) et
+    renvoie (numéro de ligne de données, dict ou None si illisible).
+    """
+    lines = (line.decode("utf-8-sig" if i == 0 else "utf-8") for i, line in enumerate(request.stream))
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(lines), start=1)
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+# --- VALIDATION DES CHAMPS ---
+
+def text(row, key, max_len, required=True):
+    value = row.get(key)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        if required:
+            raise RowError(f"{key} manquant")
+        return None
+    if len(value) > max_len:
+        raise RowError(f"{key} trop long ({max_len} caractères max)")
+    return value
+
+
+def number(row, key, convert, required=True, default=None):
+    value = row.get(key)
+    if value is None or value == "":
+        if required:
+            raise RowError(f"{key} manquant")
+        return default
+    try:
+        value = convert(value)
+    except (ValueError, TypeError, InvalidOperation):
+        raise RowError(f"{key} invalide")
+    if value < 0:
+        raise RowError(f"{key} doit être positif")
+    return value
+
+
+def date(row, key):
+    value = row.get(key)
+    if not value:
+        return datetime.now()
+    try:
+        return parse_datetime(str(value))
+    except ValueError:
+        raise RowError(f"{key} invalide")
+
+
+def decimal(value):
+    return Decimal(str(value))
+
+
+def select_in(cursor, sql, values):
+    """Exécute `sql` avec un IN (...) sur `values` ({} dans la requête)"""
+    values = list(values)
+    if not values:
+        return []
+    cursor.execute(sql.format(", ".join(["%s"] * len(values))), values)
+    return cursor.fetchall()
+
+
+# --- CLIENTS ---
+
+def validate_customer(row):
+    email = text(row, "Email", 100)
+    if "@" not in email:
+        raise RowError("Email invalide")
+    password_hash = text(row, "PasswordHash", 255)
+    if not BCRYPT_HASH.match(password_hash):
+        raise RowError("PasswordHash doit être un hash bcrypt ($2b$...)")
+    return {
+        "FirstName": text(row, "FirstName", 50),
+        "LastName": text(row, "LastName", 50),
+        "Email": email,
+        "PhoneNumber": text(row, "PhoneNumber", 15, required=False),
+        "PasswordHash": password_hash,
+        "CreatedAt": date(row, "CreatedAt"),
+    }
+
+
+def check_customers(cursor, batch):
+    """Écarte les emails déjà en base ou répétés dans le lot"""
+    rows = select_in(cursor, CUSTOMERS_BY_EMAIL_SQL, {c["Email"] for _, c in batch})
+    # Comparaison insensible à la casse, comme la collation de la colonne
+    taken = {row['Email'].lower() for row in rows}
+    kept, errors = [], []
+    for line, customer in batch:
+        if customer["Email"].lower() in taken:
+            errors.append((line, "Email déjà existant"))
+            continue
+        taken.add(customer["Email"].lower())
+        kept.append(customer)
+    return kept, errors
+
+
+# --- PRODUITS ---
+
+def validate_product(row):
+    return {
+        "ProductName": text(row, "ProductName", 100),
+        "Description": text(row, "Description", 65535, required=False),
+        "Price": number(row, "Price", decimal),
+        "StockQuantity": number(row, "StockQuantity", int, required=False),  # absent : illimité
+        "CreatedAt": date(row, "CreatedAt"),
+    }
+
+
+def after_products(cursor, products):
+    catalog_cache.bump(cursor)
+
+
+# --- COMMANDES HISTORIQUES ---
+
+def validate_order(row):
+    status = text(row, "Status", 20)
+    if status not in ORDER_STATUSES:
+        raise RowError("Status invalide")
+    customer_id = number(row, "CustomerID", int, required=False)
+    return {
+        "CustomerID": customer_id,
+        "CustomerEmail": text(row, "CustomerEmail", 100, required=customer_id is None),
+        "ProductID": number(row, "ProductID", int),
+        "Status": status,
+        # Par défaut : prix actuel du produit
+        "TotalAmount": number(row, "TotalAmount", decimal, required=False),
+        "OrderDate": date(row, "OrderDate"),
+    }
+
+
+def check_orders(cursor, batch):
+    """Résout CustomerEmail en ID et vérifie clients / produits en trois requêtes par lot"""
+    orders = [o for _, o in batch]
+    by_email = {
+        row['Email'].lower(): row['ID']
+        for row in select_in(cursor, CUSTOMERS_BY_EMAIL_SQL,
+                             {o["CustomerEmail"] for o in orders if o["CustomerID"] is None})
+    }
+    known = {
+        row['ID']
+        for row in select_in(cursor, CUSTOMERS_BY_ID_SQL,
+                             {o["CustomerID"] for o in orders if o["CustomerID"] is not None})
+    }
+    prices = {
+        row['ID']: row['Price']
+        for row in select_in(cursor, PRODUCT_PRICES_SQL,
+                             {o["ProductID"] for o in orders})
+    }
+
+    kept, errors = [], []
+    for line, order in batch:
+        if order["CustomerID"] is None:
+            order["CustomerID"] = by_email.get(order["CustomerEmail"].lower())
+        elif order["CustomerID"] not in known:
+            order["CustomerID"] = None
+        if order["CustomerID"] is None:
+            errors.append((line, "Client introuvable"))
+        elif order["ProductID"] not in prices:
+            errors.append((line, "Produit introuvable"))
+        else:
+            if order["TotalAmount"] is None:
+                order["TotalAmount"] = prices[order["ProductID"]]
+            kept.append(order)
+    return kept, errors
+
+
+def after_orders(cursor, orders):
+    customer_stats.refresh_many(cursor, sorted({o["CustomerID"] for o in orders}))
+
+
+# Par type : (colonnes insérées, validation d'une ligne, contrôles en base par lot, après insertion)
+IMPORTERS = {
+    "customers": (
+        ["FirstName", "LastName", "Email", "PhoneNumber", "PasswordHash", "CreatedAt"],
+        validate_customer, check_customers, None,
+    ),
+    "products": (
+        ["ProductName", "Description", "Price", "StockQuantity", "CreatedAt"],
+        validate_product, None, after_products,
+    ),
+    "orders": (
+        ["CustomerID", "ProductID", "Status", "TotalAmount", "OrderDate"],
+        validate_order, check_orders, after_orders,
+    ),
+}
+
+TABLES = {"customers": "Customers", "products": "Products", "orders": "Orders"}
+
+
+def write_chunk(conn, cursor, job_id, kind, batch, failed, last_line):
+    """
+    Insère un lot (executemany) et enregistre l'avancement dans la même transaction :
+    après un commit, CommittedRows dit exactement où reprendre.
+    Renvoie (nombre de lignes insérées, erreurs [(ligne, message)]).
+    """
+    columns, _, check, after = IMPORTERS[kind]
+    rows, errors = check(cursor, batch) if check else ([row for _, row in batch], [])
+    if rows:
+        cursor.executemany(
+            f"INSERT INTO {TABLES[kind]} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            [tuple(row[c] for c in columns) for row in rows]
+        )
+        if after:
+            after(cursor, rows)
+    cursor.execute("""
+        UPDATE ImportJobs
+        SET CommittedRows = %s, ImportedRows = ImportedRows + %s, FailedRows = FailedRows + %s
+        WHERE ID = %s
+    """, (last_line, len(rows), failed + len(errors), job_id))
+    conn.commit()
+    return len(rows), errors
+
+
+def run_job(conn, cursor, job_id, kind, fmt):
+    """Exécute l'import `job_id`, verrou déjà pris ; renvoie la réponse de la route"""
+    chunk_size = current_app.config.get("IMPORT_CHUNK_SIZE", 1000)
+    max_errors = current_app.config.get("IMPORT_MAX_ERRORS", 1000)
+
+    # Nouvelle transaction : l'état lu est celui laissé par le dernier détenteur du verrou
+    conn.commit()
+    cursor.execute("SELECT * FROM ImportJobs WHERE ID = %s", (job_id,))
+    job = cursor.fetchone()
+    if not job:
+        return jsonify({"error": "Import introuvable"}), 404
+    if job['Kind'] != kind or job['Format'] != fmt:
+        return jsonify({"error": "Cet import concerne un autre type ou format"}), 400
+    if job['Status'] == "Completed":
+        return jsonify({"error": "Import déjà terminé"}), 409
+    cursor.execute("UPDATE ImportJobs SET Status = 'Running' WHERE ID = %s", (job_id,))
+    conn.commit()
+
+    committed = job['CommittedRows']
+    validate = IMPORTERS[kind][1]
+    batch, errors = [], []
+    imported = failed = rejected = 0
+    last_line = committed
+
+    def report(line, message):
+        if len(errors) < max_errors:
+            errors.append({"row": line, "error": message})
+
+    try:
+        for line, row in read_rows(fmt):
+            if line <= committed:
+                continue
+            last_line = line
+            try:
+                if not isinstance(row, dict):
+                    raise RowError("Ligne illisible")
+                batch.append((line, validate(row)))
+            except RowError as e:
+                failed += 1
+                report(line, str(e))
+
+            if line - committed >= chunk_size:
+                count, chunk_errors = write_chunk(conn, cursor, job_id, kind, batch, failed, line)
+                imported += count
+                rejected += failed + len(chunk_errors)
+                for error in chunk_errors:
+                    report(*error)
+                batch, failed, committed = [], 0, line
+
+        if last_line > committed:
+            count, chunk_errors = write_chunk(conn, cursor, job_id, kind, batch, failed, last_line)
+            imported += count
+            rejected += failed + len(chunk_errors)
+            for error in chunk_errors:
+                report(*error)
+            committed = last_line
+    except (ClientDisconnected, UnicodeDecodeError, csv.Error, pymysql.MySQLError) as e:
+        # Le lot en cours est annulé ; les lots précédents restent acquis
+        conn.rollback()
+        cursor.execute("UPDATE ImportJobs SET Status = 'Failed' WHERE ID = %s", (job_id,))
+        conn.commit()
+        return jsonify({
+            "error": f"Import interrompu : {e}",
+            "job": job_id,
+            "committed_rows": committed,
+            "resume": f"{request.path}?format={fmt}&job={job_id}",
+        }), 500
+
+    cursor.execute("UPDATE ImportJobs SET Status = 'Completed' WHERE ID = %s", (job_id,))
+    conn.commit()
+
+    return jsonify({
+        "job": job_id,
+        "status": "Completed",
+        "committed_rows": committed,
+        "imported": imported,
+        "failed": rejected,
+        "errors": sorted(errors, key=lambda e: e["row"]),
+        "errors_truncated": rejected > len(errors),
+    }), 200
+
+
+# --- ROUTE : IMPORT EN MASSE (CLIENTS, PRODUITS, COMMANDES) ---
+@imports_bp.route("/<kind>", methods=["POST"])
+@staff_required(error="Accès interdit")
+def import_rows(kind):
+    if kind not in IMPORTERS:
+        return jsonify({"error": "Type d'import inconnu (customers, products ou orders)"}), 404
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in FORMATS:
+        return jsonify({"error": "format doit valoir 'ndjson' ou 'csv'"}), 400
+
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # Reprise : ?job=<id> saute les lignes déjà validées de ce même fichier
+        if request.args.get("job"):
+            job_id = parse_int(request.args["job"])
+        else:
+            cursor.execute(
+                "INSERT INTO ImportJobs (Kind, Format, StaffID) VALUES (%s, %s, %s)",
+                (kind, fmt, current_staff_id())
+            )
+            job_id = cursor.lastrowid
+            conn.commit()
+
+        # Une seule requête à la fois par import : deux reprises en parallèle du même
+        # fichier inséreraient les mêmes lignes. Verrou de session MySQL, libéré aussi
+        # si le worker meurt (l'import reste alors reprenable)
+        lock = f"hostos:import:{job_id}"
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS Acquired", (lock,))
+        if not cursor.fetchone()['Acquired']:
+            return jsonify({"error": "Import déjà en cours", "job": job_id}), 409
+        try:
+            return run_job(conn, cursor, job_id, kind, fmt)
+        finally:
+            try:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+            except pymysql.MySQLError:
+                # Connexion perdue : le verrou est déjà libéré avec la session
+                pass
+
+
+# --- ROUTE : ÉTAT D'UN IMPORT ---
+@imports_bp.route("/jobs/<int:job_id>", methods=["GET"])
+@staff_required(error="Accès interdit")
+def import_status(job_id):
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM ImportJobs WHERE ID = %s", (job_id,))
+        job = cursor.fetchone()
+    if not job:
+        return jsonify({"error": "Import introuvable"}), 404
+    return jsonify(job), 200
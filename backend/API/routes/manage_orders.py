@@ -1,217 +1,416 @@
-from flask import Blueprint, request, jsonify
-import pymysql
-from config import Config
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, current_app
+from app.db import get_db, release_db
+from app import customer_stats, events, ordering, renewals, revocation
+from flask_jwt_extended import jwt_required, get_jwt
+from app.auth import staff_required, staff_token_is_stale, current_staff_id, current_customer_id
+from app.idempotency import idempotent
+from app.pagination import Keyset, add_filters, paginated_response, parse_datetime, parse_int, where_sql
 from datetime import datetime, timedelta
 
 orders_bp = Blueprint("orders", __name__)
 
-def get_connection():
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
+# Filtres communs des listes de commandes (?status=&customer=&product=&date_from=&date_to=)
+ORDER_FILTERS = {
+    "status": ("o.Status = %s", str),
+    "customer": ("o.CustomerID = %s", parse_int),
+    "product": ("o.ProductID = %s", parse_int),
+    "date_from": ("o.OrderDate >= %s", parse_datetime),
+    "date_to": ("o.OrderDate <= %s", lambda v: parse_datetime(v, end_of_day=True)),
+}
 
-def is_admin(user_id):
-    """Vérifie si l'ID appartient à la table Staff"""
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT ID FROM Staff WHERE ID = %s", (user_id,))
-            return cursor.fetchone() is not None
-    finally:
-        conn.close()
+# Valeurs de l'ENUM Orders.Status
+ORDER_STATUSES = ("Pending", "Processing", "Delivered", "Finished", "Cancelled")
+
+SERVICE_FILTERS = {
+    "status": ("ao.Status = %s", str),
+    "customer": ("ao.CustomerID = %s", parse_int),
+    "product": ("ao.ProductID = %s", parse_int),
+    "date_from": ("ao.EndedAt >= %s", parse_datetime),
+    "date_to": ("ao.EndedAt <= %s", lambda v: parse_datetime(v, end_of_day=True)),
+}
+
+# Requêtes des listes, reprises telles quelles par `python migrate.py check`
+# ({where} : "WHERE ..." ou vide, {order_by} : clé du Keyset)
+ORDERS_LIST_SQL = """
+    SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate, 
+           c.Email as CustomerEmail, p.ProductName
+    FROM Orders o
+    JOIN Customers c ON o.CustomerID = c.ID
+    JOIN Products p ON o.ProductID = p.ID
+    {where}
+    ORDER BY {order_by}
+    LIMIT %s
+"""
+
+SERVICES_LIST_SQL = """
+    SELECT ao.ID, ao.Status, ao.RecurentPrice, ao.StartedAt, ao.EndedAt, 
+           c.Email as CustomerEmail, p.ProductName, ao.CustomerID, ao.ProductID
+    FROM ActualOrders ao
+    JOIN Customers c ON ao.CustomerID = c.ID
+    JOIN Products p ON ao.ProductID = p.ID
+    {where}
+    ORDER BY {order_by}
+    LIMIT %s
+"""
+
+# Service antérieur à ActualOrders.OrderID : rapprochement par client et produit
+TERMINATE_LEGACY_SQL = """
+    UPDATE Orders SET Status = 'Finished' 
+    WHERE CustomerID = %s AND ProductID = %s AND Status = 'Delivered'
+    LIMIT 1
+"""
+
+# Validation : commande(s) lue(s) et verrouillée(s) jusqu'au commit
+# ({placeholders} : un %s par commande du lot)
+VALIDATE_ORDER_SQL = """
+    SELECT o.CustomerID, o.ProductID, o.Status, o.TotalAmount, o.RenewalOf, p.Price 
+    FROM Orders o 
+    JOIN Products p ON o.ProductID = p.ID 
+    WHERE o.ID=%s
+    FOR UPDATE
+"""
+
+VALIDATE_BATCH_SQL = """
+    SELECT o.ID, o.CustomerID, o.ProductID, o.Status, o.TotalAmount, o.RenewalOf, p.Price
+    FROM Orders o
+    JOIN Products p ON o.ProductID = p.ID
+    WHERE o.ID IN ({placeholders})
+    FOR UPDATE
+"""
+
+TERMINATED_SERVICE_SQL = """
+    SELECT CustomerID, ProductID, OrderID, EndedAt > NOW() AS IsActive
+    FROM ActualOrders WHERE ID = %s
+"""
 
 # --- ROUTE : CRÉER UNE COMMANDE (CLIENT OU ADMIN) ---
 @orders_bp.route("/create", methods=["POST"])
 @jwt_required()
+@idempotent
 def create_order():
-    user_id_from_token = int(get_jwt_identity())
     data = request.json
     
     product_id = data.get("ProductID")
-    customer_id = data.get("CustomerID")
-    
-    # Sécurité : Seul un admin peut commander pour quelqu'un d'autre
-    if not is_admin(user_id_from_token) or not customer_id:
-        customer_id = user_id_from_token
+
+    # Sécurité : un client commande pour lui-même, le Staff pour un client désigné
+    if current_staff_id() is not None:
+        customer_id = data.get("CustomerID")
+        if not customer_id:
+            return jsonify({"error": "CustomerID requis pour une commande passée par le Staff"}), 400
+    else:
+        customer_id = current_customer_id()
+        if customer_id is None:
+            return jsonify({"error": "Accès interdit"}), 403
 
     if not product_id:
         return jsonify({"error": "ProductID manquant"}), 400
 
-    conn = get_connection()
+    # Stock réservé, prix figé et commande insérée dans une seule transaction (app/ordering.py)
     try:
-        with conn.cursor() as cursor:
-            # Vérification de l'existence du client (évite l'erreur 1452)
-            cursor.execute("SELECT ID FROM Customers WHERE ID = %s", (customer_id,))
-            if not cursor.fetchone():
-                return jsonify({"error": f"Le client ID {customer_id} n'existe pas"}), 404
-
-            # Récupération du prix
-            cursor.execute("SELECT Price FROM Products WHERE ID=%s", (product_id,))
-            product = cursor.fetchone()
-            if not product:
-                return jsonify({"error": "Produit non trouvé"}), 404
-
-            sql = """
-                INSERT INTO Orders (CustomerID, ProductID, Status, TotalAmount) 
-                VALUES (%s, %s, 'Pending', %s)
-            """
-            cursor.execute(sql, (customer_id, product_id, product['Price']))
-            conn.commit()
-            return jsonify({"msg": "Commande enregistrée."}), 201
-    finally:
-        conn.close()
+        order_id, _ = ordering.place_order(
+            get_db(), customer_id, product_id,
+            retries=current_app.config.get("ORDER_RETRIES", 3),
+            backoff=current_app.config.get("ORDER_RETRY_BACKOFF", 0.02),
+        )
+    except ordering.OrderRejected as e:
+        return jsonify({"error": str(e)}), e.status
+    except ordering.OrderContention:
+        response = jsonify({"error": "Produit très demandé, réessayez dans un instant"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    return jsonify({"msg": "Commande enregistrée.", "OrderID": order_id}), 201
 
 # --- ROUTE : LISTER TOUTES LES COMMANDES (HISTORIQUE GLOBAL) ---
 @orders_bp.route("/list", methods=["GET"])
-@jwt_required()
+@staff_required(error="Accès interdit")
 def list_all_orders():
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès interdit"}), 403
+    page = Keyset([("o.OrderDate", "OrderDate"), ("o.ID", "ID")], descending=True)
+    where, params = [], []
+    add_filters(where, params, ORDER_FILTERS)
+    page.apply(where, params)
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate, 
-                       c.Email as CustomerEmail, p.ProductName
-                FROM Orders o
-                JOIN Customers c ON o.CustomerID = c.ID
-                JOIN Products p ON o.ProductID = p.ID
-                ORDER BY o.OrderDate DESC
-            """
-            cursor.execute(sql)
-            orders = cursor.fetchall()
-            
-            for o in orders:
-                if o['OrderDate']:
-                    o['OrderDate'] = o['OrderDate'].strftime('%Y-%m-%d %H:%M:%S')
-                o['TotalAmount'] = float(o['TotalAmount'])
-                
-            return jsonify(orders), 200
-    finally:
-        conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        sql = ORDERS_LIST_SQL.format(where=where_sql(where), order_by=page.order_by)
+        cursor.execute(sql, (*params, page.fetch_size))
+        orders, next_cursor = page.split(cursor.fetchall())
+        # OrderDate / TotalAmount convertis à l'encodage JSON (app/json_provider.py)
+        return paginated_response(orders, next_cursor), 200
 
 # --- ROUTE : VALIDER ET ACTIVER LE SERVICE ---
 @orders_bp.route("/validate/<int:order_id>", methods=["POST"])
-@jwt_required()
+@staff_required(error="Accès interdit")
+@idempotent
 def validate_order(order_id):
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès interdit"}), 403
-
     data = request.json
     new_status = data.get("Status") # 'Delivered' ou 'Cancelled'
+    if new_status not in ORDER_STATUSES:
+        return jsonify({"error": "Statut invalide"}), 400
 
-    conn = get_connection()
+    conn = get_db()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT o.CustomerID, o.ProductID, p.Price 
-                FROM Orders o 
-                JOIN Products p ON o.ProductID = p.ID 
-                WHERE o.ID=%s
-            """, (order_id,))
+            # Ligne verrouillée jusqu'au commit : deux validations simultanées de la même
+            # commande passent l'une après l'autre et la seconde voit le statut de la première
+            cursor.execute(VALIDATE_ORDER_SQL, (order_id,))
             order = cursor.fetchone()
 
             if not order:
                 return jsonify({"error": "Commande introuvable"}), 404
+            if order['Status'] == new_status:
+                # Rejouer une validation ne doit pas recréer de service ni recompter la synthèse
+                return jsonify({"msg": "Statut inchangé"}), 200
 
-            # 1. Mise à jour Orders
+            # 1. Mise à jour Orders (annulée ou close sans livraison : l'unité réservée est rendue)
             cursor.execute("UPDATE Orders SET Status=%s WHERE ID=%s", (new_status, order_id))
+            pending, spent = customer_stats.order_status_delta(order['Status'], new_status, order['TotalAmount'])
+            if ordering.releases_stock(order['Status'], new_status):
+                ordering.release_stock(cursor, [order_id])
+            elif new_status == "Delivered":
+                ordering.consume_stock(cursor, [order_id])
 
-            # 2. Si livré, on crée l'instance réelle
-            if new_status == "Delivered":
+            period_days = current_app.config.get("BILLING_PERIOD_DAYS", 30)
+
+            # 2. Si livré, on crée l'instance réelle (ou on prolonge le service renouvelé)
+            if new_status == "Delivered" and order['RenewalOf'] and renewals.extend_service(
+                    cursor, order['RenewalOf'], order_id, period_days):
+                # Service réactivé ou prolongé : la synthèse du client est recalculée
+                customer_stats.refresh(cursor, order['CustomerID'])
+                events.publish_services(cursor, "service.updated", [order_id], column="OrderID")
+            elif new_status == "Delivered":
                 started_at = datetime.now()
-                ended_at = started_at + timedelta(days=30)
+                ended_at = started_at + timedelta(days=period_days)
 
                 sql_actual = """
-                    INSERT INTO ActualOrders (CustomerID, ProductID, Status, RecurentPrice, StartedAt, EndedAt)
-                    VALUES (%s, %s, 'Delivered', %s, %s, %s)
+                    INSERT INTO ActualOrders (CustomerID, ProductID, OrderID, Status, RecurentPrice, StartedAt, EndedAt)
+                    VALUES (%s, %s, %s, 'Delivered', %s, %s, %s)
                 """
                 cursor.execute(sql_actual, (
-                    order['CustomerID'], order['ProductID'], 
+                    order['CustomerID'], order['ProductID'], order_id,
                     float(order['Price']), started_at, ended_at
                 ))
+                customer_stats.apply_delta(cursor, order['CustomerID'], pending, spent, active=1, ended_at=ended_at)
+                events.publish_services(cursor, "service.created", [order_id], column="OrderID")
+            else:
+                customer_stats.apply_delta(cursor, order['CustomerID'], pending, spent)
+
+            # 3. Flux /orders/events (validé avec le reste)
+            events.publish_orders(cursor, "order.updated", [order_id])
 
             conn.commit()
             return jsonify({"msg": f"Statut mis à jour : {new_status}"}), 200
     except Exception as e:
         conn.rollback()
         return jsonify({"error": str(e)}), 500
-    finally:
-        conn.close()
+
+# --- ROUTE : VALIDATION GROUPÉE ---
+@orders_bp.route("/validate/batch", methods=["POST"])
+@staff_required(error="Accès interdit")
+@idempotent
+def validate_orders_batch():
+    """
+    Même traitement que /validate/<id> pour N commandes en une transaction :
+    {"Status": "Delivered", "Orders": [12, 13, {"ID": 14, "Status": "Processing"}]}
+    """
+    data = request.json or {}
+    default_status = data.get("Status")
+    items = data.get("Orders")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Liste 'Orders' manquante"}), 400
+    if len(items) > current_app.config.get("VALIDATE_BATCH_MAX", 500):
+        return jsonify({"error": "Trop de commandes dans le lot"}), 400
+
+    # Résultat par élément, dans l'ordre de la requête
+    results, wanted = [], {}
+    for item in items:
+        if isinstance(item, dict):
+            order_id, status = item.get("ID"), item.get("Status", default_status)
+        else:
+            order_id, status = item, default_status
+        result = {"ID": order_id, "Status": status}
+        results.append(result)
+        if not isinstance(order_id, int) or isinstance(order_id, bool):
+            result["error"] = "ID invalide"
+        elif status not in ORDER_STATUSES:
+            result["error"] = "Statut invalide"
+        elif order_id in wanted:
+            result["error"] = "Commande en double dans le lot"
+        else:
+            wanted[order_id] = result
+
+    conn = get_db()
+    try:
+        with conn.cursor() as cursor:
+            orders = {}
+            if wanted:
+                placeholders = ", ".join(["%s"] * len(wanted))
+                cursor.execute(VALIDATE_BATCH_SQL.format(placeholders=placeholders), tuple(wanted))
+                orders = {o['ID']: o for o in cursor.fetchall()}
+
+            changes, services, renewed, released, delivered, deltas = [], [], [], [], [], {}
+            period_days = current_app.config.get("BILLING_PERIOD_DAYS", 30)
+            started_at = datetime.now()
+            ended_at = started_at + timedelta(days=period_days)
+            for order_id, result in wanted.items():
+                order = orders.get(order_id)
+                if not order:
+                    result["error"] = "Commande introuvable"
+                    continue
+                new_status = result["Status"]
+                if order['Status'] == new_status:
+                    # Rejouer un lot ne doit pas recréer de service
+                    result["msg"] = "Statut inchangé"
+                    continue
+                changes.append((order_id, new_status))
+                result["msg"] = f"Statut mis à jour : {new_status}"
+                if ordering.releases_stock(order['Status'], new_status):
+                    released.append(order_id)
+                elif new_status == "Delivered":
+                    delivered.append(order_id)
+
+                pending, spent = customer_stats.order_status_delta(order['Status'], new_status, order['TotalAmount'])
+                delta = deltas.setdefault(order['CustomerID'], {"pending": 0, "spent": 0, "active": 0, "ended_at": None})
+                delta["pending"] += pending
+                delta["spent"] += spent
+                if new_status == "Delivered" and order['RenewalOf']:
+                    renewed.append(order)
+                elif new_status == "Delivered":
+                    services.append((
+                        order['CustomerID'], order['ProductID'], order_id,
+                        float(order['Price']), started_at, ended_at
+                    ))
+                    delta["active"] += 1
+                    delta["ended_at"] = ended_at
+
+            if changes:
+                # 1. Une seule requête pour toutes les commandes
+                cases = " ".join(["WHEN %s THEN %s"] * len(changes))
+                placeholders = ", ".join(["%s"] * len(changes))
+                cursor.execute(
+                    f"UPDATE Orders SET Status = CASE ID {cases} END WHERE ID IN ({placeholders})",
+                    (*[v for change in changes for v in change], *[order_id for order_id, _ in changes])
+                )
+                # Annulées ou closes sans livraison : unités réservées rendues aux produits ;
+                # livrées : unités consommées
+                ordering.release_stock(cursor, released)
+                ordering.consume_stock(cursor, delivered)
+
+            # 2. Instances réelles des commandes livrées, insérées en un lot
+            if services:
+                cursor.executemany("""
+                    INSERT INTO ActualOrders (CustomerID, ProductID, OrderID, Status, RecurentPrice, StartedAt, EndedAt)
+                    VALUES (%s, %s, %s, 'Delivered', %s, %s, %s)
+                """, services)
+
+            # 3. Renouvellements : prolongation du service existant (un nouveau service s'il a été supprimé)
+            for order in renewed:
+                if not renewals.extend_service(cursor, order['RenewalOf'], order['ID'], period_days):
+                    cursor.execute("""
+                        INSERT INTO ActualOrders (CustomerID, ProductID, OrderID, Status, RecurentPrice, StartedAt, EndedAt)
+                        VALUES (%s, %s, %s, 'Delivered', %s, %s, %s)
+                    """, (order['CustomerID'], order['ProductID'], order['ID'], float(order['Price']), started_at, ended_at))
+
+            # 4. Synthèse : une variation cumulée par client, recalcul complet si un service a été prolongé
+            for customer_id, delta in deltas.items():
+                customer_stats.apply_delta(cursor, customer_id, **delta)
+            customer_stats.refresh_many(cursor, sorted({o['CustomerID'] for o in renewed}))
+
+            # 5. Flux /orders/events : un événement par commande modifiée et par service créé / prolongé
+            events.publish_orders(cursor, "order.updated", [order_id for order_id, _ in changes])
+            events.publish_services(cursor, "service.created", [s[2] for s in services], column="OrderID")
+            events.publish_services(cursor, "service.updated", [o['ID'] for o in renewed], column="OrderID")
+
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "updated": len(changes),
+        "services_created": len(services),
+        "services_renewed": len(renewed),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results,
+    }), 200
 
 # --- ROUTE : COMMANDES EN ATTENTE ---
 @orders_bp.route("/list/pending", methods=["GET"])
-@jwt_required()
+@staff_required(error="Accès interdit")
 def list_pending_orders():
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès interdit"}), 403
+    page = Keyset([("o.OrderDate", "OrderDate"), ("o.ID", "ID")])
+    where, params = ["o.Status = 'Pending'"], []
+    add_filters(where, params, {k: v for k, v in ORDER_FILTERS.items() if k != "status"})
+    page.apply(where, params)
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate, 
-                       c.Email as CustomerEmail, p.ProductName
-                FROM Orders o
-                JOIN Customers c ON o.CustomerID = c.ID
-                JOIN Products p ON o.ProductID = p.ID
-                WHERE o.Status = 'Pending'
-                ORDER BY o.OrderDate ASC
-            """
-            cursor.execute(sql)
-            orders = cursor.fetchall()
-            for o in orders:
-                if o['OrderDate']: o['OrderDate'] = o['OrderDate'].strftime('%Y-%m-%d %H:%M:%S')
-                o['TotalAmount'] = float(o['TotalAmount'])
-            return jsonify(orders), 200
-    finally:
-        conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        sql = ORDERS_LIST_SQL.format(where=where_sql(where), order_by=page.order_by)
+        cursor.execute(sql, (*params, page.fetch_size))
+        orders, next_cursor = page.split(cursor.fetchall())
+        return paginated_response(orders, next_cursor), 200
 
 # --- ROUTE : SERVICES ACTIFS (INSTANCES RÉELLES) ---
 @orders_bp.route("/list/actual", methods=["GET"])
-@jwt_required()
+@staff_required(error="Accès interdit")
 def list_actual_services():
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès interdit"}), 403
+    page = Keyset([("ao.EndedAt", "EndedAt"), ("ao.ID", "ID")])
+    where, params = [], []
+    add_filters(where, params, SERVICE_FILTERS)
+    page.apply(where, params)
 
-    conn = get_connection()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        sql = SERVICES_LIST_SQL.format(where=where_sql(where), order_by=page.order_by)
+        cursor.execute(sql, (*params, page.fetch_size))
+        services, next_cursor = page.split(cursor.fetchall())
+        return paginated_response(services, next_cursor), 200
+
+# --- ROUTE : FLUX D'ÉVÉNEMENTS (SERVER-SENT EVENTS) ---
+# Nouvelles commandes, validations et changements de services poussés en direct
+# (app/events.py) ; le client reprend après une coupure grâce à Last-Event-ID
+@orders_bp.route("/events", methods=["GET"])
+@staff_required(error="Accès interdit")
+def order_events():
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    config = current_app.config
     try:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT ao.ID, ao.Status, ao.RecurentPrice, ao.StartedAt, ao.EndedAt, 
-                       c.Email as CustomerEmail, p.ProductName, ao.CustomerID, ao.ProductID
-                FROM ActualOrders ao
-                JOIN Customers c ON ao.CustomerID = c.ID
-                JOIN Products p ON ao.ProductID = p.ID
-                ORDER BY ao.EndedAt ASC
-            """
-            cursor.execute(sql)
-            services = cursor.fetchall()
-            for s in services:
-                s['RecurentPrice'] = float(s['RecurentPrice'])
-                if s['StartedAt']: s['StartedAt'] = s['StartedAt'].strftime('%Y-%m-%d %H:%M:%S')
-                if s['EndedAt']: s['EndedAt'] = s['EndedAt'].strftime('%Y-%m-%d %H:%M:%S')
-            return jsonify(services), 200
-    finally:
-        conn.close()
+        subscriber = events.subscribe(current_app._get_current_object())
+    except events.TooManySubscribers:
+        response = jsonify({"error": "Trop de flux ouverts, réessayez plus tard"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+    try:
+        missed = events.backlog(get_db(), parse_int(last_event_id)) if last_event_id else []
+    except Exception:
+        events.unsubscribe(subscriber)
+        raise
+    # La connexion MySQL de la requête retourne au pool : le flux n'en garde aucune
+    release_db()
+
+    app = current_app._get_current_object()
+    claims = get_jwt()
+
+    def still_valid():
+        # Hors requête : contexte d'application le temps de la vérification (caches locaux,
+        # connexion MySQL prise seulement s'ils sont à rafraîchir et rendue aussitôt)
+        with app.app_context():
+            return not revocation.is_revoked(claims["jti"]) and not staff_token_is_stale(claims)
+
+    response = Response(
+        events.stream(subscriber, missed, config.get("EVENTS_HEARTBEAT", 15), claims["exp"],
+                      still_valid, config.get("EVENTS_AUTH_RECHECK", 5)),
+        content_type="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # nginx : pas de mise en tampon, chaque événement part immédiatement
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 # --- ROUTE : MODIFIER / SUSPENDRE ---
 @orders_bp.route("/actual/edit/<int:service_id>", methods=["PATCH"])
-@jwt_required()
+@staff_required(error="Interdit")
 def edit_actual_service(service_id):
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id): return jsonify({"error": "Interdit"}), 403
-
     data = request.json
     updates = []
     params = []
@@ -223,43 +422,48 @@ def edit_actual_service(service_id):
 
     if not updates: return jsonify({"error": "Rien à modifier"}), 400
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            params.append(service_id)
-            sql = f"UPDATE ActualOrders SET {', '.join(updates)} WHERE ID = %s"
-            cursor.execute(sql, tuple(params))
-            conn.commit()
-            return jsonify({"msg": "Mis à jour"}), 200
-    finally:
-        conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT CustomerID FROM ActualOrders WHERE ID = %s", (service_id,))
+        service = cursor.fetchone()
+
+        params.append(service_id)
+        sql = f"UPDATE ActualOrders SET {', '.join(updates)} WHERE ID = %s"
+        cursor.execute(sql, tuple(params))
+        # EndedAt peut faire entrer / sortir le service des actifs : on recalcule le client
+        if service:
+            customer_stats.refresh(cursor, service['CustomerID'])
+            events.publish_services(cursor, "service.updated", [service_id])
+        conn.commit()
+        return jsonify({"msg": "Mis à jour"}), 200
 
 # --- ROUTE : SUPPRIMER / TERMINER UN SERVICE ---
 @orders_bp.route("/actual/terminate/<int:service_id>", methods=["DELETE"])
-@jwt_required()
+@staff_required(error="Interdit")
 def terminate_service(service_id):
-    user_id = int(get_jwt_identity())
-    if not is_admin(user_id): return jsonify({"error": "Interdit"}), 403
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # Récupérer infos pour archiver
+        cursor.execute(TERMINATED_SERVICE_SQL, (service_id,))
+        service = cursor.fetchone()
+        if not service: return jsonify({"error": "Service non trouvé"}), 404
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # Récupérer infos pour archiver
-            cursor.execute("SELECT CustomerID, ProductID FROM ActualOrders WHERE ID = %s", (service_id,))
-            service = cursor.fetchone()
-            if not service: return jsonify({"error": "Service non trouvé"}), 404
-
-            # 1. Supprimer l'instance
-            cursor.execute("DELETE FROM ActualOrders WHERE ID = %s", (service_id,))
-            
-            # 2. Marquer comme Terminé dans l'historique Orders
+        # 1. Supprimer l'instance (événement publié avant, tant que la ligne existe)
+        events.publish_services(cursor, "service.terminated", [service_id])
+        cursor.execute("DELETE FROM ActualOrders WHERE ID = %s", (service_id,))
+        
+        # 2. Marquer comme Terminé dans l'historique Orders (commande d'origine si connue)
+        if service['OrderID'] is not None:
             cursor.execute("""
-                UPDATE Orders SET Status = 'Finished' 
-                WHERE CustomerID = %s AND ProductID = %s AND Status = 'Delivered'
-                LIMIT 1
-            """, (service['CustomerID'], service['ProductID']))
+                UPDATE Orders SET Status = 'Finished' WHERE ID = %s AND Status = 'Delivered'
+            """, (service['OrderID'],))
+            events.publish_orders(cursor, "order.updated", [service['OrderID']])
+        else:
+            cursor.execute(TERMINATE_LEGACY_SQL, (service['CustomerID'], service['ProductID']))
 
-            conn.commit()
-            return jsonify({"msg": "Service terminé et archivé"}), 200
-    finally:
-        conn.close()
\ No newline at end of file
+        # 3. Synthèse client (Delivered -> Finished ne change pas le total dépensé)
+        if service['IsActive']:
+            customer_stats.apply_delta(cursor, service['CustomerID'], active=-1)
+
+        conn.commit()
+        return jsonify({"msg": "Service terminé et archivé"}), 200
\ No newline at end of file
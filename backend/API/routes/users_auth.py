@@ -1,21 +1,15 @@
-import token
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-import bcrypt
-import pymysql
-from config import Config
+from app.passwords import check_password, rehash_if_needed
+from app.auth import customer_claims
+from app.db import get_db
+from app import revocation
 from flask_jwt_extended import jwt_required, get_jwt
 
 login_bp = Blueprint("login", __name__)
 
-def get_connection():
-    """Crée une connexion à la base MySQL"""
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME
-    )
+# Reprise telle quelle par `python migrate.py check`
+CUSTOMER_LOGIN_SQL = "SELECT ID, PasswordHash, FirstName, LastName FROM Customers WHERE Email=%s"
 
 @login_bp.route("/login", methods=["POST"])
 def login():
@@ -26,38 +20,43 @@ def login():
     if not Email or not Password:
         return jsonify({"error": "Veuillez remplir tous les champs"}), 400
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT ID, PasswordHash, FirstName, LastName FROM Customers WHERE Email=%s", (Email,))
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute(CUSTOMER_LOGIN_SQL, (Email,))
+        user = cursor.fetchone()
 
     if not user:
             return jsonify({"error": "Identifiants invalides"}), 401
 
-    # user[1] = mot de passe hashé stocké en DB
-    if not bcrypt.checkpw(Password.encode('utf-8'), user[1].encode('utf-8')):
+    # PasswordHash = mot de passe hashé stocké en DB (vérifié dans le pool bcrypt)
+    if not check_password(Password, user['PasswordHash']):
         return jsonify({"error": "Identifiants invalides"}), 401
 
-    token = create_access_token(identity=str(user[0]))
+    # Coût bcrypt modifié depuis le dernier hash : on le met à jour
+    with conn.cursor() as cursor:
+        if rehash_if_needed(cursor, "Customers", user['ID'], Password, user['PasswordHash']):
+            conn.commit()
+
+    token = create_access_token(identity=str(user['ID']), additional_claims=customer_claims(user))
     return jsonify({
         "access_token": token,
         "user": {
-            "id": user[0],
-            "firstName": user[2],
-            "lastName": user[3]
+            "id": user['ID'],
+            "firstName": user['FirstName'],
+            "lastName": user['LastName']
         }
     })
 
 logout_bp = Blueprint("logout", __name__)
 
-# Ici on stocke les jti des tokens révoqués
-revoked_tokens = set()
-
 @logout_bp.route("/logout", methods=["POST"])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]  # récupère l'identifiant unique du token
-    revoked_tokens.add(jti)
+    claims = get_jwt()
+    # Le jti (identifiant unique du token) est révoqué jusqu'à son expiration,
+    # pour tous les workers (vérifié par le token_in_blocklist_loader)
+    conn = get_db()
+    with conn.cursor() as cursor:
+        revocation.revoke(cursor, claims["jti"], claims["exp"])
+    conn.commit()
     return jsonify({"msg": "Déconnexion réussie"})
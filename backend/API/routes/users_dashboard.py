@@ -1,130 +1,84 @@
 from flask import Blueprint, jsonify
-import pymysql
-from config import Config
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from app.db import get_db
+from app import customer_stats
+from app.auth import customer_required, current_customer_id
+from app.pagination import Keyset, add_filters, paginated_response, parse_int, where_sql
 
 client_dashboard_bp = Blueprint("client_dashboard", __name__)
 
-def get_connection():
-    """Crée une connexion MySQL"""
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
+# Requêtes reprises telles quelles par `python migrate.py check`
+MY_SERVICES_SQL = """
+    SELECT ao.ID as ServiceID, ao.StartedAt, ao.EndedAt, 
+           p.ProductName, p.Description, p.Price,
+           GREATEST(TIMESTAMPDIFF(DAY, NOW(), ao.EndedAt), 0) AS DaysRemaining,
+           IF(ao.Status = 'Finished', 'Expired', 'Active') AS Status
+    FROM ActualOrders ao
+    JOIN Products p ON ao.ProductID = p.ID
+    WHERE ao.CustomerID = %s
+    ORDER BY ao.EndedAt ASC
+"""
+
+MY_ORDERS_SQL = """
+    SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate, p.ProductName
+    FROM Orders o
+    JOIN Products p ON o.ProductID = p.ID
+    {where}
+    ORDER BY {order_by}
+    LIMIT %s
+"""
 
 # --- ROUTE : RÉSUMÉ DU DASHBOARD (STATISTIQUES) ---
 @client_dashboard_bp.route("/stats", methods=["GET"])
-@jwt_required()
+@customer_required()
 def get_dashboard_stats():
-    # On force la conversion en entier pour éviter les erreurs SQL/422
-    customer_id = int(get_jwt_identity()) 
-
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # 1. Services actifs (Statut 'Delivered' et non expiré)
-            cursor.execute("""
-                SELECT COUNT(*) as active_count 
-                FROM ActualOrders 
-                WHERE CustomerID = %s AND EndedAt > NOW()
-            """, (customer_id,))
-            active_services = cursor.fetchone()['active_count']
+    customer_id = current_customer_id()
 
-            # 2. Commandes en attente (Status 'Pending' ou 'Processing')
-            cursor.execute("""
-                SELECT COUNT(*) as pending_count 
-                FROM Orders 
-                WHERE CustomerID = %s AND Status IN ('Pending', 'Processing')
-            """, (customer_id,))
-            pending_orders = cursor.fetchone()['pending_count']
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # Une seule lecture par clé primaire dans la synthèse CustomerStats
+        # (services actifs non expirés, commandes Pending/Processing, total Delivered/Finished)
+        stats = customer_stats.get(cursor, customer_id)
 
-            # 3. Total dépensé (Uniquement les commandes livrées ou finies)
-            cursor.execute("""
-                SELECT SUM(TotalAmount) as total_spent 
-                FROM Orders 
-                WHERE CustomerID = %s AND Status IN ('Delivered', 'Finished')
-            """, (customer_id,))
-            total_spent = cursor.fetchone()['total_spent'] or 0
+        if not stats:
+            return jsonify({"active_services": 0, "pending_orders": 0, "total_spent": 0.0}), 200
 
-            return jsonify({
-                "active_services": active_services,
-                "pending_orders": pending_orders,
-                "total_spent": float(total_spent)
-            }), 200
-    finally:
-        conn.close()
+        return jsonify({
+            "active_services": stats['ActiveServices'],
+            "pending_orders": stats['PendingOrders'],
+            "total_spent": float(stats['TotalSpent'])
+        }), 200
 
 # --- ROUTE : LISTE DÉTAILLÉE DES SERVICES ACTIFS ---
 @client_dashboard_bp.route("/my-services", methods=["GET"])
-@jwt_required()
+@customer_required()
 def get_my_services():
-    customer_id = int(get_jwt_identity())
-
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            sql = """
-                SELECT ao.ID as ServiceID, ao.StartedAt, ao.EndedAt, 
-                       p.ProductName, p.Description, p.Price
-                FROM ActualOrders ao
-                JOIN Products p ON ao.ProductID = p.ID
-                WHERE ao.CustomerID = %s
-                ORDER BY ao.EndedAt ASC
-            """
-            cursor.execute(sql, (customer_id,))
-            services = cursor.fetchall()
+    customer_id = current_customer_id()
 
-            now = datetime.now()
-            
-            for s in services:
-                # Calcul du temps restant
-                remaining = s['EndedAt'] - now
-                
-                # Formatage propre des dates
-                s['StartedAt'] = s['StartedAt'].strftime('%Y-%m-%d %H:%M:%S') if s['StartedAt'] else None
-                s['EndedAt'] = s['EndedAt'].strftime('%Y-%m-%d %H:%M:%S') if s['EndedAt'] else None
-                s['Price'] = float(s['Price'])
-                
-                # Détermination du statut dynamique
-                if remaining.total_seconds() > 0:
-                    s['DaysRemaining'] = remaining.days
-                    s['Status'] = "Active"
-                else:
-                    s['DaysRemaining'] = 0
-                    s['Status'] = "Expired"
-
-            return jsonify(services), 200
-    finally:
-        conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # Jours restants et statut calculés par MySQL (statut stocké : le planificateur
+        # passe les services échus en Finished) ; dates et prix encodés par le fournisseur JSON
+        cursor.execute(MY_SERVICES_SQL, (customer_id,))
+        services = cursor.fetchall()
+        return jsonify(services), 200
 
 # --- ROUTE : HISTORIQUE DES COMMANDES DU CLIENT ---
 @client_dashboard_bp.route("/my-orders", methods=["GET"])
-@jwt_required()
+@customer_required()
 def get_my_orders():
-    customer_id = int(get_jwt_identity())
-
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # On récupère toutes les commandes peu importe l'état
-            sql = """
-                SELECT o.ID, o.Status, o.TotalAmount, o.OrderDate, p.ProductName
-                FROM Orders o
-                JOIN Products p ON o.ProductID = p.ID
-                WHERE o.CustomerID = %s
-                ORDER BY o.OrderDate DESC
-            """
-            cursor.execute(sql, (customer_id,))
-            orders = cursor.fetchall()
-
-            for o in orders:
-                o['OrderDate'] = o['OrderDate'].strftime('%Y-%m-%d %H:%M:%S')
-                o['TotalAmount'] = float(o['TotalAmount'])
+    customer_id = current_customer_id()
+    page = Keyset([("o.OrderDate", "OrderDate"), ("o.ID", "ID")], descending=True)
+    where, params = ["o.CustomerID = %s"], [customer_id]
+    add_filters(where, params, {
+        "status": ("o.Status = %s", str),
+        "product": ("o.ProductID = %s", parse_int),
+    })
+    page.apply(where, params)
 
-            return jsonify(orders), 200
-    finally:
-        conn.close()
\ No newline at end of file
+    conn = get_db()
+    with conn.cursor() as cursor:
+        # On récupère toutes les commandes peu importe l'état (filtrables par statut / produit)
+        sql = MY_ORDERS_SQL.format(where=where_sql(where), order_by=page.order_by)
+        cursor.execute(sql, (*params, page.fetch_size))
+        orders, next_cursor = page.split(cursor.fetchall())
+        return paginated_response(orders, next_cursor), 200
\ No newline at end of file
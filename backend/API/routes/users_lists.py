@@ -1,76 +1,56 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-import pymysql
-from config import Config
+from flask import Blueprint
+from app.auth import staff_required
+from app.db import get_db
+from app.pagination import Keyset, add_filters, paginated_response, parse_datetime, parse_int, where_sql
 
 customers_list_bp = Blueprint("customers_list", __name__)
 staff_list_bp = Blueprint("staff_list", __name__)
 
-def get_connection():
-    """Crée une connexion à la base MySQL"""
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME,
-        cursorclass=pymysql.cursors.DictCursor
-    )
+# Reprise telle quelle par `python migrate.py check`
+CUSTOMERS_LIST_SQL = """
+    SELECT ID, FirstName, LastName, Email, PhoneNumber, CreatedAt FROM Customers
+    {where}
+    ORDER BY {order_by} LIMIT %s
+"""
 
-def is_admin(user_id):
-    """Vérifie si l'ID appartient à la table Staff"""
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT ID FROM Staff WHERE ID = %s", (user_id,))
-            return cursor.fetchone() is not None
-    finally:
-        conn.close()
+STAFF_LIST_SQL = """
+    SELECT ID, FirstName, LastName, Email, RoleID, CreatedAt FROM Staff
+    {where}
+    ORDER BY {order_by} LIMIT %s
+"""
 
 # --- LISTE DES CLIENTS (ADMIN SEULEMENT) ---
 @customers_list_bp.route("/customers/list", methods=["GET"])
-@jwt_required()
+@staff_required()
 def list_customers():
-    user_id = int(get_jwt_identity())
-    
-    # Sécurité : Seul le Staff peut voir la liste des clients
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès réservé aux administrateurs"}), 403
+    page = Keyset([("ID", "ID")])
+    where, params = [], []
+    add_filters(where, params, {
+        "created_from": ("CreatedAt >= %s", parse_datetime),
+        "created_to": ("CreatedAt <= %s", lambda v: parse_datetime(v, end_of_day=True)),
+    })
+    page.apply(where, params)
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT ID, FirstName, LastName, Email, PhoneNumber, CreatedAt FROM Customers")
-            customers = cursor.fetchall()
-            
-            # Formatage des dates pour le JSON
-            for c in customers:
-                if c['CreatedAt']:
-                    c['CreatedAt'] = c['CreatedAt'].strftime('%Y-%m-%d %H:%M:%S')
-            
-            return jsonify(customers)
-    finally:
-        conn.close()
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute(CUSTOMERS_LIST_SQL.format(where=where_sql(where), order_by=page.order_by),
+                       (*params, page.fetch_size))
+        customers, next_cursor = page.split(cursor.fetchall())
+        # Dates formatées à l'encodage JSON (app/json_provider.py)
+        return paginated_response(customers, next_cursor)
 
 # --- LISTE DU STAFF (ADMIN SEULEMENT) ---
 @staff_list_bp.route("/admins/list", methods=["GET"])
-@jwt_required()
+@staff_required()
 def list_staff():
-    user_id = int(get_jwt_identity())
-    
-    if not is_admin(user_id):
-        return jsonify({"error": "Accès réservé aux administrateurs"}), 403
+    page = Keyset([("ID", "ID")])
+    where, params = [], []
+    add_filters(where, params, {"role": ("RoleID = %s", parse_int)})
+    page.apply(where, params)
 
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT ID, FirstName, LastName, Email, RoleID, CreatedAt FROM Staff")
-            staff = cursor.fetchall()
-            
-            # Formatage des dates pour le JSON
-            for s in staff:
-                if s['CreatedAt']:
-                    s['CreatedAt'] = s['CreatedAt'].strftime('%Y-%m-%d %H:%M:%S')
-            
-            return jsonify(staff)
-    finally:
-        conn.close()
\ No newline at end of file
+    conn = get_db()
+    with conn.cursor() as cursor:
+        cursor.execute(STAFF_LIST_SQL.format(where=where_sql(where), order_by=page.order_by),
+                       (*params, page.fetch_size))
+        staff, next_cursor = page.split(cursor.fetchall())
+        return paginated_response(staff, next_cursor)
\ No newline at end of file
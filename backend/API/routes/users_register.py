@@ -1,20 +1,16 @@
 from flask import Blueprint, request, jsonify
-import pymysql
-import bcrypt
-from config import Config
+from app.passwords import hash_password
+from app.db import get_db
+from app.idempotency import idempotent
 
 register_bp = Blueprint("register", __name__)
 
-def get_connection():
-    """Crée une connexion MySQL"""
-    return pymysql.connect(
-        host=Config.DB_HOST,
-        user=Config.DB_USER,
-        password=Config.DB_PASSWORD,
-        database=Config.DB_NAME
-    )
+# Reprises telles quelles par `python migrate.py check`
+CUSTOMER_EXISTS_SQL = "SELECT ID FROM Customers WHERE Email=%s"
+STAFF_EXISTS_SQL = "SELECT ID FROM Staff WHERE Email=%s"
 
 @register_bp.route("/register", methods=["POST"])
+@idempotent
 def register():
     data = request.json
     FirstName = data.get("FirstName")
@@ -28,28 +24,26 @@ def register():
 
     if not 1<=len(FirstName)<=50 or not 1<=len(LastName)<=50 or not 1<=len(Email)<=100 or not 10<=len(PhoneNumber)<=15 or not 8<=len(Password)<=100:
         return jsonify({"error": "Longueur des champs invalide"}), 400
-    
-    # Hash du mot de passe
-    hashed_pw = bcrypt.hashpw(Password.encode('utf-8'), bcrypt.gensalt())
 
-    conn = get_connection()
+    conn = get_db()
     cursor = conn.cursor()
 
     # Vérifie si l'utilisateur existe déjà
-    cursor.execute("SELECT ID FROM Customers WHERE Email=%s", (Email,))
+    cursor.execute(CUSTOMER_EXISTS_SQL, (Email,))
     if cursor.fetchone():
         cursor.close()
-        conn.close()
         return jsonify({"error": "Utilisateur déjà existant"}), 409
 
+    # Hash du mot de passe (après la vérification : pas de bcrypt pour un doublon)
+    hashed_pw = hash_password(Password)
+
     # Insère le nouvel utilisateur
     cursor.execute(
         "INSERT INTO Customers (FirstName, LastName, Email, PhoneNumber, PasswordHash) VALUES (%s, %s, %s, %s, %s)",
-        (FirstName, LastName, Email, PhoneNumber, hashed_pw.decode('utf-8'))
+        (FirstName, LastName, Email, PhoneNumber, hashed_pw)
     )
     conn.commit()
     cursor.close()
-    conn.close()
 
     return jsonify({"msg": "Utilisateur créé avec succès !"})
 
@@ -58,6 +52,7 @@ def register():
 admin_register_bp = Blueprint("admin_register", __name__)
 
 @admin_register_bp.route("/admin/register", methods=["POST"])
+@idempotent
 def register():
     data = request.json
     FirstName = data.get("FirstName")
@@ -70,27 +65,25 @@ def register():
 
     if not 1<=len(FirstName)<=50 or not 1<=len(LastName)<=50 or not 1<=len(Email)<=100 or not 8<=len(Password)<=100:
         return jsonify({"error": "Longueur des champs invalide"}), 400
-    
-    # Hash du mot de passe
-    hashed_pw = bcrypt.hashpw(Password.encode('utf-8'), bcrypt.gensalt())
 
-    conn = get_connection()
+    conn = get_db()
     cursor = conn.cursor()
 
     # Vérifie si l'utilisateur existe déjà
-    cursor.execute("SELECT ID FROM Staff WHERE Email=%s", (Email,))
+    cursor.execute(STAFF_EXISTS_SQL, (Email,))
     if cursor.fetchone():
         cursor.close()
-        conn.close()
         return jsonify({"error": "Utilisateur déjà existant"}), 409
 
+    # Hash du mot de passe (après la vérification : pas de bcrypt pour un doublon)
+    hashed_pw = hash_password(Password)
+
     # Insère le nouvel utilisateur
     cursor.execute(
         "INSERT INTO Staff (FirstName, LastName, Email, PasswordHash, RoleID) VALUES (%s, %s, %s, %s, %s)",
-        (FirstName, LastName, Email, hashed_pw.decode('utf-8'), 2)
+        (FirstName, LastName, Email, hashed_pw, 2)
     )
     conn.commit()
     cursor.close()
-    conn.close()
 
     return jsonify({"msg": "Utilisateur créé avec succès !"})
@@ -0,0 +1,77 @@
+"""
+Planificateur des tâches de fond, à lancer à côté de gunicorn (processus séparé) :
+
+    python scheduler.py                       # boucle : chaque tâche à son intervalle
+    python scheduler.py run expire-services   # une passe immédiate puis sortie
+    python scheduler.py run renew-services --dry-run   # compte ce qui serait fait, sans écrire
+    python scheduler.py list                  # tâches disponibles
+
+Plusieurs instances peuvent tourner sans doublon : chaque passe prend un verrou
+MySQL (GET_LOCK) au nom de la tâche et est sautée si une autre instance le détient.
+"""
+import sys
+import time
+
+from app import create_app
+from app.db import get_db
+from app import expiry, renewals
+
+# Nom -> (fonction(conn, config) renvoyant un résumé, réglage de l'intervalle en secondes)
+TASKS = {
+    "expire-services": (expiry.expire_services, "EXPIRY_INTERVAL"),
+    "renew-services": (renewals.renew_services, "RENEWAL_INTERVAL"),
+}
+
+
+def run_task(app, name, **options):
+    task, _ = TASKS[name]
+    lock = f"hostos:{name}"
+    with app.app_context():
+        conn = get_db()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0) AS Acquired", (lock,))
+            if not cursor.fetchone()['Acquired']:
+                print(f"{name} : déjà en cours ailleurs, passe sautée", flush=True)
+                return None
+        try:
+            started = time.monotonic()
+            result = task(conn, app.config, **options)
+            print(f"{name} : {result} ({time.monotonic() - started:.1f} s)", flush=True)
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            # Le verrou est lié à la session : à libérer avant de rendre la connexion au pool
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+
+
+def run_forever(app):
+    next_run = {name: 0.0 for name in TASKS}
+    while True:
+        for name, (_, interval) in TASKS.items():
+            if time.monotonic() < next_run[name]:
+                continue
+            try:
+                run_task(app, name)
+            except Exception as e:
+                # Une passe en échec ne doit pas arrêter les autres tâches
+                print(f"{name} : échec ({e})", flush=True)
+            next_run[name] = time.monotonic() + app.config.get(interval, 60)
+        time.sleep(max(0.5, min(next_run.values()) - time.monotonic()))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    app = create_app()
+    if not args:
+        run_forever(app)
+    elif args[0] == "list":
+        for name, (_, interval) in TASKS.items():
+            print(f"{name}  (toutes les {app.config.get(interval, 60)} s)")
+    elif args[0] == "run" and len(args) >= 2 and args[1] in TASKS and set(args[2:]) <= {"--dry-run"}:
+        run_task(app, args[1], **({"dry_run": True} if "--dry-run" in args else {}))
+    else:
+        print(__doc__)
+        sys.exit(2)
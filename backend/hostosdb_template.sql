@@ -25,6 +25,13 @@ create table Staff (
     Foreign key (RoleID) references Roles(ID)
 );
 
+-- Dernière modification (rôle, mot de passe) ou suppression d'un membre du Staff
+-- (timestamp UNIX) : les tokens Staff émis avant sont refusés
+create table StaffChanges (
+    StaffID int primary key,
+    ChangedAt int not null
+);
+
 create table Products (
     ID int primary key auto_increment,
     ProductName varchar(100) not null,
@@ -56,7 +63,9 @@ create table ActualOrders (
     EndedAt datetime not null,
     Foreign key (CustomerID) references Customers(ID) ON DELETE CASCADE,
     Foreign key (ProductID) references Products(ID) ON DELETE CASCADE
-)
+);
+
+-- Les index et évolutions de schéma sont appliqués ensuite par backend/API/migrate.py
 
 Insert into Roles (RoleName, Description) values
 ("Admin", "Administrator with full access"),
@@ -0,0 +1,19 @@
+import { Button } from '@/components/ui/button';
+
+interface LoadMoreProps {
+  hasMore: boolean;
+  isLoading: boolean;
+  onClick: () => void;
+}
+
+// Bouton « Charger plus » sous une liste paginée (rien à la dernière page)
+export function LoadMore({ hasMore, isLoading, onClick }: LoadMoreProps) {
+  if (!hasMore) return null;
+  return (
+    <div className="flex justify-center">
+      <Button variant="outline" onClick={onClick} disabled={isLoading}>
+        {isLoading ? 'Chargement...' : 'Charger plus'}
+      </Button>
+    </div>
+  );
+}
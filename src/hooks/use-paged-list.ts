@@ -0,0 +1,43 @@
+import { useCallback, useEffect, useState } from 'react';
+import type { ApiResponse } from '@/lib/api';
+
+// Liste paginée par curseur : première page au montage, les suivantes à la demande
+// (loadMore). `fetchPage` doit être stable (méthode de l'API, pas une fonction recréée).
+export function usePagedList<T extends { ID: number }>(
+  fetchPage: (cursor?: string) => Promise<ApiResponse<T[]>>
+) {
+  const [items, setItems] = useState<T[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | undefined>();
+  const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const reload = useCallback(async () => {
+    const { data, nextCursor } = await fetchPage();
+    if (data) {
+      setItems(data);
+      setNextCursor(nextCursor);
+    }
+    setIsLoading(false);
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    const { data, nextCursor: following } = await fetchPage(nextCursor);
+    if (data) {
+      // Une ligne déjà reçue (ajoutée par le flux d'événements par exemple) n'est pas dupliquée
+      setItems((current) => {
+        const known = new Set(current.map((item) => item.ID));
+        return [...current, ...data.filter((item) => !known.has(item.ID))];
+      });
+      setNextCursor(following);
+    }
+    setIsLoadingMore(false);
+  }, [fetchPage, nextCursor]);
+
+  useEffect(() => {
+    reload();
+  }, [reload]);
+
+  return { items, setItems, isLoading, isLoadingMore, hasMore: !!nextCursor, loadMore, reload };
+}
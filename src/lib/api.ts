@@ -2,9 +2,10 @@ import { config } from '@/config';
 
 const API_BASE_URL = config.apiUrl;
 
-interface ApiResponse<T = unknown> {
+export interface ApiResponse<T = unknown> {
   data?: T;
   error?: string;
+  nextCursor?: string;
 }
 
 async function fetchApi<T>(
@@ -40,12 +41,21 @@ async function fetchApi<T>(
       return { error: data.error || data.msg || 'Une erreur est survenue' };
     }
 
-    return { data };
+    return { data, nextCursor: response.headers.get('X-Next-Cursor') || undefined };
   } catch (error) {
     return { error: 'Erreur de connexion au serveur' };
   }
 }
 
+// Listes paginées par curseur : une page à la fois, la suivante à la demande avec
+// nextCursor (en-tête X-Next-Cursor, absent à la dernière page)
+export const PAGE_SIZE = 100;
+
+function pageOf(endpoint: string, cursor?: string, limit = PAGE_SIZE): string {
+  const separator = endpoint.includes('?') ? '&' : '?';
+  return `${endpoint}${separator}limit=${limit}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`;
+}
+
 // Auth API
 export const authApi = {
   login: (email: string, password: string) =>
@@ -71,14 +81,14 @@ export const authApi = {
 
 // Admin API
 export const adminApi = {
-  getCustomers: () =>
+  getCustomers: (cursor?: string) =>
     fetchApi<Array<{ ID: number; FirstName: string; LastName: string; Email: string; PhoneNumber: string; CreatedAt: string }>>(
-      '/admin/customers/list'
+      pageOf('/admin/customers/list', cursor)
     ),
 
-  getStaff: () =>
+  getStaff: (cursor?: string) =>
     fetchApi<Array<{ ID: number; FirstName: string; LastName: string; Email: string; RoleID: number; CreatedAt: string }>>(
-      '/admin/admins/list'
+      pageOf('/admin/admins/list', cursor)
     ),
 
   deleteStaff: (id: number) =>
@@ -99,12 +109,43 @@ export const adminApi = {
   editCustomer: (id: number, data: Partial<{ FirstName: string; LastName: string; Email: string; PhoneNumber: string; Password: string }>) =>
     fetchApi<{ msg: string }>(`/admin/customer/edit/${id}`, { method: 'PATCH', body: JSON.stringify(data) }),
 
+  getSummary: () =>
+    fetchApi<Array<{
+      customers: number;
+      staff: number;
+      products: number;
+      pending_orders: number;
+      total_revenue: number;
+      active_services: number;
+      recurring_revenue: number;
+      expiring_soon: number;
+      recent_orders: Array<{ ID: number; Status: string; TotalAmount: number; OrderDate: string; CustomerEmail: string; ProductName: string }>;
+    }>('/admin/summary'),
+
+  search: (q: string, type = 'customers,orders,products', limit = 50) =>
+    fetchApi<{
+      query: string;
+      customers?: Array<{ ID: number; FirstName: string; LastName: string; Email: string; PhoneNumber: string; CreatedAt: string }>;
+      orders?: Array<{ ID: number; Status: string; TotalAmount: number; OrderDate: string; CustomerID: number; CustomerEmail: string; ProductName: string }>;
+      products?: Array<{ ID: number; ProductName: string; Description: string; Price: number; StockQuantity: number | null }>;
+    }>(`/admin/search?q=${encodeURIComponent(q)}&type=${type}&limit=${limit}`),
+
   getStaffInfo: (id: number) =>
     fetchApi<{ ID: number; FirstName: string; LastName: string; Email: string; RoleID: number; RoleName: string; CreatedAt: string }>(
       `/admin/staff/infos/${id}`
     ),
 };
 
+// Même règle que /admin/search (MIN_TERM_LENGTH) : un mot de 3 caractères ou plus,
+// un nombre (ID) ou un texte contenant @ (e-mail) ; sinon l'API répond 400
+export const SEARCH_MIN_TERM_LENGTH = 3;
+
+export function isSearchable(q: string): boolean {
+  const query = q.trim();
+  if (/^\d+$/.test(query) || query.includes('@')) return true;
+  return (query.match(/[\p{L}\p{N}_]+/gu) ?? []).some((t) => t.length >= SEARCH_MIN_TERM_LENGTH);
+}
+
 // Customer API
 export const customerApi = {
   getInfo: (id: number) =>
@@ -115,15 +156,15 @@ export const customerApi = {
 
 // Products API
 export const productsApi = {
-  getAll: () =>
-    fetchApi<Array<{ ID: number; ProductName: string; Description: string; Price: number; StockQuantity: number }>>(
-      '/products/list'
+  getAll: (cursor?: string) =>
+    fetchApi<Array<{ ID: number; ProductName: string; Description: string; Price: number; StockQuantity: number | null }>>(
+      pageOf('/products/list', cursor)
     ),
 
-  create: (data: { ProductName: string; Description?: string; Price: number; StockQuantity?: number }) =>
+  create: (data: { ProductName: string; Description?: string; Price: number; StockQuantity?: number | null }) =>
     fetchApi<{ msg: string }>('/products/admin/create', { method: 'POST', body: JSON.stringify(data) }),
 
-  edit: (id: number, data: Partial<{ ProductName: string; Description: string; Price: number; StockQuantity: number }>) =>
+  edit: (id: number, data: Partial<{ ProductName: string; Description: string; Price: number; StockQuantity: number | null }>) =>
     fetchApi<{ msg: string }>(`/products/admin/edit/${id}`, { method: 'PATCH', body: JSON.stringify(data) }),
 
   delete: (id: number) =>
@@ -138,14 +179,14 @@ export const ordersApi = {
       body: JSON.stringify({ ProductID: productId, ...(customerId && { CustomerID: customerId }) }),
     }),
 
-  getAll: () =>
+  getAll: (cursor?: string) =>
     fetchApi<Array<{ ID: number; Status: string; TotalAmount: number; OrderDate: string; CustomerEmail: string; ProductName: string }>>(
-      '/orders/list'
+      pageOf('/orders/list', cursor)
     ),
 
-  getPending: () =>
+  getPending: (cursor?: string) =>
     fetchApi<Array<{ ID: number; Status: string; TotalAmount: number; OrderDate: string; CustomerEmail: string; ProductName: string }>>(
-      '/orders/list/pending'
+      pageOf('/orders/list/pending', cursor)
     ),
 
   validate: (orderId: number, status: 'Delivered' | 'Cancelled') =>
@@ -154,7 +195,7 @@ export const ordersApi = {
       body: JSON.stringify({ Status: status }),
     }),
 
-  getActiveServices: () =>
+  getActiveServices: (cursor?: string) =>
     fetchApi<Array<{
       ID: number;
       Status: string;
@@ -165,13 +206,66 @@ export const ordersApi = {
       ProductName: string;
       CustomerID: number;
       ProductID: number;
-    }>>('/orders/list/actual'),
+    }>>(pageOf('/orders/list/actual', cursor)),
 
   editService: (id: number, data: Partial<{ Status: string; RecurentPrice: number; EndedAt: string }>) =>
     fetchApi<{ msg: string }>(`/orders/actual/edit/${id}`, { method: 'PATCH', body: JSON.stringify(data) }),
 
   terminateService: (id: number) =>
     fetchApi<{ msg: string }>(`/orders/actual/terminate/${id}`, { method: 'DELETE' }),
+
+  // Flux /orders/events lu avec fetch (EventSource n'envoie pas l'en-tête Authorization).
+  // Reconnexion automatique avec Last-Event-ID ; renvoie la fonction d'arrêt.
+  subscribeEvents: (onEvent: (type: string, data: Record<string, unknown>) => void) => {
+    const controller = new AbortController();
+    let lastEventId = '';
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const token = localStorage.getItem('access_token');
+          const response = await fetch(`${API_BASE_URL}/orders/events`, {
+            headers: {
+              ...(token && { Authorization: `Bearer ${token}` }),
+              ...(lastEventId && { 'Last-Event-ID': lastEventId }),
+            },
+            signal: controller.signal,
+          });
+          if (response.status === 401 || response.status === 403) return;
+
+          if (response.ok && response.body) {
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            for (;;) {
+              const { value, done } = await reader.read();
+              if (done) break;
+              buffer += value;
+              let end = buffer.indexOf('\n\n');
+              while (end >= 0) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let type = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                  if (line.startsWith('id: ')) lastEventId = line.slice(4);
+                  else if (line.startsWith('event: ')) type = line.slice(7);
+                  else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (data) onEvent(type, JSON.parse(data));
+                end = buffer.indexOf('\n\n');
+              }
+            }
+          }
+        } catch {
+          if (controller.signal.aborted) return;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 3000));
+      }
+    };
+
+    connect();
+    return () => controller.abort();
+  },
 };
 
 // Dashboard API (Client)
@@ -191,8 +285,8 @@ export const dashboardApi = {
       Status: 'Active' | 'Expired';
     }>>('/me/my-services'),
 
-  getMyOrders: () =>
+  getMyOrders: (cursor?: string) =>
     fetchApi<Array<{ ID: number; Status: string; TotalAmount: number; OrderDate: string; ProductName: string }>>(
-      '/me/my-orders'
+      pageOf('/me/my-orders', cursor)
     ),
 };
@@ -1,7 +1,9 @@
 import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
-import { adminApi } from '@/lib/api';
+import { LoadMore } from '@/components/LoadMore';
+import { adminApi, isSearchable } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -27,10 +29,11 @@ interface Customer {
 }
 
 export default function AdminCustomers() {
-  const [customers, setCustomers] = useState<Customer[]>([]);
+  const {
+    items: customers, isLoading, isLoadingMore, hasMore, loadMore, reload: fetchCustomers,
+  } = usePagedList<Customer>(adminApi.getCustomers);
   const [filtered, setFiltered] = useState<Customer[]>([]);
   const [search, setSearch] = useState('');
-  const [isLoading, setIsLoading] = useState(true);
   const [showCreate, setShowCreate] = useState(false);
   const [editCustomer, setEditCustomer] = useState<Customer | null>(null);
   const [deleteCustomer, setDeleteCustomer] = useState<Customer | null>(null);
@@ -52,29 +55,29 @@ export default function AdminCustomers() {
     phone: '',
   });
 
-  const fetchCustomers = async () => {
-    const { data } = await adminApi.getCustomers();
-    if (data) {
-      setCustomers(data);
-      setFiltered(data);
-    }
-    setIsLoading(false);
-  };
-
   useEffect(() => {
-    fetchCustomers();
-  }, []);
-
-  useEffect(() => {
-    const q = search.toLowerCase();
-    setFiltered(
-      customers.filter(
-        (c) =>
-          c.FirstName.toLowerCase().includes(q) ||
-          c.LastName.toLowerCase().includes(q) ||
-          c.Email.toLowerCase().includes(q)
-      )
-    );
+    const q = search.trim().toLowerCase();
+    if (!isSearchable(q)) {
+      setFiltered(
+        customers.filter(
+          (c) =>
+            c.FirstName.toLowerCase().includes(q) ||
+            c.LastName.toLowerCase().includes(q) ||
+            c.Email.toLowerCase().includes(q)
+        )
+      );
+      return;
+    }
+    // Recherche côté API (index MySQL) : toute la base, pas seulement la page chargée
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const { data } = await adminApi.search(q, 'customers');
+      if (!cancelled && data?.customers) setFiltered(data.customers);
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [search, customers]);
 
   const resetCreateForm = () => {
@@ -238,6 +241,7 @@ export default function AdminCustomers() {
           emptyMessage="Aucun client trouvé"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore && !isSearchable(search)} isLoading={isLoadingMore} onClick={loadMore} />
 
         {/* Create Dialog */}
         <Dialog open={showCreate} onOpenChange={setShowCreate}>
@@ -2,7 +2,7 @@ import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { StatCard } from '@/components/ui/stat-card';
-import { adminApi, ordersApi, productsApi } from '@/lib/api';
+import { adminApi } from '@/lib/api';
 import { Users, UserCog, Package, Clock, Wallet, ClipboardList, ShieldOff, ShieldCheck, AlertTriangle } from 'lucide-react';
 import { useAuth } from '@/contexts/AuthContext';
 import { Switch } from '@/components/ui/switch';
@@ -50,22 +50,18 @@ export default function AdminDashboard() {
 
   useEffect(() => {
     const fetchStats = async () => {
-      const [customersRes, staffRes, productsRes, pendingRes, servicesRes] = await Promise.all([
-        adminApi.getCustomers(),
-        adminApi.getStaff(),
-        productsApi.getAll(),
-        ordersApi.getPending(),
-        ordersApi.getActiveServices(),
-      ]);
+      const { data } = await adminApi.getSummary();
 
-      setStats({
-        customers: customersRes.data?.length || 0,
-        staff: staffRes.data?.length || 0,
-        products: productsRes.data?.length || 0,
-        pendingOrders: pendingRes.data?.length || 0,
-        activeServices: servicesRes.data?.length || 0,
-        totalRevenue: servicesRes.data?.reduce((sum, s) => sum + s.RecurentPrice, 0) || 0,
-      });
+      if (data) {
+        setStats({
+          customers: data.customers,
+          staff: data.staff,
+          products: data.products,
+          pendingOrders: data.pending_orders,
+          activeServices: data.active_services,
+          totalRevenue: data.recurring_revenue,
+        });
+      }
       setIsLoading(false);
     };
 
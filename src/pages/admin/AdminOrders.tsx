@@ -2,8 +2,11 @@ import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
 import { StatusBadge } from '@/components/ui/status-badge';
-import { ordersApi, adminApi, productsApi } from '@/lib/api';
+import { LoadMore } from '@/components/LoadMore';
+import { ordersApi, adminApi, productsApi, isSearchable } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
+import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import {
   Dialog,
@@ -15,7 +18,7 @@ import {
 import { toast } from 'sonner';
 import { format } from 'date-fns';
 import { fr } from 'date-fns/locale';
-import { Plus } from 'lucide-react';
+import { Plus, Search } from 'lucide-react';
 
 interface Order {
   ID: number;
@@ -37,44 +40,95 @@ interface Product {
   ID: number;
   ProductName: string;
   Price: number;
-  StockQuantity: number;
+  StockQuantity: number | null;
 }
 
 export default function AdminOrders() {
-  const [orders, setOrders] = useState<Order[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
+  const {
+    items: orders, isLoading, isLoadingMore, hasMore, loadMore, reload: fetchOrders,
+  } = usePagedList<Order>(ordersApi.getAll);
+  const [filtered, setFiltered] = useState<Order[]>([]);
+  const [search, setSearch] = useState('');
   const [showCreate, setShowCreate] = useState(false);
   const [customers, setCustomers] = useState<Customer[]>([]);
   const [products, setProducts] = useState<Product[]>([]);
+  const [customerSearch, setCustomerSearch] = useState('');
+  const [productSearch, setProductSearch] = useState('');
   const [isCreating, setIsCreating] = useState(false);
   const [createForm, setCreateForm] = useState({
     customerId: '',
     productId: '',
   });
 
-    const fetchOrders = async () => {
-      const { data } = await ordersApi.getAll();
-      if (data) setOrders(data);
-      setIsLoading(false);
+  useEffect(() => {
+    const q = search.trim().toLowerCase();
+    if (!isSearchable(q)) {
+      setFiltered(
+        orders.filter(
+          (o) =>
+            o.CustomerEmail.toLowerCase().includes(q) ||
+            o.ProductName.toLowerCase().includes(q)
+        )
+      );
+      return;
+    }
+    // Recherche côté API (index MySQL) : toutes les commandes, pas seulement la page chargée
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const { data } = await adminApi.search(q, 'orders');
+      if (!cancelled && data?.orders) setFiltered(data.orders);
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
     };
+  }, [search, orders]);
 
+  // Listes du formulaire : première page, ou résultats de /admin/search dès que la saisie le permet
   useEffect(() => {
-    fetchOrders();
-  }, []);
+    if (!showCreate) return;
+    const q = customerSearch.trim().toLowerCase();
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      if (isSearchable(q)) {
+        const { data } = await adminApi.search(q, 'customers');
+        if (!cancelled && data?.customers) setCustomers(data.customers);
+      } else {
+        const { data } = await adminApi.getCustomers();
+        if (!cancelled && data) setCustomers(data);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [showCreate, customerSearch]);
 
   useEffect(() => {
-    if (showCreate) {
-      const loadData = async () => {
-        const [customersRes, productsRes] = await Promise.all([
-          adminApi.getCustomers(),
-          productsApi.getAll(),
-        ]);
-        if (customersRes.data) setCustomers(customersRes.data);
-        if (productsRes.data) setProducts(productsRes.data);
-      };
-      loadData();
-    }
-  }, [showCreate]);
+    if (!showCreate) return;
+    const q = productSearch.trim().toLowerCase();
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      if (isSearchable(q)) {
+        const { data } = await adminApi.search(q, 'products');
+        if (!cancelled && data?.products) setProducts(data.products);
+      } else {
+        const { data } = await productsApi.getAll();
+        if (!cancelled && data) setProducts(data);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [showCreate, productSearch]);
+
+  const closeCreate = () => {
+    setShowCreate(false);
+    setCreateForm({ customerId: '', productId: '' });
+    setCustomerSearch('');
+    setProductSearch('');
+  };
 
   const handleCreate = async () => {
     if (!createForm.customerId || !createForm.productId) {
@@ -93,8 +147,7 @@ export default function AdminOrders() {
       toast.error(error);
     } else {
       toast.success('Commande créée avec succès');
-      setShowCreate(false);
-      setCreateForm({ customerId: '', productId: '' });
+      closeCreate();
       fetchOrders();
     }
   };
@@ -135,16 +188,27 @@ export default function AdminOrders() {
           </Button>
         </div>
 
+        <div className="relative max-w-sm">
+          <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-muted-foreground" />
+          <Input
+            placeholder="Rechercher une commande..."
+            value={search}
+            onChange={(e) => setSearch(e.target.value)}
+            className="pl-10"
+          />
+        </div>
+
         <DataTable
           columns={columns}
-          data={orders}
+          data={filtered}
           isLoading={isLoading}
           emptyMessage="Aucune commande trouvée"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore && !isSearchable(search)} isLoading={isLoadingMore} onClick={loadMore} />
 
         {/* Create Dialog */}
-        <Dialog open={showCreate} onOpenChange={setShowCreate}>
+        <Dialog open={showCreate} onOpenChange={(open) => (open ? setShowCreate(true) : closeCreate())}>
           <DialogContent>
             <DialogHeader>
               <DialogTitle>Créer une commande manuellement</DialogTitle>
@@ -152,6 +216,14 @@ export default function AdminOrders() {
             <div className="space-y-4 py-4">
               <div className="space-y-2">
                 <Label>Client</Label>
+                <Input
+                  placeholder="Rechercher un client (nom, e-mail, n°)..."
+                  value={customerSearch}
+                  onChange={(e) => {
+                    setCustomerSearch(e.target.value);
+                    setCreateForm({ ...createForm, customerId: '' });
+                  }}
+                />
                 <select
                   value={createForm.customerId}
                   onChange={(e) => setCreateForm({ ...createForm, customerId: e.target.value })}
@@ -167,6 +239,14 @@ export default function AdminOrders() {
               </div>
               <div className="space-y-2">
                 <Label>Produit</Label>
+                <Input
+                  placeholder="Rechercher un produit..."
+                  value={productSearch}
+                  onChange={(e) => {
+                    setProductSearch(e.target.value);
+                    setCreateForm({ ...createForm, productId: '' });
+                  }}
+                />
                 <select
                   value={createForm.productId}
                   onChange={(e) => setCreateForm({ ...createForm, productId: e.target.value })}
@@ -183,7 +263,7 @@ export default function AdminOrders() {
               </div>
             </div>
             <DialogFooter>
-              <Button variant="outline" onClick={() => { setShowCreate(false); setCreateForm({ customerId: '', productId: '' }); }}>
+              <Button variant="outline" onClick={closeCreate}>
                 Annuler
               </Button>
               <Button onClick={handleCreate} disabled={isCreating}>
@@ -2,7 +2,9 @@ import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
 import { StatusBadge } from '@/components/ui/status-badge';
+import { LoadMore } from '@/components/LoadMore';
 import { ordersApi } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { toast } from 'sonner';
 import { format } from 'date-fns';
@@ -19,19 +21,22 @@ interface Order {
 }
 
 export default function AdminPendingOrders() {
-  const [orders, setOrders] = useState<Order[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
+  const {
+    items: orders, setItems: setOrders, isLoading, isLoadingMore, hasMore, loadMore,
+  } = usePagedList<Order>(ordersApi.getPending);
   const [processingId, setProcessingId] = useState<number | null>(null);
 
-  const fetchOrders = async () => {
-    const { data } = await ordersApi.getPending();
-    if (data) setOrders(data);
-    setIsLoading(false);
-  };
-
   useEffect(() => {
-    fetchOrders();
-  }, []);
+    // Nouvelles commandes et validations (y compris par un autre admin) sans relire la liste
+    return ordersApi.subscribeEvents((type, data) => {
+      if (!type.startsWith('order.')) return;
+      const order = data as unknown as Order;
+      setOrders((current) => {
+        const others = current.filter((o) => o.ID !== order.ID);
+        return order.Status === 'Pending' ? [...others, order] : others;
+      });
+    });
+  }, [setOrders]);
 
   const handleValidate = async (orderId: number, status: 'Delivered' | 'Cancelled') => {
     setProcessingId(orderId);
@@ -42,7 +47,7 @@ export default function AdminPendingOrders() {
       toast.error(error);
     } else {
       toast.success(status === 'Delivered' ? 'Commande validée et service activé' : 'Commande annulée');
-      fetchOrders();
+      setOrders((current) => current.filter((o) => o.ID !== orderId));
     }
   };
 
@@ -110,6 +115,7 @@ export default function AdminPendingOrders() {
           emptyMessage="Aucune commande en attente"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
       </div>
     </AdminLayout>
   );
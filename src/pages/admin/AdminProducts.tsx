@@ -1,7 +1,9 @@
 import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
-import { productsApi } from '@/lib/api';
+import { LoadMore } from '@/components/LoadMore';
+import { productsApi, adminApi, isSearchable } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -21,14 +23,15 @@ interface Product {
   ProductName: string;
   Description: string;
   Price: number;
-  StockQuantity: number;
+  StockQuantity: number | null;
 }
 
 export default function AdminProducts() {
-  const [products, setProducts] = useState<Product[]>([]);
+  const {
+    items: products, isLoading, isLoadingMore, hasMore, loadMore, reload: fetchProducts,
+  } = usePagedList<Product>(productsApi.getAll);
   const [filtered, setFiltered] = useState<Product[]>([]);
   const [search, setSearch] = useState('');
-  const [isLoading, setIsLoading] = useState(true);
   const [showCreate, setShowCreate] = useState(false);
   const [editProduct, setEditProduct] = useState<Product | null>(null);
   const [deleteProduct, setDeleteProduct] = useState<Product | null>(null);
@@ -41,24 +44,24 @@ export default function AdminProducts() {
     stock: '',
   });
 
-  const fetchProducts = async () => {
-    const { data } = await productsApi.getAll();
-    if (data) {
-      setProducts(data);
-      setFiltered(data);
-    }
-    setIsLoading(false);
-  };
-
   useEffect(() => {
-    fetchProducts();
-  }, []);
-
-  useEffect(() => {
-    const q = search.toLowerCase();
-    setFiltered(
-      products.filter((p) => p.ProductName.toLowerCase().includes(q))
-    );
+    const q = search.trim().toLowerCase();
+    if (!isSearchable(q)) {
+      setFiltered(
+        products.filter((p) => p.ProductName.toLowerCase().includes(q))
+      );
+      return;
+    }
+    // Recherche côté API (index MySQL) : tout le catalogue, pas seulement la page chargée
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const { data } = await adminApi.search(q, 'products');
+      if (!cancelled && data?.products) setFiltered(data.products);
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [search, products]);
 
   const resetForm = () => {
@@ -76,7 +79,8 @@ export default function AdminProducts() {
       ProductName: form.name,
       Description: form.description,
       Price: parseFloat(form.price),
-      StockQuantity: form.stock ? parseInt(form.stock) : 0,
+      // Champ vide : stock illimité
+      StockQuantity: form.stock ? parseInt(form.stock) : null,
     });
 
     setIsSaving(false);
@@ -96,7 +100,7 @@ export default function AdminProducts() {
       name: product.ProductName,
       description: product.Description || '',
       price: product.Price.toString(),
-      stock: product.StockQuantity.toString(),
+      stock: product.StockQuantity === null ? '' : product.StockQuantity.toString(),
     });
   };
 
@@ -108,7 +112,7 @@ export default function AdminProducts() {
       ProductName: form.name,
       Description: form.description,
       Price: parseFloat(form.price),
-      StockQuantity: parseInt(form.stock) || 0,
+      StockQuantity: form.stock ? parseInt(form.stock) || 0 : null,
     });
 
     setIsSaving(false);
@@ -163,14 +167,16 @@ export default function AdminProducts() {
       render: (item: Product) => (
         <span
           className={
-            item.StockQuantity === 0
+            item.StockQuantity === null
+              ? ''
+              : item.StockQuantity === 0
               ? 'text-destructive font-medium'
               : item.StockQuantity <= 5
               ? 'text-warning font-medium'
               : ''
           }
         >
-          {item.StockQuantity}
+          {item.StockQuantity ?? 'Illimité'}
         </span>
       ),
     },
@@ -226,6 +232,7 @@ export default function AdminProducts() {
           emptyMessage="Aucun produit trouvé"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore && !isSearchable(search)} isLoading={isLoadingMore} onClick={loadMore} />
 
         {/* Create Dialog */}
         <Dialog open={showCreate} onOpenChange={(open) => { setShowCreate(open); if (!open) resetForm(); }}>
@@ -270,7 +277,7 @@ export default function AdminProducts() {
                     min="0"
                     value={form.stock}
                     onChange={(e) => setForm({ ...form, stock: e.target.value })}
-                    placeholder="0"
+                    placeholder="Illimité"
                   />
                 </div>
               </div>
@@ -326,6 +333,7 @@ export default function AdminProducts() {
                     min="0"
                     value={form.stock}
                     onChange={(e) => setForm({ ...form, stock: e.target.value })}
+                    placeholder="Illimité"
                   />
                 </div>
               </div>
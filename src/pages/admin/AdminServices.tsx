@@ -2,7 +2,9 @@ import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
 import { StatusBadge } from '@/components/ui/status-badge';
+import { LoadMore } from '@/components/LoadMore';
 import { ordersApi } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -31,10 +33,11 @@ interface Service {
 }
 
 export default function AdminServices() {
-  const [services, setServices] = useState<Service[]>([]);
+  const {
+    items: services, isLoading, isLoadingMore, hasMore, loadMore, reload: fetchServices,
+  } = usePagedList<Service>(ordersApi.getActiveServices);
   const [filtered, setFiltered] = useState<Service[]>([]);
   const [search, setSearch] = useState('');
-  const [isLoading, setIsLoading] = useState(true);
   const [editService, setEditService] = useState<Service | null>(null);
   const [deleteService, setDeleteService] = useState<Service | null>(null);
   const [isDeleting, setIsDeleting] = useState(false);
@@ -45,19 +48,6 @@ export default function AdminServices() {
     endedAt: '',
   });
 
-  const fetchServices = async () => {
-    const { data } = await ordersApi.getActiveServices();
-    if (data) {
-      setServices(data);
-      setFiltered(data);
-    }
-    setIsLoading(false);
-  };
-
-  useEffect(() => {
-    fetchServices();
-  }, []);
-
   useEffect(() => {
     const q = search.toLowerCase();
     setFiltered(
@@ -188,6 +178,7 @@ export default function AdminServices() {
           emptyMessage="Aucun service actif"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
 
         {/* Edit Dialog */}
         <Dialog open={!!editService} onOpenChange={() => setEditService(null)}>
@@ -1,7 +1,9 @@
 import { useEffect, useState } from 'react';
 import { AdminLayout } from '@/components/layouts/AdminLayout';
 import { DataTable } from '@/components/ui/data-table';
+import { LoadMore } from '@/components/LoadMore';
 import { adminApi } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -27,10 +29,11 @@ interface Staff {
 }
 
 export default function AdminStaff() {
-  const [staff, setStaff] = useState<Staff[]>([]);
+  const {
+    items: staff, isLoading, isLoadingMore, hasMore, loadMore, reload: fetchStaff,
+  } = usePagedList<Staff>(adminApi.getStaff);
   const [filtered, setFiltered] = useState<Staff[]>([]);
   const [search, setSearch] = useState('');
-  const [isLoading, setIsLoading] = useState(true);
   const [showCreate, setShowCreate] = useState(false);
   const [editStaff, setEditStaff] = useState<Staff | null>(null);
   const [deleteStaff, setDeleteStaff] = useState<Staff | null>(null);
@@ -52,19 +55,6 @@ export default function AdminStaff() {
     roleId: 1,
   });
 
-  const fetchStaff = async () => {
-    const { data } = await adminApi.getStaff();
-    if (data) {
-      setStaff(data);
-      setFiltered(data);
-    }
-    setIsLoading(false);
-  };
-
-  useEffect(() => {
-    fetchStaff();
-  }, []);
-
   useEffect(() => {
     const q = search.toLowerCase();
     setFiltered(
@@ -257,6 +247,7 @@ export default function AdminStaff() {
           emptyMessage="Aucun membre du staff trouvé"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
 
         {/* Create Dialog */}
         <Dialog open={showCreate} onOpenChange={setShowCreate}>
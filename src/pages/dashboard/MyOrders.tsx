@@ -1,8 +1,9 @@
-import { useEffect, useState } from 'react';
 import { DashboardLayout } from '@/components/layouts/DashboardLayout';
 import { DataTable } from '@/components/ui/data-table';
 import { StatusBadge } from '@/components/ui/status-badge';
+import { LoadMore } from '@/components/LoadMore';
 import { dashboardApi } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { format } from 'date-fns';
 import { fr } from 'date-fns/locale';
 
@@ -15,18 +16,7 @@ interface Order {
 }
 
 export default function MyOrders() {
-  const [orders, setOrders] = useState<Order[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
-
-  useEffect(() => {
-    const fetchOrders = async () => {
-      const { data } = await dashboardApi.getMyOrders();
-      if (data) setOrders(data);
-      setIsLoading(false);
-    };
-
-    fetchOrders();
-  }, []);
+  const { items: orders, isLoading, isLoadingMore, hasMore, loadMore } = usePagedList<Order>(dashboardApi.getMyOrders);
 
   const columns = [
     { key: 'ID', header: 'N° Commande', render: (item: Order) => `#${item.ID}` },
@@ -64,6 +54,7 @@ export default function MyOrders() {
           emptyMessage="Aucune commande trouvée"
           getRowKey={(item) => item.ID}
         />
+        <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
       </div>
     </DashboardLayout>
   );
@@ -1,6 +1,8 @@
-import { useEffect, useState } from 'react';
+import { useState } from 'react';
 import { DashboardLayout } from '@/components/layouts/DashboardLayout';
+import { LoadMore } from '@/components/LoadMore';
 import { productsApi, ordersApi } from '@/lib/api';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { toast } from 'sonner';
 import { ShoppingCart, Package } from 'lucide-react';
@@ -20,25 +22,14 @@ interface Product {
   ProductName: string;
   Description: string;
   Price: number;
-  StockQuantity: number;
+  StockQuantity: number | null;
 }
 
 export default function Shop() {
-  const [products, setProducts] = useState<Product[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
+  const { items: products, isLoading, isLoadingMore, hasMore, loadMore } = usePagedList<Product>(productsApi.getAll);
   const [orderingId, setOrderingId] = useState<number | null>(null);
   const [confirmProduct, setConfirmProduct] = useState<Product | null>(null);
 
-  useEffect(() => {
-    const fetchProducts = async () => {
-      const { data } = await productsApi.getAll();
-      if (data) setProducts(data);
-      setIsLoading(false);
-    };
-
-    fetchProducts();
-  }, []);
-
   const handleConfirmOrder = async () => {
     if (!confirmProduct) return;
     
@@ -97,7 +88,9 @@ export default function Shop() {
                     <div>
                       <p className="text-2xl font-bold text-foreground">{product.Price.toFixed(2)} €</p>
                       <p className="text-xs text-muted-foreground">
-                        {product.StockQuantity > 0
+                        {product.StockQuantity === null
+                          ? 'Disponible'
+                          : product.StockQuantity > 0
                           ? `${product.StockQuantity} en stock`
                           : 'Rupture de stock'}
                       </p>
@@ -116,6 +109,7 @@ export default function Shop() {
             ))}
           </div>
         )}
+        <LoadMore hasMore={hasMore} isLoading={isLoadingMore} onClick={loadMore} />
 
         <AlertDialog open={!!confirmProduct} onOpenChange={(open) => !open && setConfirmProduct(null)}>
           <AlertDialogContent>